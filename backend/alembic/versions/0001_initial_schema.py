@@ -0,0 +1,129 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("full_name", sa.String()),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_admin", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_full_name", "users", ["full_name"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "platforms",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("type", sa.String(50), nullable=False),
+        sa.Column("description", sa.String(500)),
+        sa.Column("credentials", sa.JSON()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("last_sync", sa.DateTime()),
+    )
+    op.create_index("ix_platforms_id", "platforms", ["id"])
+
+    op.create_table(
+        "platform_metrics",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("platform_id", sa.Integer(), sa.ForeignKey("platforms.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("date", sa.DateTime()),
+        sa.Column("followers_count", sa.Integer()),
+        sa.Column("following_count", sa.Integer()),
+        sa.Column("posts_count", sa.Integer()),
+        sa.Column("engagement_rate", sa.Integer()),
+        sa.Column("impressions", sa.Integer()),
+        sa.Column("reach", sa.Integer()),
+        sa.Column("likes", sa.Integer()),
+        sa.Column("comments", sa.Integer()),
+        sa.Column("shares", sa.Integer()),
+        sa.Column("clicks", sa.Integer()),
+        sa.Column("demographics", sa.JSON()),
+    )
+    op.create_index("ix_platform_metrics_id", "platform_metrics", ["id"])
+
+    op.create_table(
+        "posts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("platform_id", sa.Integer(), sa.ForeignKey("platforms.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("content_type", sa.String(50), nullable=False),
+        sa.Column("hashtags", sa.ARRAY(sa.String())),
+        sa.Column("mentions", sa.ARRAY(sa.String())),
+        sa.Column("media_urls", sa.ARRAY(sa.String())),
+        sa.Column("og_url", sa.String()),
+        sa.Column("status", sa.String(20)),
+        sa.Column("external_id", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("published_at", sa.DateTime()),
+    )
+    op.create_index("ix_posts_id", "posts", ["id"])
+
+    op.create_table(
+        "post_metrics",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("post_id", sa.Integer(), sa.ForeignKey("posts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("date", sa.DateTime()),
+        sa.Column("likes", sa.Integer()),
+        sa.Column("comments", sa.Integer()),
+        sa.Column("shares", sa.Integer()),
+        sa.Column("saves", sa.Integer()),
+        sa.Column("impressions", sa.Integer()),
+        sa.Column("reach", sa.Integer()),
+        sa.Column("clicks", sa.Integer()),
+        sa.Column("engagement_rate", sa.Integer()),
+        sa.Column("sentiment", sa.String(20)),
+        sa.Column("details", sa.JSON()),
+    )
+    op.create_index("ix_post_metrics_id", "post_metrics", ["id"])
+
+    op.create_table(
+        "schedules",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("post_id", sa.Integer(), sa.ForeignKey("posts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("scheduled_at", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(20)),
+        sa.Column("timezone", sa.String(50)),
+        sa.Column("recurrence", sa.String(50)),
+        sa.Column("completed_at", sa.DateTime()),
+        sa.Column("error_message", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_schedules_id", "schedules", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("schedules")
+    op.drop_table("post_metrics")
+    op.drop_table("posts")
+    op.drop_table("platform_metrics")
+    op.drop_table("platforms")
+    op.drop_table("users")
@@ -0,0 +1,81 @@
+"""Metric rollup tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+GRANULARITIES = ("hour", "day", "week")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "platform_metric_rollups",
+        sa.Column("platform_id", sa.Integer(), sa.ForeignKey("platforms.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("granularity", sa.String(10), primary_key=True),
+        sa.Column("bucket", sa.DateTime(), primary_key=True),
+        sa.Column("samples", sa.Integer()),
+        sa.Column("followers_count", sa.Integer()),
+        sa.Column("following_count", sa.Integer()),
+        sa.Column("impressions", sa.BigInteger()),
+        sa.Column("reach", sa.BigInteger()),
+        sa.Column("likes", sa.BigInteger()),
+        sa.Column("comments", sa.BigInteger()),
+        sa.Column("shares", sa.BigInteger()),
+        sa.Column("clicks", sa.BigInteger()),
+    )
+    op.create_table(
+        "post_metric_rollups",
+        sa.Column("platform_id", sa.Integer(), sa.ForeignKey("platforms.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("granularity", sa.String(10), primary_key=True),
+        sa.Column("bucket", sa.DateTime(), primary_key=True),
+        sa.Column("samples", sa.Integer()),
+        sa.Column("likes", sa.BigInteger()),
+        sa.Column("comments", sa.BigInteger()),
+        sa.Column("shares", sa.BigInteger()),
+        sa.Column("saves", sa.BigInteger()),
+        sa.Column("impressions", sa.BigInteger()),
+        sa.Column("reach", sa.BigInteger()),
+        sa.Column("clicks", sa.BigInteger()),
+    )
+
+    # Backfill the rollups from the metrics already stored
+    for granularity in GRANULARITIES:
+        op.execute(f"""
+            INSERT INTO platform_metric_rollups
+            SELECT platform_id, '{granularity}', date_trunc('{granularity}', date), count(*),
+                   (array_agg(followers_count ORDER BY date DESC))[1],
+                   (array_agg(following_count ORDER BY date DESC))[1],
+                   coalesce(sum(impressions), 0), coalesce(sum(reach), 0),
+                   coalesce(sum(likes), 0), coalesce(sum(comments), 0),
+                   coalesce(sum(shares), 0), coalesce(sum(clicks), 0)
+            FROM platform_metrics
+            WHERE date IS NOT NULL
+            GROUP BY platform_id, date_trunc('{granularity}', date)
+        """)
+        op.execute(f"""
+            INSERT INTO post_metric_rollups
+            SELECT posts.platform_id, '{granularity}', date_trunc('{granularity}', post_metrics.date), count(*),
+                   coalesce(sum(post_metrics.likes), 0), coalesce(sum(post_metrics.comments), 0),
+                   coalesce(sum(post_metrics.shares), 0), coalesce(sum(post_metrics.saves), 0),
+                   coalesce(sum(post_metrics.impressions), 0), coalesce(sum(post_metrics.reach), 0),
+                   coalesce(sum(post_metrics.clicks), 0)
+            FROM post_metrics JOIN posts ON posts.id = post_metrics.post_id
+            WHERE post_metrics.date IS NOT NULL
+            GROUP BY posts.platform_id, date_trunc('{granularity}', post_metrics.date)
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table("post_metric_rollups")
+    op.drop_table("platform_metric_rollups")
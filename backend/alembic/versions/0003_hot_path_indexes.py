@@ -0,0 +1,50 @@
+"""Composite indexes for list and analytics filters
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# name -> (table, columns, partial index predicate)
+INDEXES = {
+    "ix_posts_user_platform_status": ("posts", ["user_id", "platform_id", "status"], None),
+    "ix_posts_user_status": ("posts", ["user_id", "status"], None),
+    "ix_posts_platform_published_at": ("posts", ["platform_id", "published_at"], None),
+    "ix_post_metrics_post_date": ("post_metrics", ["post_id", "date"], None),
+    "ix_platforms_user_id": ("platforms", ["user_id"], None),
+    "ix_platform_metrics_platform_date": ("platform_metrics", ["platform_id", "date"], None),
+    "ix_schedules_user_status_scheduled_at": ("schedules", ["user_id", "status", "scheduled_at"], None),
+    "ix_schedules_user_scheduled_at": ("schedules", ["user_id", "scheduled_at"], None),
+    "ix_schedules_post_id": ("schedules", ["post_id"], None),
+    "ix_schedules_pending_scheduled_at": ("schedules", ["scheduled_at"], "status = 'pending'"),
+}
+
+
+def upgrade() -> None:
+    # Build without blocking writes on tables that are already large
+    with op.get_context().autocommit_block():
+        for name, (table, columns, where) in INDEXES.items():
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, (table, _, _) in INDEXES.items():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
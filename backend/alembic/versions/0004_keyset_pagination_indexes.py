@@ -0,0 +1,47 @@
+"""Indexes matching the keyset pagination sort keys
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_posts_user_created_at_id", "posts", ["user_id", "created_at", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_schedules_user_scheduled_at_id", "schedules", ["user_id", "scheduled_at", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_users_created_at_id", "users", ["created_at", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Superseded by ix_schedules_user_scheduled_at_id
+        op.drop_index(
+            "ix_schedules_user_scheduled_at", table_name="schedules",
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_schedules_user_scheduled_at", "schedules", ["user_id", "scheduled_at"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index("ix_users_created_at_id", table_name="users", postgresql_concurrently=True)
+        op.drop_index("ix_schedules_user_scheduled_at_id", table_name="schedules", postgresql_concurrently=True)
+        op.drop_index("ix_posts_user_created_at_id", table_name="posts", postgresql_concurrently=True)
@@ -0,0 +1,33 @@
+"""Index for reclaiming abandoned scheduler claims
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_schedules_processing_updated_at", "schedules", ["updated_at"],
+            postgresql_where=sa.text("status = 'processing'"),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_schedules_processing_updated_at", table_name="schedules",
+            postgresql_concurrently=True,
+        )
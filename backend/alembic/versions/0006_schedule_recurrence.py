@@ -0,0 +1,37 @@
+"""Recurrence state on schedules
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("schedules", sa.Column("recurrence_rule", sa.String(length=255), nullable=True))
+    op.add_column("schedules", sa.Column("recurrence_anchor", sa.DateTime(), nullable=True))
+    op.add_column(
+        "schedules",
+        sa.Column("occurrence_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Existing recurring schedules are anchored at their next occurrence
+    op.execute(
+        "UPDATE schedules "
+        "SET recurrence_anchor = (scheduled_at AT TIME ZONE 'UTC') AT TIME ZONE COALESCE(timezone, 'UTC') "
+        "WHERE recurrence IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("schedules", "occurrence_count")
+    op.drop_column("schedules", "recurrence_anchor")
+    op.drop_column("schedules", "recurrence_rule")
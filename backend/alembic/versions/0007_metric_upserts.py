@@ -0,0 +1,49 @@
+"""Unique metric samples per platform/post and date for upserts
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# unique index -> (table, owner column, index it replaces)
+INDEXES = {
+    "uq_platform_metrics_platform_date": ("platform_metrics", "platform_id", "ix_platform_metrics_platform_date"),
+    "uq_post_metrics_post_date": ("post_metrics", "post_id", "ix_post_metrics_post_date"),
+}
+
+
+def upgrade() -> None:
+    # Keep the newest of any duplicate samples so the unique indexes can build
+    for table, owner, _ in INDEXES.values():
+        op.execute(
+            f"DELETE FROM {table} a USING {table} b "
+            f"WHERE a.{owner} = b.{owner} AND a.date = b.date AND a.id < b.id"
+        )
+
+    with op.get_context().autocommit_block():
+        for name, (table, owner, replaced) in INDEXES.items():
+            op.create_index(
+                name, table, [owner, "date"], unique=True,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.drop_index(replaced, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, (table, owner, replaced) in INDEXES.items():
+            op.create_index(
+                replaced, table, [owner, "date"],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
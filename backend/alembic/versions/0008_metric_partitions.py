@@ -0,0 +1,92 @@
+"""Partition metric samples by month
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# table -> (owner column, owner table, unique index)
+TABLES = {
+    "platform_metrics": ("platform_id", "platforms", "uq_platform_metrics_platform_date"),
+    "post_metrics": ("post_id", "posts", "uq_post_metrics_post_date"),
+}
+
+# Months created beyond the current one; the metrics sync worker keeps
+# creating them from here on
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _months(first: datetime, last: datetime):
+    month = first.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def _swap_tables(table: str, partitioned: bool) -> None:
+    """Replace a metrics table with a (non-)partitioned copy of itself."""
+    owner, owner_table, unique_index = TABLES[table]
+    old = f"{table}_old"
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"ALTER TABLE {old} DROP CONSTRAINT {table}_pkey")
+    op.execute(f"ALTER TABLE {old} DROP CONSTRAINT {table}_{owner}_fkey")
+    op.drop_index(unique_index, table_name=old)
+    op.drop_index(f"ix_{table}_id", table_name=old)
+
+    # Same columns and defaults, including the id sequence
+    if partitioned:
+        op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE (date)")
+        op.alter_column(table, "date", nullable=False)
+        op.create_primary_key(f"{table}_pkey", table, ["id", "date"])
+
+        bind = op.get_bind()
+        now = datetime.utcnow()
+        bind.execute(sa.text(f"UPDATE {old} SET date = :now WHERE date IS NULL"), {"now": now})
+        first = bind.execute(sa.text(f"SELECT min(date) FROM {old}")).scalar() or now
+        for month in _months(first, _add_months(now, MONTHS_AHEAD)):
+            op.execute(
+                f"CREATE TABLE {table}_y{month.year:04d}m{month.month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+            )
+    else:
+        op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)")
+        op.alter_column(table, "date", nullable=True)
+        op.create_primary_key(f"{table}_pkey", table, ["id"])
+
+    op.create_foreign_key(f"{table}_{owner}_fkey", table, owner_table, [owner], ["id"], ondelete="CASCADE")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.drop_table(old)
+
+    # Built after loading, which is faster than maintaining them row by row
+    op.create_index(unique_index, table, [owner, "date"], unique=True)
+    op.create_index(f"ix_{table}_id", table, ["id"])
+
+
+def upgrade() -> None:
+    # Rewrites both tables under an exclusive lock; run in a maintenance window
+    for table in TABLES:
+        _swap_tables(table, partitioned=True)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        _swap_tables(table, partitioned=False)
@@ -0,0 +1,44 @@
+"""Posting time slots for best-time lookups
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "posting_time_slots",
+        sa.Column("platform_id", sa.Integer(), sa.ForeignKey("platforms.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("slot", sa.SmallInteger(), primary_key=True),
+        sa.Column("samples", sa.Integer()),
+        sa.Column("engagement", sa.BigInteger()),
+    )
+
+    # Backfill the slots from the metrics already stored
+    op.execute("""
+        INSERT INTO posting_time_slots
+        SELECT posts.platform_id,
+               (extract(isodow FROM posts.published_at)::int - 1) * 24 + extract(hour FROM posts.published_at)::int,
+               count(*),
+               coalesce(sum(coalesce(post_metrics.likes, 0) + coalesce(post_metrics.comments, 0)
+                            + coalesce(post_metrics.shares, 0)), 0)
+        FROM post_metrics
+        JOIN posts ON posts.id = post_metrics.post_id
+        WHERE posts.published_at IS NOT NULL
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("posting_time_slots")
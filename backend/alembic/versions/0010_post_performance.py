@@ -0,0 +1,64 @@
+"""Post performance leaderboard
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "post_performance",
+        sa.Column("post_id", sa.Integer(), sa.ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("platform_id", sa.Integer(), sa.ForeignKey("platforms.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("published_at", sa.DateTime()),
+        sa.Column("likes", sa.BigInteger()),
+        sa.Column("comments", sa.BigInteger()),
+        sa.Column("shares", sa.BigInteger()),
+        sa.Column("impressions", sa.BigInteger()),
+        sa.Column("reach", sa.BigInteger()),
+        sa.Column("clicks", sa.BigInteger()),
+        sa.Column("engagement_rate", sa.Float()),
+    )
+
+    # Backfill the totals from the metrics already stored
+    op.execute("""
+        INSERT INTO post_performance
+        SELECT post_id, platform_id, published_at, likes, comments, shares, impressions, reach, clicks,
+               CASE WHEN impressions > 0
+                    THEN round((likes + comments + shares) * 100.0 / impressions, 2)
+                    ELSE 0 END
+        FROM (
+            SELECT post_metrics.post_id, posts.platform_id, posts.published_at,
+                   coalesce(sum(post_metrics.likes), 0) AS likes,
+                   coalesce(sum(post_metrics.comments), 0) AS comments,
+                   coalesce(sum(post_metrics.shares), 0) AS shares,
+                   coalesce(sum(post_metrics.impressions), 0) AS impressions,
+                   coalesce(sum(post_metrics.reach), 0) AS reach,
+                   coalesce(sum(post_metrics.clicks), 0) AS clicks
+            FROM post_metrics
+            JOIN posts ON posts.id = post_metrics.post_id
+            GROUP BY post_metrics.post_id, posts.platform_id, posts.published_at
+        ) totals
+    """)
+
+    op.create_index(
+        "ix_post_performance_platform_rate", "post_performance", ["platform_id", "engagement_rate", "post_id"]
+    )
+    op.create_index(
+        "ix_post_performance_platform_published_at", "post_performance", ["platform_id", "published_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("post_performance")
@@ -0,0 +1,147 @@
+"""Audience snapshots per platform and user
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 00:00:00
+
+"""
+from collections import defaultdict
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+# The histogram encoding as of this revision, copied from
+# app.services.audience so later changes there can't alter the backfill
+
+CATEGORY_ALIASES = {
+    "ages": "age", "age_range": "age", "age_ranges": "age", "age_group": "age", "age_groups": "age",
+    "genders": "gender", "sex": "gender",
+    "country": "geo", "countries": "geo", "location": "geo", "locations": "geo",
+    "region": "geo", "regions": "geo",
+}
+GENDER_ALIASES = {
+    "m": "male", "man": "male", "men": "male",
+    "f": "female", "woman": "female", "women": "female",
+    "u": "unknown", "n/a": "unknown", "undisclosed": "unknown", "unspecified": "unknown",
+}
+GEO_MAX_BUCKETS = 50
+OTHER_BUCKET = "other"
+
+
+def _bucket_name(category, bucket):
+    name = str(bucket).strip()
+    if category == "gender":
+        name = name.lower()
+        return GENDER_ALIASES.get(name, name)
+    if category == "geo" and len(name) == 2:
+        return name.upper()
+    return name.replace(" ", "")
+
+
+def _compact(histogram):
+    geo = histogram.get("geo")
+    if geo and len(geo) > GEO_MAX_BUCKETS:
+        ranked = sorted(
+            ((bucket, count) for bucket, count in geo.items() if bucket != OTHER_BUCKET),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        kept = dict(ranked[:GEO_MAX_BUCKETS - 1])
+        kept[OTHER_BUCKET] = geo.get(OTHER_BUCKET, 0) + sum(count for _, count in ranked[GEO_MAX_BUCKETS - 1:])
+        histogram["geo"] = kept
+    return histogram
+
+
+def normalize_demographics(raw):
+    histogram = {}
+    if not isinstance(raw, dict):
+        return histogram
+    for category, buckets in raw.items():
+        if not isinstance(buckets, dict):
+            continue
+        category = str(category).strip().lower()
+        category = CATEGORY_ALIASES.get(category, category)
+        counts = histogram.setdefault(category, {})
+        for bucket, count in buckets.items():
+            if isinstance(count, bool) or not isinstance(count, (int, float)) or not count:
+                continue
+            name = _bucket_name(category, bucket)
+            counts[name] = counts.get(name, 0) + count
+        if not counts:
+            del histogram[category]
+    return _compact(histogram)
+
+
+def merge_demographics(histograms):
+    merged = {}
+    for histogram in histograms:
+        for category, buckets in (histogram or {}).items():
+            counts = merged.setdefault(category, {})
+            for bucket, count in buckets.items():
+                counts[bucket] = counts.get(bucket, 0) + count
+    return _compact(merged)
+
+
+def upgrade() -> None:
+    audience_snapshots = op.create_table(
+        "audience_snapshots",
+        sa.Column("platform_id", sa.Integer(), sa.ForeignKey("platforms.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("date", sa.DateTime()),
+        sa.Column("followers_count", sa.Integer()),
+        sa.Column("demographics", sa.JSON()),
+    )
+    user_audience_snapshots = op.create_table(
+        "user_audience_snapshots",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("followers_count", sa.BigInteger()),
+        sa.Column("demographics", sa.JSON()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+    # Backfill from each platform's latest sample; normalizing needs Python
+    latest = op.get_bind().execute(sa.text("""
+        SELECT DISTINCT ON (platform_metrics.platform_id)
+               platform_metrics.platform_id, platforms.user_id, platform_metrics.date,
+               platform_metrics.followers_count, platform_metrics.demographics
+        FROM platform_metrics
+        JOIN platforms ON platforms.id = platform_metrics.platform_id
+        ORDER BY platform_metrics.platform_id, platform_metrics.date DESC
+    """)).all()
+    snapshots = [
+        {
+            "platform_id": row.platform_id,
+            "date": row.date,
+            "followers_count": row.followers_count or 0,
+            "demographics": normalize_demographics(row.demographics),
+        }
+        for row in latest
+    ]
+    if snapshots:
+        op.bulk_insert(audience_snapshots, snapshots)
+
+    by_user = defaultdict(list)
+    for row, snapshot in zip(latest, snapshots):
+        by_user[row.user_id].append(snapshot)
+    if by_user:
+        op.bulk_insert(user_audience_snapshots, [
+            {
+                "user_id": user_id,
+                "followers_count": sum(snapshot["followers_count"] for snapshot in user_snapshots),
+                "demographics": merge_demographics(snapshot["demographics"] for snapshot in user_snapshots),
+                "updated_at": datetime.utcnow(),
+            }
+            for user_id, user_snapshots in by_user.items()
+        ])
+
+
+def downgrade() -> None:
+    op.drop_table("user_audience_snapshots")
+    op.drop_table("audience_snapshots")
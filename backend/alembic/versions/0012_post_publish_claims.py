@@ -0,0 +1,40 @@
+"""Publish claims on posts
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("posts", sa.Column("publish_claimed_at", sa.DateTime(), nullable=True))
+    # Posts already stuck in "publishing" are released once the lease expires
+    op.execute(
+        "UPDATE posts SET publish_claimed_at = COALESCE(updated_at, now() AT TIME ZONE 'UTC') "
+        "WHERE status = 'publishing'"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_posts_publishing_claimed_at", "posts", ["publish_claimed_at"],
+            postgresql_where=sa.text("status = 'publishing'"),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_posts_publishing_claimed_at", table_name="posts",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("posts", "publish_claimed_at")
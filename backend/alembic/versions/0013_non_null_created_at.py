@@ -0,0 +1,34 @@
+"""Non-null creation times on posts and users
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+NOW_UTC = sa.text("(now() AT TIME ZONE 'utc')")
+
+
+def upgrade() -> None:
+    # created_at is part of the keyset pagination cursors; rows without one
+    # would sort first in newest-first listings and can't be encoded
+    for table in ("posts", "users"):
+        op.execute(
+            f"UPDATE {table} SET created_at = COALESCE(updated_at, now() AT TIME ZONE 'utc') "
+            "WHERE created_at IS NULL"
+        )
+        op.alter_column(table, "created_at", existing_type=sa.DateTime(), nullable=False, server_default=NOW_UTC)
+
+
+def downgrade() -> None:
+    for table in ("users", "posts"):
+        op.alter_column(table, "created_at", existing_type=sa.DateTime(), nullable=True, server_default=None)
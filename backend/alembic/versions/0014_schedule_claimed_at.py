@@ -0,0 +1,49 @@
+"""Lease timestamp for scheduler claims
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("schedules", sa.Column("claimed_at", sa.DateTime(), nullable=True))
+    # Claims in flight keep the lease they had, which was tracked in updated_at
+    op.execute(
+        "UPDATE schedules SET claimed_at = COALESCE(updated_at, now() AT TIME ZONE 'utc') "
+        "WHERE status = 'processing'"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_schedules_processing_claimed_at", "schedules", ["claimed_at"],
+            postgresql_where=sa.text("status = 'processing'"),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_schedules_processing_updated_at", table_name="schedules",
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_schedules_processing_updated_at", "schedules", ["updated_at"],
+            postgresql_where=sa.text("status = 'processing'"),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_schedules_processing_claimed_at", table_name="schedules",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("schedules", "claimed_at")
@@ -10,7 +10,8 @@ from app.api.api_v1.endpoints import (
     posts,
     schedules,
     analytics,
-    ai
+    ai,
+    admin
 )
 
 api_router = APIRouter()
@@ -22,3 +23,4 @@ api_router.include_router(posts.router, prefix="/posts", tags=["Posts"])
 api_router.include_router(schedules.router, prefix="/schedules", tags=["Schedules"])
 api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
 api_router.include_router(ai.router, prefix="/ai", tags=["AI"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
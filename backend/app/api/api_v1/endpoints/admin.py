@@ -0,0 +1,72 @@
+"""
+Administrative and operational endpoints.
+"""
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.ai_gateway import ai_gateway
+from app.core.database import async_engine, engine, get_pool_status
+from app.core.security import hashing_pool
+from app.models.user import User as UserModel
+from app.services.ai import ai_result_cache
+from app.services.auth import get_current_active_user
+
+router = APIRouter()
+
+
+def get_current_admin_user(
+    current_user: UserModel = Depends(get_current_active_user),
+) -> UserModel:
+    """
+    Dependency that only lets admin users through.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions"
+        )
+    return current_user
+
+
+@router.get("/db/pool", response_model=Dict[str, Any])
+async def database_pool_status(
+    current_user: UserModel = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Get connection pool occupancy and checkout wait statistics for this process.
+    """
+    return {
+        "async": get_pool_status(async_engine.sync_engine),
+        "sync": get_pool_status(engine),
+    }
+
+
+@router.get("/auth/hashing", response_model=Dict[str, Any])
+async def password_hashing_status(
+    current_user: UserModel = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Get password hashing pool occupancy, queue depth and timing for this process.
+    """
+    return hashing_pool.snapshot()
+
+
+@router.get("/ai/gateway", response_model=Dict[str, Any])
+async def ai_gateway_status(
+    current_user: UserModel = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Get AI gateway concurrency, request coalescing and retry statistics for this process.
+    """
+    return ai_gateway.snapshot()
+
+
+@router.get("/ai/cache", response_model=Dict[str, Any])
+async def ai_cache_status(
+    current_user: UserModel = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Get AI result cache size and per-route hit rates for this process.
+    """
+    return ai_result_cache.snapshot()
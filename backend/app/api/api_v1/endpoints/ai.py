@@ -1,14 +1,19 @@
 """
 AI-powered content generation endpoints.
 """
-from typing import Any, Dict, List, Optional
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User as UserModel
 from app.schemas.ai import (
+    ContentBatchRequest,
+    ContentBatchResponse,
     ContentGenerationRequest,
     ContentGenerationResponse,
     ContentImprovement,
@@ -19,27 +24,63 @@ from app.schemas.ai import (
 from app.services.auth import get_current_active_user
 from app.services.ai import (
     generate_content,
+    generate_content_batch,
     improve_content,
     generate_content_ideas,
     suggest_hashtags,
-    analyze_audience
+    analyze_audience,
+    stream_content,
+    stream_improvement
 )
 
 router = APIRouter()
 
 
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+async def _event_stream(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """
+    Send (event, data) pairs as server-sent events.
+
+    The response starts once the first event is ready, so failures before
+    any output still get their own status code; later ones are sent as an
+    "error" event.
+    """
+    first = await events.__anext__()
+
+    async def body():
+        yield _sse(*first)
+        try:
+            async for event, data in events:
+                yield _sse(event, data)
+        except HTTPException as e:
+            yield _sse("error", {"detail": e.detail})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/generate", response_model=ContentGenerationResponse)
 async def create_content(
     request: ContentGenerationRequest,
-    db: Session = Depends(get_db),
+    stream: bool = Query(False, description="Stream the content as server-sent events"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Generate social media content using AI.
+    
+    With stream=true the response is a stream of server-sent events: "token"
+    events carry the content text as it is generated, followed by a single
+    "result" event with the complete ContentGenerationResponse.
     """
     try:
-        content = await generate_content(
-            db,
+        params = dict(
             user_id=current_user.id,
             platform=request.platform,
             content_type=request.content_type,
@@ -50,7 +91,46 @@ async def create_content(
             include_hashtags=request.include_hashtags,
             include_emoji=request.include_emoji
         )
+        if stream:
+            return await _event_stream(stream_content(db, **params))
+        content = await generate_content(db, **params)
         return content
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Content generation failed: {str(e)}"
+        )
+
+
+@router.post("/generate/batch", response_model=ContentBatchResponse)
+async def create_content_batch(
+    request: ContentBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    Generate one topic for several platforms and content types at once.
+    
+    Variants are generated concurrently; each carries either its content
+    or the error that stopped it.
+    """
+    try:
+        variants = await generate_content_batch(
+            db,
+            user_id=current_user.id,
+            targets=[target.dict() for target in request.targets],
+            topic=request.topic,
+            tone=request.tone,
+            keywords=request.keywords,
+            length=request.length,
+            include_hashtags=request.include_hashtags,
+            include_emoji=request.include_emoji
+        )
+        return {"variants": variants}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -63,21 +143,29 @@ async def improve_existing_content(
     content: str = Query(..., min_length=1, max_length=2000),
     platform: str = Query(...),
     aspect: str = Query(..., description="Aspect to improve: engagement, clarity, tone, etc."),
-    db: Session = Depends(get_db),
+    stream: bool = Query(False, description="Stream the improved content as server-sent events"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Improve existing content using AI suggestions.
+    
+    With stream=true the improved text is streamed as server-sent "token"
+    events, followed by a "result" event with the complete ContentImprovement.
     """
     try:
-        improved = await improve_content(
-            db,
+        params = dict(
             user_id=current_user.id,
             content=content,
             platform=platform,
             aspect=aspect
         )
+        if stream:
+            return await _event_stream(stream_improvement(db, **params))
+        improved = await improve_content(db, **params)
         return improved
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -90,7 +178,7 @@ async def get_content_ideas(
     topic: str = Query(None),
     platform: str = Query(...),
     count: int = Query(5, ge=1, le=20),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -105,6 +193,8 @@ async def get_content_ideas(
             count=count
         )
         return ideas
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -117,7 +207,7 @@ async def get_hashtags(
     content: str = Query(..., min_length=1, max_length=2000),
     platform: str = Query(...),
     count: int = Query(10, ge=1, le=30),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -132,6 +222,8 @@ async def get_hashtags(
             count=count
         )
         return hashtags
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -142,7 +234,7 @@ async def get_hashtags(
 @router.get("/audience", response_model=AudienceAnalysis)
 async def get_audience_analysis(
     platform_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -155,6 +247,8 @@ async def get_audience_analysis(
             platform_id=platform_id
         )
         return analysis
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -5,30 +5,35 @@ from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User as UserModel
 from app.services.auth import get_current_active_user
 from app.services.analytics import (
+    cached_analytics,
     get_platform_analytics,
     get_post_performance,
     get_audience_insights,
+    get_best_times,
     get_engagement_metrics,
     get_growth_metrics,
-    export_analytics
+    export_analytics,
+    get_export_job,
+    get_export_path
 )
 
 router = APIRouter()
 
 
 @router.get("/platform/{platform_id}", response_model=Dict[str, Any])
-def platform_analytics(
+async def platform_analytics(
     platform_id: int,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     metrics: List[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -42,30 +47,39 @@ def platform_analytics(
     - demographics
     - best_time
     """
+    # Keyed on the parameters as given, so defaulted dates share one entry
+    params = {"from_date": from_date, "to_date": to_date, "metrics": sorted(metrics or [])}
+    
     if not from_date:
         from_date = datetime.now() - timedelta(days=30)
     
     if not to_date:
         to_date = datetime.now()
     
-    analytics = get_platform_analytics(
-        db, 
-        platform_id=platform_id, 
-        user_id=current_user.id,
-        from_date=from_date,
-        to_date=to_date,
-        metrics=metrics
+    analytics = await cached_analytics(
+        "platform",
+        current_user.id,
+        platform_id,
+        params,
+        lambda: get_platform_analytics(
+            db, 
+            platform_id=platform_id, 
+            user_id=current_user.id,
+            from_date=from_date,
+            to_date=to_date,
+            metrics=metrics
+        ),
     )
     return analytics
 
 
 @router.get("/performance", response_model=Dict[str, Any])
-def post_performance(
+async def post_performance(
     platform_id: Optional[int] = None,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
-    limit: int = 10,
-    db: Session = Depends(get_db),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -73,109 +87,156 @@ def post_performance(
     
     Returns top performing posts by engagement rate.
     """
+    params = {"from_date": from_date, "to_date": to_date, "limit": limit}
+    
     if not from_date:
         from_date = datetime.now() - timedelta(days=30)
     
     if not to_date:
         to_date = datetime.now()
     
-    performance = get_post_performance(
-        db, 
-        user_id=current_user.id,
-        platform_id=platform_id,
-        from_date=from_date,
-        to_date=to_date,
-        limit=limit
+    performance = await cached_analytics(
+        "performance",
+        current_user.id,
+        platform_id,
+        params,
+        lambda: get_post_performance(
+            db, 
+            user_id=current_user.id,
+            platform_id=platform_id,
+            from_date=from_date,
+            to_date=to_date,
+            limit=limit
+        ),
     )
     return performance
 
 
 @router.get("/audience", response_model=Dict[str, Any])
-def audience_insights(
+async def audience_insights(
     platform_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Get audience demographics and insights across all platforms or for a specific platform.
     """
-    insights = get_audience_insights(
-        db, 
-        user_id=current_user.id,
-        platform_id=platform_id
+    insights = await cached_analytics(
+        "audience",
+        current_user.id,
+        platform_id,
+        {},
+        lambda: get_audience_insights(
+            db, 
+            user_id=current_user.id,
+            platform_id=platform_id
+        ),
     )
     return insights
 
 
+@router.get("/best-times", response_model=Dict[str, Any])
+async def best_times(
+    platform_id: Optional[int] = None,
+    top: int = Query(3, ge=1, le=24),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the best hours of each weekday to post on, across all platforms or for a specific platform.
+    """
+    return await get_best_times(db, user_id=current_user.id, platform_id=platform_id, top=top)
+
+
 @router.get("/engagement", response_model=Dict[str, Any])
-def engagement_analytics(
+async def engagement_analytics(
     platform_id: Optional[int] = None,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
-    interval: str = "day",  # day, week, month
-    db: Session = Depends(get_db),
+    interval: str = "day",  # hour, day, week, month
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Get engagement metrics over time.
     """
+    params = {"from_date": from_date, "to_date": to_date, "interval": interval}
+    
     if not from_date:
         from_date = datetime.now() - timedelta(days=30)
     
     if not to_date:
         to_date = datetime.now()
     
-    metrics = get_engagement_metrics(
-        db, 
-        user_id=current_user.id,
-        platform_id=platform_id,
-        from_date=from_date,
-        to_date=to_date,
-        interval=interval
+    metrics = await cached_analytics(
+        "engagement",
+        current_user.id,
+        platform_id,
+        params,
+        lambda: get_engagement_metrics(
+            db, 
+            user_id=current_user.id,
+            platform_id=platform_id,
+            from_date=from_date,
+            to_date=to_date,
+            interval=interval
+        ),
     )
     return metrics
 
 
 @router.get("/growth", response_model=Dict[str, Any])
-def growth_analytics(
+async def growth_analytics(
     platform_id: Optional[int] = None,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
-    interval: str = "day",  # day, week, month
-    db: Session = Depends(get_db),
+    interval: str = "day",  # hour, day, week, month
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Get follower growth metrics over time.
     """
+    params = {"from_date": from_date, "to_date": to_date, "interval": interval}
+    
     if not from_date:
         from_date = datetime.now() - timedelta(days=30)
     
     if not to_date:
         to_date = datetime.now()
     
-    metrics = get_growth_metrics(
-        db, 
-        user_id=current_user.id,
-        platform_id=platform_id,
-        from_date=from_date,
-        to_date=to_date,
-        interval=interval
+    metrics = await cached_analytics(
+        "growth",
+        current_user.id,
+        platform_id,
+        params,
+        lambda: get_growth_metrics(
+            db, 
+            user_id=current_user.id,
+            platform_id=platform_id,
+            from_date=from_date,
+            to_date=to_date,
+            interval=interval
+        ),
     )
     return metrics
 
 
 @router.get("/export", response_model=Dict[str, str])
-def export_analytics_data(
+async def export_analytics_data(
     platform_id: Optional[int] = None,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     format: str = "csv",  # csv, xlsx, json
-    db: Session = Depends(get_db),
+    compress: bool = True,  # gzip csv and json files
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Export analytics data in various formats.
+    
+    Small exports return a `download_url` right away. Large exports return a
+    `job_id` and a `status_url` to poll until the download is ready.
     """
     if not from_date:
         from_date = datetime.now() - timedelta(days=30)
@@ -189,12 +250,49 @@ def export_analytics_data(
             detail=f"Unsupported format: {format}. Supported formats: csv, xlsx, json"
         )
     
-    export_url = export_analytics(
+    export = await export_analytics(
         db, 
         user_id=current_user.id,
         platform_id=platform_id,
         from_date=from_date,
         to_date=to_date,
-        format=format
+        format=format,
+        compress=compress
     )
-    return {"download_url": export_url}
+    return export
+
+
+@router.get("/export-jobs/{job_id}", response_model=Dict[str, Any])
+async def export_job_status(
+    job_id: str,
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the progress of a background analytics export.
+    """
+    job = await get_export_job(current_user.id, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
+        )
+    return job
+
+
+@router.get("/exports/{filename}")
+async def download_export(
+    filename: str,
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    Download a previously generated analytics export.
+    """
+    path = get_export_path(current_user.id, filename)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    # Compressed exports are downloaded as .gz files, not decoded by the client
+    media_type = "application/gzip" if filename.endswith(".gz") else None
+    return FileResponse(path, filename=filename, media_type=media_type)
@@ -6,10 +6,10 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import create_access_token, create_refresh_token
 from app.schemas.auth import Token, TokenPayload, RefreshToken
 from app.schemas.user import User, UserCreate
@@ -20,22 +20,22 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=User)
-def register(user_in: UserCreate, db: Session = Depends(get_db)) -> Any:
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)) -> Any:
     """
     Register a new user.
     """
-    user = create_user(db=db, user_in=user_in)
+    user = await create_user(db=db, user_in=user_in)
     return user
 
 
 @router.post("/login", response_model=Token)
-def login(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login(
+    db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login.
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,8 +58,8 @@ def login(
 
 
 @router.post("/refresh", response_model=Token)
-def refresh_token(
-    refresh_token_in: RefreshToken, db: Session = Depends(get_db)
+async def refresh_token(
+    refresh_token_in: RefreshToken, db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Get a new access token using a refresh token.
@@ -74,7 +74,7 @@ def refresh_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = get_current_user(db, payload.sub)
+    user = await get_current_user(db, payload.sub)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -4,9 +4,9 @@ Social media platform management endpoints.
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User as UserModel
 from app.models.platform import Platform as PlatformModel
 from app.schemas.platform import (
@@ -31,40 +31,40 @@ router = APIRouter()
 
 
 @router.get("", response_model=List[Platform])
-def read_platforms(
-    db: Session = Depends(get_db),
+async def read_platforms(
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Get all platforms for current user.
     """
-    platforms = get_platforms_by_user(db, user_id=current_user.id)
+    platforms = await get_platforms_by_user(db, user_id=current_user.id)
     return platforms
 
 
 @router.post("", response_model=Platform)
-def create_user_platform(
+async def create_user_platform(
     platform_in: PlatformCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Create new platform for current user.
     """
-    platform = create_platform(db, obj_in=platform_in, user_id=current_user.id)
+    platform = await create_platform(db, obj_in=platform_in, user_id=current_user.id)
     return platform
 
 
 @router.get("/{platform_id}", response_model=Platform)
-def read_platform(
+async def read_platform(
     platform_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Get platform by ID.
     """
-    platform = get_platform(db, id=platform_id)
+    platform = await get_platform(db, id=platform_id)
     if not platform:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -82,16 +82,16 @@ def read_platform(
 
 
 @router.put("/{platform_id}", response_model=Platform)
-def update_user_platform(
+async def update_user_platform(
     platform_id: int,
     platform_in: PlatformUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Update platform.
     """
-    platform = get_platform(db, id=platform_id)
+    platform = await get_platform(db, id=platform_id)
     if not platform:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -105,20 +105,20 @@ def update_user_platform(
             detail="Access denied"
         )
     
-    platform = update_platform(db, db_obj=platform, obj_in=platform_in)
+    platform = await update_platform(db, db_obj=platform, obj_in=platform_in)
     return platform
 
 
 @router.delete("/{platform_id}", response_model=Platform)
-def delete_user_platform(
+async def delete_user_platform(
     platform_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Delete platform.
     """
-    platform = get_platform(db, id=platform_id)
+    platform = await get_platform(db, id=platform_id)
     if not platform:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -132,21 +132,21 @@ def delete_user_platform(
             detail="Access denied"
         )
     
-    platform = delete_platform(db, id=platform_id)
+    platform = await delete_platform(db, id=platform_id)
     return platform
 
 
 @router.post("/{platform_id}/verify", response_model=dict)
-def verify_credentials(
+async def verify_credentials(
     platform_id: int,
     credentials: PlatformCredentials,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Verify platform credentials.
     """
-    platform = get_platform(db, id=platform_id)
+    platform = await get_platform(db, id=platform_id)
     if not platform:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -165,15 +165,15 @@ def verify_credentials(
 
 
 @router.get("/{platform_id}/stats", response_model=PlatformWithStats)
-def platform_stats(
+async def platform_stats(
     platform_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Get platform statistics.
     """
-    platform = get_platform(db, id=platform_id)
+    platform = await get_platform(db, id=platform_id)
     if not platform:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -187,5 +187,5 @@ def platform_stats(
             detail="Access denied"
         )
     
-    stats = get_platform_stats(db, platform)
+    stats = await get_platform_stats(db, platform)
     return stats
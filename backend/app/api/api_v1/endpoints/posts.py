@@ -1,50 +1,61 @@
 """
 Social media post management endpoints.
 """
+import asyncio
 from typing import Any, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db
 from app.models.user import User as UserModel
+from app.schemas.bulk import BulkRequest
 from app.schemas.post import (
     Post,
+    PostBulkResult,
     PostCreate,
+    PostPage,
     PostUpdate,
-    PostWithPlatformDetails
+    PostWithPlatformDetails,
+    PublishJob
 )
 from app.services.auth import get_current_active_user
 from app.services.post import (
+    get_post_details,
     get_post,
     get_posts_by_user,
     create_post,
+    create_posts_bulk,
     update_post,
     delete_post,
-    publish_post,
+    start_publishing,
     get_post_analytics
 )
+from app.services.publisher import publish_pipeline
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[PostWithPlatformDetails])
-def read_posts(
-    skip: int = 0,
-    limit: int = 100,
+@router.get("", response_model=PostPage)
+async def read_posts(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     platform_id: Optional[int] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
-    Get all posts for current user with filtering options.
+    Get posts for current user, newest first, with filtering options.
+    
+    Pass the returned `next_cursor` as `cursor` to fetch the following page.
     """
-    posts = get_posts_by_user(
+    posts = await get_posts_by_user(
         db, 
         user_id=current_user.id, 
-        skip=skip, 
         limit=limit,
+        cursor=cursor,
         platform_id=platform_id,
         status=status
     )
@@ -52,28 +63,44 @@ def read_posts(
 
 
 @router.post("", response_model=Post)
-def create_user_post(
+async def create_user_post(
     post_in: PostCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Create a new post.
     """
-    post = create_post(db, obj_in=post_in, user_id=current_user.id)
+    post = await create_post(db, obj_in=post_in, user_id=current_user.id)
     return post
 
 
+@router.post("/bulk", response_model=PostBulkResult)
+async def create_user_posts_bulk(
+    bulk_in: BulkRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    Create many posts in one transaction.
+    
+    Valid items are created together; each invalid item is reported in
+    `errors` with its index in the request.
+    """
+    created, errors = await create_posts_bulk(db, items=bulk_in.items, user_id=current_user.id)
+    return {"created": created, "errors": errors}
+
+
 @router.get("/{post_id}", response_model=PostWithPlatformDetails)
-def read_post(
+async def read_post(
     post_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Get post by ID.
     """
-    post = get_post(db, id=post_id)
+    post = await get_post(db, id=post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -87,20 +114,20 @@ def read_post(
             detail="Access denied"
         )
     
-    return post
+    return await get_post_details(db, post)
 
 
 @router.put("/{post_id}", response_model=Post)
-def update_user_post(
+async def update_user_post(
     post_id: int,
     post_in: PostUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Update post.
     """
-    post = get_post(db, id=post_id)
+    post = await get_post(db, id=post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -121,20 +148,20 @@ def update_user_post(
             detail="Cannot update a published post"
         )
     
-    post = update_post(db, db_obj=post, obj_in=post_in)
+    post = await update_post(db, db_obj=post, obj_in=post_in)
     return post
 
 
 @router.delete("/{post_id}", response_model=Post)
-def delete_user_post(
+async def delete_user_post(
     post_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Delete post.
     """
-    post = get_post(db, id=post_id)
+    post = await get_post(db, id=post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -155,20 +182,22 @@ def delete_user_post(
             detail="Cannot delete a published post"
         )
     
-    post = delete_post(db, id=post_id)
+    post = await delete_post(db, id=post_id)
     return post
 
 
-@router.post("/{post_id}/publish", response_model=Post)
-def publish_user_post(
+@router.post("/{post_id}/publish", response_model=PublishJob, status_code=status.HTTP_202_ACCEPTED)
+async def publish_user_post(
     post_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
-    Publish a post immediately.
+    Queue a post for immediate publishing.
+    
+    Poll `/posts/publish-jobs/{job_id}` with the returned job id for the outcome.
     """
-    post = get_post(db, id=post_id)
+    post = await get_post(db, id=post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -189,20 +218,51 @@ def publish_user_post(
             detail="Post is already published"
         )
     
-    post = publish_post(db, post)
-    return post
+    # Claim the post before queueing it so a fast worker can't be overwritten
+    previous_status = post.status
+    if not await start_publishing(db, post, settings.PUBLISH_LEASE_SECONDS):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Post is already being published"
+        )
+    try:
+        job = publish_pipeline.submit(post)
+    except asyncio.QueueFull:
+        await update_post(db, db_obj=post, obj_in={"status": previous_status})
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Publishing queue is full, try again later"
+        )
+    return job
+
+
+@router.get("/publish-jobs/{job_id}", response_model=PublishJob)
+async def read_publish_job(
+    job_id: str,
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the status of a publish job.
+    """
+    job = publish_pipeline.get_job(job_id)
+    if not job or (job.user_id != current_user.id and not current_user.is_admin):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Publish job not found"
+        )
+    return job
 
 
 @router.get("/{post_id}/analytics", response_model=dict)
-def get_post_metrics(
+async def get_post_metrics(
     post_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Get analytics for a specific post.
     """
-    post = get_post(db, id=post_id)
+    post = await get_post(db, id=post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -223,5 +283,5 @@ def get_post_metrics(
             detail="Cannot get analytics for an unpublished post"
         )
     
-    analytics = get_post_analytics(db, post)
+    analytics = await get_post_analytics(db, post)
     return analytics
@@ -5,48 +5,56 @@ from typing import Any, List, Optional
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User as UserModel
+from app.schemas.bulk import BulkRequest
 from app.schemas.schedule import (
     Schedule,
+    ScheduleBulkResult,
     ScheduleCreate,
+    SchedulePage,
     ScheduleUpdate,
     ScheduleWithPostDetails
 )
 from app.services.auth import get_current_active_user
 from app.services.schedule import (
+    get_schedule_details,
     get_schedule,
     get_schedules_by_user,
     create_schedule,
+    create_schedules_bulk,
     update_schedule,
     delete_schedule,
-    get_upcoming_schedules
+    get_upcoming_schedules,
+    get_next_occurrences
 )
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[ScheduleWithPostDetails])
-def read_schedules(
-    skip: int = 0,
-    limit: int = 100,
+@router.get("", response_model=SchedulePage)
+async def read_schedules(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     platform_id: Optional[int] = None,
     status: Optional[str] = None,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
-    Get all schedules for current user with filtering options.
+    Get schedules for current user, soonest first, with filtering options.
+    
+    Pass the returned `next_cursor` as `cursor` to fetch the following page.
     """
-    schedules = get_schedules_by_user(
+    schedules = await get_schedules_by_user(
         db, 
         user_id=current_user.id, 
-        skip=skip, 
         limit=limit,
+        cursor=cursor,
         platform_id=platform_id,
         status=status,
         from_date=from_date,
@@ -56,41 +64,57 @@ def read_schedules(
 
 
 @router.post("", response_model=Schedule)
-def create_user_schedule(
+async def create_user_schedule(
     schedule_in: ScheduleCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Create a new schedule.
     """
-    schedule = create_schedule(db, obj_in=schedule_in, user_id=current_user.id)
+    schedule = await create_schedule(db, obj_in=schedule_in, user_id=current_user.id)
     return schedule
 
 
+@router.post("/bulk", response_model=ScheduleBulkResult)
+async def create_user_schedules_bulk(
+    bulk_in: BulkRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    Create many schedules in one transaction.
+    
+    Valid items are created together; each invalid item is reported in
+    `errors` with its index in the request.
+    """
+    created, errors = await create_schedules_bulk(db, items=bulk_in.items, user_id=current_user.id)
+    return {"created": created, "errors": errors}
+
+
 @router.get("/upcoming", response_model=List[ScheduleWithPostDetails])
-def upcoming_schedules(
+async def upcoming_schedules(
     days: int = 7,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Get upcoming schedules for the next specified days.
     """
-    schedules = get_upcoming_schedules(db, user_id=current_user.id, days=days)
+    schedules = await get_upcoming_schedules(db, user_id=current_user.id, days=days)
     return schedules
 
 
 @router.get("/{schedule_id}", response_model=ScheduleWithPostDetails)
-def read_schedule(
+async def read_schedule(
     schedule_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Get schedule by ID.
     """
-    schedule = get_schedule(db, id=schedule_id)
+    schedule = await get_schedule(db, id=schedule_id)
     if not schedule:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -104,20 +128,47 @@ def read_schedule(
             detail="Access denied"
         )
     
-    return schedule
+    return await get_schedule_details(db, schedule)
+
+
+@router.get("/{schedule_id}/occurrences", response_model=List[datetime])
+async def read_schedule_occurrences(
+    schedule_id: int,
+    count: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the next occurrences of a schedule.
+    """
+    schedule = await get_schedule(db, id=schedule_id)
+    if not schedule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Schedule not found"
+        )
+    
+    # Check if user has access to this schedule
+    if schedule.user_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return get_next_occurrences(schedule, count)
 
 
 @router.put("/{schedule_id}", response_model=Schedule)
-def update_user_schedule(
+async def update_user_schedule(
     schedule_id: int,
     schedule_in: ScheduleUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Update schedule.
     """
-    schedule = get_schedule(db, id=schedule_id)
+    schedule = await get_schedule(db, id=schedule_id)
     if not schedule:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -138,20 +189,20 @@ def update_user_schedule(
             detail="Cannot update a completed schedule"
         )
     
-    schedule = update_schedule(db, db_obj=schedule, obj_in=schedule_in)
+    schedule = await update_schedule(db, db_obj=schedule, obj_in=schedule_in)
     return schedule
 
 
 @router.delete("/{schedule_id}", response_model=Schedule)
-def delete_user_schedule(
+async def delete_user_schedule(
     schedule_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Delete schedule.
     """
-    schedule = get_schedule(db, id=schedule_id)
+    schedule = await get_schedule(db, id=schedule_id)
     if not schedule:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -172,5 +223,5 @@ def delete_user_schedule(
             detail="Cannot delete a completed schedule"
         )
     
-    schedule = delete_schedule(db, id=schedule_id)
+    schedule = await delete_schedule(db, id=schedule_id)
     return schedule
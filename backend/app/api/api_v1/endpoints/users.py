@@ -1,14 +1,14 @@
 """
 User management endpoints.
 """
-from typing import Any, List
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User as UserModel
-from app.schemas.user import User, UserCreate, UserUpdate
+from app.schemas.user import User, UserCreate, UserPage, UserUpdate
 from app.services.auth import get_current_active_user
 from app.services.user import get_user, get_users, update_user, delete_user
 
@@ -16,7 +16,7 @@ router = APIRouter()
 
 
 @router.get("/me", response_model=User)
-def read_current_user(
+async def read_current_user(
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -26,27 +26,29 @@ def read_current_user(
 
 
 @router.put("/me", response_model=User)
-def update_current_user(
+async def update_current_user(
     user_in: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
     Update current user.
     """
-    user = update_user(db, db_obj=current_user, obj_in=user_in)
+    user = await update_user(db, db_obj=current_user, obj_in=user_in)
     return user
 
 
-@router.get("", response_model=List[User])
-def read_users(
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db),
+@router.get("", response_model=UserPage)
+async def read_users(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
-    Retrieve users.
+    Retrieve users in signup order.
+    
+    Pass the returned `next_cursor` as `cursor` to fetch the following page.
     """
     # Check if user is admin or has proper permissions
     if not current_user.is_admin:
@@ -54,14 +56,14 @@ def read_users(
             status_code=status.HTTP_403_FORBIDDEN, 
             detail="Insufficient permissions"
         )
-    users = get_users(db, skip=skip, limit=limit)
+    users = await get_users(db, limit=limit, cursor=cursor)
     return users
 
 
 @router.get("/{user_id}", response_model=User)
-def read_user(
+async def read_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -74,7 +76,7 @@ def read_user(
             detail="Insufficient permissions"
         )
     
-    user = get_user(db, id=user_id)
+    user = await get_user(db, id=user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -84,9 +86,9 @@ def read_user(
 
 
 @router.delete("/{user_id}", response_model=User)
-def remove_user(
+async def remove_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -99,12 +101,12 @@ def remove_user(
             detail="Insufficient permissions"
         )
     
-    user = get_user(db, id=user_id)
+    user = await get_user(db, id=user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    user = delete_user(db, id=user_id)
+    user = await delete_user(db, id=user_id)
     return user
@@ -0,0 +1,346 @@
+"""
+Gateway to the OpenAI-compatible chat completions API.
+
+All AI requests in a process share one pooled ``httpx.AsyncClient`` and are
+throttled twice: a global semaphore caps concurrent upstream calls and a
+per-user semaphore stops one user from taking all of them. Identical
+requests already in flight are coalesced, so callers asking for the same
+completion at the same time share a single upstream call. Failed calls are
+retried with jittered exponential backoff.
+
+Pointing ``OPENAI_BASE_URL`` at a local fake server makes the whole path
+testable without network access.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+
+
+def request_key(body: Dict[str, Any]) -> str:
+    """Digest identifying a request body, used to coalesce identical calls."""
+    normalized = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Seconds to wait before retrying, using full jitter."""
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX_SECONDS)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def _error_details(response: httpx.Response) -> Tuple[str, bool, Optional[float]]:
+    """Error message, retryability and Retry-After of a failed response."""
+    header = response.headers.get("Retry-After")
+    return (
+        f"AI provider returned {response.status_code}: {response.text[:200]}",
+        response.status_code in RETRYABLE_STATUS_CODES,
+        float(header) if header and header.isdigit() else None,
+    )
+
+
+class AIGateway:
+    """
+    Pooled, rate-limited client for chat completions.
+
+    Callers wait for a slot rather than failing outright, but only for
+    ``queue_timeout`` seconds; past that a user at their own limit gets a
+    429 and everyone else a 503.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_concurrency_per_user: int,
+        max_attempts: int,
+        queue_timeout: float,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_user = max_concurrency_per_user
+        self.max_attempts = max_attempts
+        self.queue_timeout = queue_timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._user_semaphores: Dict[int, asyncio.Semaphore] = {}
+        self._user_waiters: Dict[int, int] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.running = 0
+        self.requests = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self.total_upstream = 0.0
+
+    def get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client, creating it on first use."""
+        if self._client is None:
+            if not settings.OPENAI_API_KEY:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="AI features are not configured"
+                )
+            self._client = httpx.AsyncClient(
+                base_url=settings.OPENAI_BASE_URL,
+                headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+                timeout=settings.OPENAI_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _acquire(self, semaphore: asyncio.Semaphore, status_code: int, detail: str) -> None:
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(status_code=status_code, detail=detail, headers={"Retry-After": "1"})
+
+    @asynccontextmanager
+    async def _user_slot(self, user_id: int) -> AsyncIterator[None]:
+        """Hold one of a user's concurrent request slots."""
+        semaphore = self._user_semaphores.get(user_id)
+        if semaphore is None:
+            semaphore = self._user_semaphores[user_id] = asyncio.Semaphore(self.max_concurrency_per_user)
+        self._user_waiters[user_id] = self._user_waiters.get(user_id, 0) + 1
+        try:
+            await self._acquire(
+                semaphore,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Too many concurrent AI requests, try again shortly",
+            )
+            try:
+                yield
+            finally:
+                semaphore.release()
+        finally:
+            self._user_waiters[user_id] -= 1
+            if not self._user_waiters[user_id]:
+                del self._user_waiters[user_id]
+                del self._user_semaphores[user_id]
+
+    async def complete(self, user_id: int, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a chat completion request for a user, returning the response body.
+
+        ``body`` is sent as-is, so it must not contain per-user fields if
+        identical requests from different users are to be coalesced.
+        """
+        self.requests += 1
+        async with self._user_slot(user_id):
+            key = request_key(body)
+            task = self._inflight.get(key)
+            if task is None:
+                task = self._inflight[key] = asyncio.create_task(self._call(body))
+                task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            else:
+                self.coalesced += 1
+            # Shielded so a disconnecting caller doesn't cancel the call for
+            # everyone sharing it
+            return await asyncio.shield(task)
+
+    async def _call(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        await self._acquire(
+            self._semaphore,
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            "AI service is busy, try again shortly",
+        )
+        self.running += 1
+        try:
+            return await self._send(body)
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    async def _retry_or_raise(
+        self, attempt: int, error: str, retryable: bool, retry_after: Optional[float] = None
+    ) -> None:
+        """Wait before retrying a failed upstream call, or give up with a 502."""
+        if not retryable or attempt >= self.max_attempts:
+            self.failures += 1
+            logger.warning("%s (attempt %s)", error, attempt)
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=error)
+        self.retries += 1
+        await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+    async def _send(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        client = self.get_client()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.upstream_calls += 1
+            started_at = time.perf_counter()
+            try:
+                response = await client.post("/chat/completions", json=body)
+            except httpx.HTTPError as exc:
+                await self._retry_or_raise(attempt, f"AI request failed: {exc}", True)
+                continue
+            finally:
+                self.total_upstream += time.perf_counter() - started_at
+
+            if response.status_code >= 400:
+                await self._retry_or_raise(attempt, *_error_details(response))
+                continue
+            try:
+                return response.json()
+            except ValueError:
+                # e.g. a proxy's HTML error page, or a truncated body
+                await self._retry_or_raise(
+                    attempt, f"AI provider returned a malformed response: {response.text[:200]}", False
+                )
+
+    async def _stream(self, body: Dict[str, Any]) -> AsyncIterator[str]:
+        client = self.get_client()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.upstream_calls += 1
+            started_at = time.perf_counter()
+            streamed = False
+            try:
+                async with client.stream("POST", "/chat/completions", json=body) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        failure = _error_details(response)
+                    else:
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                break
+                            try:
+                                text = json.loads(data)["choices"][0]["delta"].get("content")
+                            except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+                                continue
+                            if text:
+                                streamed = True
+                                yield text
+                        return
+            except httpx.HTTPError as exc:
+                if streamed:
+                    # Part of the reply has already been passed on
+                    self.failures += 1
+                    raise HTTPException(
+                        status_code=status.HTTP_502_BAD_GATEWAY,
+                        detail=f"AI stream interrupted: {exc}"
+                    )
+                failure = (f"AI request failed: {exc}", True)
+            finally:
+                self.total_upstream += time.perf_counter() - started_at
+            await self._retry_or_raise(attempt, *failure)
+
+    async def chat(
+        self,
+        user_id: int,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_response: bool = False,
+    ) -> str:
+        """Run a chat completion and return the reply's text."""
+        body: Dict[str, Any] = {
+            "model": settings.OPENAI_MODEL,
+            "messages": messages,
+            "temperature": temperature,
+        }
+        if max_tokens:
+            body["max_tokens"] = max_tokens
+        if json_response:
+            body["response_format"] = {"type": "json_object"}
+
+        data = await self.complete(user_id, body)
+        try:
+            return data["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="AI provider returned an unexpected response"
+            )
+
+    async def stream_chat(
+        self,
+        user_id: int,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Run a chat completion, yielding the reply's text as it is generated.
+
+        Streams are not coalesced; each holds its user and global slots
+        until it finishes. Failures are retried until text has been yielded.
+        """
+        body: Dict[str, Any] = {
+            "model": settings.OPENAI_MODEL,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True,
+        }
+        if max_tokens:
+            body["max_tokens"] = max_tokens
+
+        self.requests += 1
+        async with self._user_slot(user_id):
+            await self._acquire(
+                self._semaphore,
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "AI service is busy, try again shortly",
+            )
+            self.running += 1
+            try:
+                async for text in self._stream(body):
+                    yield text
+            finally:
+                self.running -= 1
+                self._semaphore.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        calls = self.upstream_calls
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_concurrency_per_user": self.max_concurrency_per_user,
+            "running": self.running,
+            "inflight_requests": len(self._inflight),
+            "active_users": len(self._user_semaphores),
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "upstream_calls": calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "avg_upstream_ms": round(self.total_upstream / calls * 1000, 3) if calls else 0.0,
+        }
+
+
+ai_gateway = AIGateway(
+    max_concurrency=settings.AI_MAX_CONCURRENCY,
+    max_concurrency_per_user=settings.AI_MAX_CONCURRENCY_PER_USER,
+    max_attempts=settings.AI_MAX_ATTEMPTS,
+    queue_timeout=settings.AI_QUEUE_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,208 @@
+"""
+Redis-backed response cache.
+
+Entries are invalidated with generation counters rather than by deleting
+keys: every cached key embeds the current generation of the scope it was
+computed from (a platform or a user), so bumping that generation makes all
+of the scope's entries unreachable in O(1). Stale entries then age out
+through their TTLs.
+
+The cache is an optimisation only. If Redis is unreachable, callers fall
+back to computing results directly and the cache stays off for a short
+cool-down instead of adding a connection timeout to every request.
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+import redis.asyncio as redis
+from fastapi.encoders import jsonable_encoder
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_AFTER_FAILURE_SECONDS = 30
+
+_client: Optional[redis.Redis] = None
+_disabled_until = 0.0
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Get the shared Redis client, or None while caching is unavailable."""
+    global _client
+    if not settings.CACHE_ENABLED or time.monotonic() < _disabled_until:
+        return None
+    if _client is None:
+        _client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD,
+            db=settings.REDIS_DB,
+            socket_timeout=settings.CACHE_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT,
+            # Fail fast: a miss is cheaper than retrying a struggling server
+            retry=Retry(NoBackoff(), 0),
+        )
+    return _client
+
+
+async def close_cache() -> None:
+    """Close the shared Redis client."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _disable(exc: Exception) -> None:
+    global _disabled_until
+    logger.warning("Redis unavailable, caching disabled for %ss: %s", RETRY_AFTER_FAILURE_SECONDS, exc)
+    _disabled_until = time.monotonic() + RETRY_AFTER_FAILURE_SECONDS
+
+
+def platform_scope(platform_id: int) -> str:
+    """Invalidation scope for data derived from one platform."""
+    return f"platform:{platform_id}"
+
+
+def user_scope(user_id: int) -> str:
+    """Invalidation scope for data derived from all of a user's platforms."""
+    return f"user:{user_id}"
+
+
+def cache_key(namespace: str, user_id: int, generation: int, params: Dict[str, Any]) -> str:
+    """Build a cache key from a namespace, user and normalized parameters."""
+    normalized = json.dumps(jsonable_encoder(params), sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha1(normalized.encode()).hexdigest()
+    return f"cache:{namespace}:{user_id}:{generation}:{digest}"
+
+
+async def get_generation(client: redis.Redis, scope: str) -> int:
+    value = await client.get(f"cache:gen:{scope}")
+    return int(value) if value else 0
+
+
+async def get_json(key: str) -> Any:
+    """Get a JSON value from Redis, or None if missing or unavailable."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        cached = await client.get(key)
+    except redis.RedisError as exc:
+        _disable(exc)
+        return None
+    return json.loads(cached) if cached is not None else None
+
+
+async def set_json(key: str, value: Any, ttl: int) -> None:
+    """Store a JSON-compatible value in Redis, if available."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.set(key, json.dumps(jsonable_encoder(value)), ex=ttl)
+    except redis.RedisError as exc:
+        _disable(exc)
+
+
+async def delete_keys(*keys: str) -> None:
+    """Delete keys from Redis, if available."""
+    client = get_redis()
+    if client is None or not keys:
+        return
+    try:
+        await client.delete(*keys)
+    except redis.RedisError as exc:
+        _disable(exc)
+
+
+async def bump_generations(scopes: Iterable[str]) -> None:
+    """Invalidate every cache entry computed from the given scopes."""
+    scopes = list(scopes)
+    client = get_redis()
+    if client is None or not scopes:
+        return
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            for scope in scopes:
+                pipe.incr(f"cache:gen:{scope}")
+            await pipe.execute()
+    except redis.RedisError as exc:
+        _disable(exc)
+
+
+async def get_or_compute(
+    namespace: str,
+    scope: str,
+    user_id: int,
+    params: Dict[str, Any],
+    ttl: int,
+    compute: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Return a cached JSON-compatible result, computing and storing it on a miss.
+
+    Hits are returned as decoded JSON, so datetimes come back as ISO strings;
+    that is what the API serialises them to anyway.
+    """
+    client = get_redis()
+    if client is None:
+        return await compute()
+
+    try:
+        key = cache_key(namespace, user_id, await get_generation(client, scope), params)
+        cached = await client.get(key)
+    except redis.RedisError as exc:
+        _disable(exc)
+        return await compute()
+    if cached is not None:
+        return json.loads(cached)
+
+    result = await compute()
+    try:
+        await client.set(key, json.dumps(jsonable_encoder(result)), ex=ttl)
+    except redis.RedisError as exc:
+        _disable(exc)
+    return result
@@ -23,14 +23,42 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: PostgresDsn
     
+    # Database connection pool (applies per engine, per process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 disables the server-side timeout
+    
     # JWT
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12  # Existing hashes are upgraded on next login
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # Defaults to the CPU count
+    PASSWORD_HASH_MAX_WAITING: int = 64  # Further requests get a 503
+    
     # OpenAI
     OPENAI_API_KEY: Optional[str] = None
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"  # Any OpenAI-compatible API
+    OPENAI_MODEL: str = "gpt-4o-mini"
+    OPENAI_TIMEOUT_SECONDS: float = 60.0
+    OPENAI_MAX_CONNECTIONS: int = 100
+    
+    # AI gateway
+    AI_MAX_CONCURRENCY: int = 50  # Concurrent upstream calls per process
+    AI_MAX_CONCURRENCY_PER_USER: int = 4
+    AI_MAX_ATTEMPTS: int = 3
+    AI_QUEUE_TIMEOUT_SECONDS: float = 10.0  # Longer waits for a slot are rejected
+    
+    # AI result cache
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_SIZE: int = 5000  # In-process entries; Redis holds the rest
+    AI_CACHE_TOPIC_SIMILARITY: float = 0.0  # e.g. 0.8 reuses results for near-identical topics; 0 disables
     
     # Redis
     REDIS_HOST: str = "localhost"
@@ -38,6 +66,50 @@ class Settings(BaseSettings):
     REDIS_PASSWORD: Optional[str] = None
     REDIS_DB: int = 0
     
+    # Response cache
+    CACHE_ENABLED: bool = True
+    CACHE_SOCKET_TIMEOUT: float = 0.25  # seconds; the cache is skipped when Redis is slow
+    
+    # Authenticated user cache
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: int = 30  # Bounds staleness of other nodes' in-process entries
+    AUTH_CACHE_REDIS: bool = False  # Share entries between processes through Redis
+    
+    # Publishing scheduler worker
+    SCHEDULER_POLL_SECONDS: int = 15
+    SCHEDULER_BATCH_SIZE: int = 50
+    SCHEDULER_LEASE_SECONDS: int = 600  # Claims not renewed for this long are retried
+    
+    # Publishing pipeline
+    PUBLISH_WORKERS: int = 100
+    PUBLISH_QUEUE_SIZE: int = 10000
+    PUBLISH_JOB_HISTORY: int = 10000  # Finished jobs kept for status lookups
+    PUBLISH_MAX_ATTEMPTS: int = 3
+    PUBLISH_MAX_CONNECTIONS: int = 50  # Per platform type
+    PUBLISH_TIMEOUT_SECONDS: float = 30.0
+    PUBLISH_LEASE_SECONDS: int = 600  # Posts left "publishing" without renewal for this long are failed
+    PUBLISH_API_BASE_URL: Optional[str] = None  # Overrides every platform API (publishing and metrics sync), e.g. for a mock
+    
+    # Metrics sync worker
+    SYNC_INTERVAL_SECONDS: int = 900  # How stale an account's metrics may get
+    SYNC_POLL_SECONDS: int = 60
+    SYNC_BATCH_SIZE: int = 200
+    SYNC_CONCURRENCY: int = 10  # Platforms synced at once per replica; keep within the DB pool
+    SYNC_BACKFILL_DAYS: int = 30  # History fetched on an account's first sync
+    SYNC_SHARD_COUNT: int = 1
+    SYNC_SHARD_INDEX: int = 0  # This replica's shard, from 0 to SYNC_SHARD_COUNT - 1
+    
+    # Metric partitions (maintained by the shard 0 metrics sync replica)
+    METRICS_PARTITION_MONTHS_AHEAD: int = 3
+    METRICS_RETENTION_MONTHS: int = 24  # Raw samples kept; 0 keeps them forever (rollups are kept either way)
+    METRICS_MAINTENANCE_HOURS: int = 24
+    
+    # Analytics exports
+    EXPORT_DIR: str = "exports"  # Shared by every API process (a shared volume across hosts)
+    EXPORT_BATCH_SIZE: int = 2000  # Rows fetched per server-side cursor round trip
+    EXPORT_BACKGROUND_ROWS: int = 50000  # Larger exports run as background jobs
+    EXPORT_TTL_SECONDS: int = 24 * 60 * 60  # Export files and job status are kept this long
+    
     # Social Media API Keys
     # Twitter
     TWITTER_API_KEY: Optional[str] = None
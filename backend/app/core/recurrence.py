@@ -0,0 +1,172 @@
+"""
+Recurrence rules for repeating schedules.
+
+A recurring schedule is stored as a single row: the wall-clock time of its
+first occurrence (the anchor), its timezone and a rule. Occurrences are
+generated lazily from those, so a series never needs one row per occurrence.
+
+Rules use a small subset of RFC 5545 RRULE syntax, e.g.
+``FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH;COUNT=10``. ``UNTIL`` is a timestamp in
+RFC 5545 (``20261231T000000Z``) or ISO form, taken as UTC unless it carries
+an offset.
+"""
+from calendar import monthrange
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterator, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+RFC_UNTIL_FORMATS = ("%Y%m%dT%H%M%SZ", "%Y%m%dT%H%M%S", "%Y%m%d")
+
+
+class RecurrenceRule(NamedTuple):
+    """A parsed recurrence rule."""
+    freq: str
+    interval: int = 1
+    byday: Tuple[int, ...] = ()
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+
+
+def get_zone(name: str) -> ZoneInfo:
+    """Look up an IANA timezone, raising ValueError for unknown names."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+def parse_until(value: str) -> datetime:
+    """Parse an UNTIL timestamp into naive UTC, like the occurrences it bounds."""
+    for format in RFC_UNTIL_FORMATS:
+        try:
+            return datetime.strptime(value, format)
+        except ValueError:
+            pass
+    # fromisoformat only accepts a "Z" suffix from Python 3.11
+    until = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    if until.tzinfo is not None:
+        until = until.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    return until
+
+
+def parse_rule(recurrence: str, rule: Optional[str] = None) -> RecurrenceRule:
+    """
+    Parse a schedule's recurrence into a rule.
+
+    ``recurrence`` is one of daily, weekly, monthly or custom; custom requires
+    a rule with FREQ, the others may refine their frequency with one.
+    """
+    parts = {}
+    for part in filter(None, (rule or "").split(";")):
+        key, sep, value = part.partition("=")
+        if not sep or not value:
+            raise ValueError(f"Invalid recurrence rule part: {part}")
+        parts[key.strip().upper()] = value.strip()
+
+    unknown = set(parts) - {"FREQ", "INTERVAL", "BYDAY", "COUNT", "UNTIL"}
+    if unknown:
+        raise ValueError(f"Unsupported recurrence rule parts: {', '.join(sorted(unknown))}")
+
+    freq = parts.get("FREQ", "").lower() or recurrence
+    if recurrence != "custom" and freq != recurrence:
+        raise ValueError("Recurrence rule FREQ does not match the recurrence pattern")
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Recurrence rule FREQ must be one of: {', '.join(f.upper() for f in FREQUENCIES)}")
+
+    try:
+        interval = int(parts.get("INTERVAL", 1))
+        count = int(parts["COUNT"]) if "COUNT" in parts else None
+        until = parse_until(parts["UNTIL"]) if "UNTIL" in parts else None
+    except ValueError:
+        raise ValueError("Invalid INTERVAL, COUNT or UNTIL in recurrence rule")
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError("INTERVAL and COUNT must be positive")
+
+    byday = ()
+    if "BYDAY" in parts:
+        if freq != "weekly":
+            raise ValueError("BYDAY is only supported for weekly recurrence")
+        try:
+            byday = tuple(sorted({WEEKDAYS.index(day.strip().upper()) for day in parts["BYDAY"].split(",")}))
+        except ValueError:
+            raise ValueError(f"BYDAY must list days from: {', '.join(WEEKDAYS)}")
+
+    return RecurrenceRule(freq, interval, byday, count, until)
+
+
+def to_local(value: datetime, zone: ZoneInfo) -> datetime:
+    """Convert a naive UTC timestamp to naive wall-clock time in a zone."""
+    return value.replace(tzinfo=dt_timezone.utc).astimezone(zone).replace(tzinfo=None)
+
+
+def to_utc(value: datetime, zone: ZoneInfo) -> datetime:
+    """Convert naive wall-clock time in a zone to a naive UTC timestamp."""
+    # Ambiguous times (clocks going back) resolve to their first instance and
+    # times skipped by clocks going forward land on the post-transition hour.
+    return value.replace(tzinfo=zone).astimezone(dt_timezone.utc).replace(tzinfo=None)
+
+
+def _first_step(anchor: datetime, rule: RecurrenceRule, after: datetime) -> int:
+    """A step at or before the first occurrence after a local time."""
+    if after <= anchor:
+        return 0
+    if rule.freq == "monthly":
+        months = (after.year - anchor.year) * 12 + after.month - anchor.month
+        return max(0, months // rule.interval - 1)
+    days = (after - anchor).days
+    if rule.freq == "weekly":
+        days //= 7
+    return max(0, days // rule.interval - 1)
+
+
+def _local_occurrences(anchor: datetime, rule: RecurrenceRule, step: int) -> Iterator[datetime]:
+    """Wall-clock occurrences of a rule, starting from a step."""
+    while True:
+        if rule.freq == "daily":
+            yield anchor + timedelta(days=step * rule.interval)
+        elif rule.freq == "weekly" and rule.byday:
+            week = anchor - timedelta(days=anchor.weekday()) + timedelta(weeks=step * rule.interval)
+            for weekday in rule.byday:
+                occurrence = week + timedelta(days=weekday)
+                if occurrence >= anchor:
+                    yield occurrence
+        elif rule.freq == "weekly":
+            yield anchor + timedelta(weeks=step * rule.interval)
+        else:
+            month = anchor.month - 1 + step * rule.interval
+            year, month = anchor.year + month // 12, month % 12 + 1
+            # Days past the end of a short month fall back to its last day
+            day = min(anchor.day, monthrange(year, month)[1])
+            yield anchor.replace(year=year, month=month, day=day)
+        step += 1
+
+
+def iter_occurrences(
+    anchor: datetime,
+    zone_name: str,
+    rule: RecurrenceRule,
+    after: datetime,
+) -> Iterator[datetime]:
+    """
+    Lazily yield the UTC occurrences of a series strictly after a UTC time.
+
+    ``anchor`` is the wall-clock time of the first occurrence in the series'
+    timezone, so the local posting time stays fixed across DST changes.
+    COUNT bounds the series as a whole: occurrences at or before ``after``
+    still count against it, so resuming a series never runs it past its
+    COUNT-th occurrence.
+    """
+    zone = get_zone(zone_name)
+    # Counting needs every occurrence from the anchor on
+    step = 0 if rule.count else _first_step(anchor, rule, to_local(after, zone))
+    for index, local in enumerate(_local_occurrences(anchor, rule, step)):
+        if rule.count and index >= rule.count:
+            return
+        occurrence = to_utc(local, zone)
+        if occurrence <= after:
+            continue
+        if rule.until and occurrence > rule.until:
+            return
+        yield occurrence
@@ -1,16 +1,105 @@
 """
 Security utilities for authentication and authorization.
 """
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context. Hashes made with other rounds are flagged for
+# update, so changing BCRYPT_ROUNDS rehashes passwords as users log in.
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+
+class HashingPool:
+    """
+    Runs password hashing on worker threads with bounded concurrency.
+
+    bcrypt releases the GIL while hashing, so threads keep the event loop
+    free without the overhead of a process pool. Callers beyond the worker
+    count wait in line; once ``max_waiting`` are waiting, new callers are
+    turned away with a 503 rather than queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_waiting: int) -> None:
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._semaphore = asyncio.Semaphore(workers)
+        self.running = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        wait = started_at - queued_at
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.running += 1
+
+        def finished(_: asyncio.Future) -> None:
+            self.running -= 1
+            self.completed += 1
+            self.total_run += time.perf_counter() - started_at
+            self._semaphore.release()
+
+        # A cancelled caller (e.g. a client disconnect) can't stop the thread,
+        # so the permit is only released once the hash itself has finished
+        future = asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        future.add_done_callback(finished)
+        return await asyncio.shield(future)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 3) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "avg_hash_ms": round(self.total_run / self.completed * 1000, 3) if self.completed else 0.0,
+        }
+
+
+hashing_pool = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    max_waiting=settings.PASSWORD_HASH_MAX_WAITING,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -23,6 +112,23 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def hash_password(password: str) -> str:
+    """Generate a password hash on the hashing pool."""
+    return await hashing_pool.run(pwd_context.hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the hashing pool.
+
+    Returns whether it matched and, if the stored hash uses outdated
+    settings, a replacement hash to store.
+    """
+    return await hashing_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     if expires_delta:
@@ -5,7 +5,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.api_v1.api import api_router
+from app.core.ai_gateway import ai_gateway
+from app.core.cache import close_cache
 from app.core.config import settings
+from app.services.publisher import publish_pipeline
 
 app = FastAPI(
     title="Social Media Manager API",
@@ -30,6 +33,30 @@ if settings.CORS_ORIGINS:
 app.include_router(api_router, prefix=settings.API_PREFIX)
 
 
+@app.on_event("startup")
+async def start_publish_pipeline():
+    """Start the background publishing workers."""
+    await publish_pipeline.start()
+
+
+@app.on_event("shutdown")
+async def stop_publish_pipeline():
+    """Stop the background publishing workers."""
+    await publish_pipeline.stop()
+
+
+@app.on_event("shutdown")
+async def close_cache_connection():
+    """Close the Redis cache connection."""
+    await close_cache()
+
+
+@app.on_event("shutdown")
+async def close_ai_gateway():
+    """Close the AI provider connection pool."""
+    await ai_gateway.close()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
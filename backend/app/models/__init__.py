@@ -5,6 +5,18 @@ from app.models.user import User
 from app.models.platform import Platform, PlatformMetric
 from app.models.post import Post, PostMetric
 from app.models.schedule import Schedule
+from app.models.rollup import (
+    AudienceSnapshot,
+    PlatformMetricRollup,
+    PostMetricRollup,
+    PostingTimeSlot,
+    PostPerformance,
+    UserAudienceSnapshot,
+)
 
 # For Alembic migrations
-__all__ = ["User", "Platform", "PlatformMetric", "Post", "PostMetric", "Schedule"]
+__all__ = [
+    "User", "Platform", "PlatformMetric", "Post", "PostMetric", "Schedule",
+    "PlatformMetricRollup", "PostMetricRollup", "PostingTimeSlot", "PostPerformance",
+    "AudienceSnapshot", "UserAudienceSnapshot",
+]
@@ -2,7 +2,7 @@
 Platform model for database representation.
 """
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, JSON
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, JSON
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -11,6 +11,9 @@ from app.core.database import Base
 class Platform(Base):
     """Platform model for social media accounts."""
     __tablename__ = "platforms"
+    __table_args__ = (
+        Index("ix_platforms_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -32,10 +35,16 @@ class Platform(Base):
 class PlatformMetric(Base):
     """Platform metrics model to track analytics over time."""
     __tablename__ = "platform_metrics"
-
-    id = Column(Integer, primary_key=True, index=True)
+    __table_args__ = (
+        Index("uq_platform_metrics_platform_date", "platform_id", "date", unique=True),
+        # Partitioned by month; see app.services.partitions
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
+
+    # The partition key has to be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     platform_id = Column(Integer, ForeignKey("platforms.id", ondelete="CASCADE"), nullable=False)
-    date = Column(DateTime, default=datetime.utcnow)
+    date = Column(DateTime, primary_key=True, default=datetime.utcnow)
     followers_count = Column(Integer, default=0)
     following_count = Column(Integer, default=0)
     posts_count = Column(Integer, default=0)
@@ -2,7 +2,7 @@
 Post model for database representation.
 """
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, ARRAY, JSON
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, ARRAY, JSON, text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -11,6 +11,18 @@ from app.core.database import Base
 class Post(Base):
     """Post model for social media content."""
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_user_platform_status", "user_id", "platform_id", "status"),
+        Index("ix_posts_user_status", "user_id", "status"),
+        Index("ix_posts_platform_published_at", "platform_id", "published_at"),
+        Index("ix_posts_user_created_at_id", "user_id", "created_at", "id"),
+        # Lets the publishing pipeline find abandoned publish claims
+        Index(
+            "ix_posts_publishing_claimed_at",
+            "publish_claimed_at",
+            postgresql_where=text("status = 'publishing'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -21,11 +33,15 @@ class Post(Base):
     mentions = Column(ARRAY(String))
     media_urls = Column(ARRAY(String))
     og_url = Column(String)  # Open Graph URL for link previews
-    status = Column(String(20), default="draft")  # draft, scheduled, published, failed
+    status = Column(String(20), default="draft")  # draft, scheduled, publishing, published, failed
     external_id = Column(String)  # ID of the post on the social platform
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Part of the keyset pagination cursor, so it is never NULL
+    created_at = Column(
+        DateTime, nullable=False, default=datetime.utcnow, server_default=text("(now() AT TIME ZONE 'utc')")
+    )
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     published_at = Column(DateTime)  # When the post was published
+    publish_claimed_at = Column(DateTime)  # Renewed while a publish job holds the post
 
     # Relationships
     user = relationship("User", back_populates="posts")
@@ -37,10 +53,16 @@ class Post(Base):
 class PostMetric(Base):
     """Post metrics model to track performance."""
     __tablename__ = "post_metrics"
+    __table_args__ = (
+        Index("uq_post_metrics_post_date", "post_id", "date", unique=True),
+        # Partitioned by month; see app.services.partitions
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    # The partition key has to be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
-    date = Column(DateTime, default=datetime.utcnow)
+    date = Column(DateTime, primary_key=True, default=datetime.utcnow)
     likes = Column(Integer, default=0)
     comments = Column(Integer, default=0)
     shares = Column(Integer, default=0)
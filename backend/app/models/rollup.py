@@ -0,0 +1,94 @@
+"""
+Metric rollup models for pre-aggregated analytics.
+"""
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Index, Integer, JSON, SmallInteger, String
+
+from app.core.database import Base
+
+
+class PlatformMetricRollup(Base):
+    """Platform metrics aggregated per platform and time bucket."""
+    __tablename__ = "platform_metric_rollups"
+
+    platform_id = Column(Integer, ForeignKey("platforms.id", ondelete="CASCADE"), primary_key=True)
+    granularity = Column(String(10), primary_key=True)  # hour, day, week
+    bucket = Column(DateTime, primary_key=True)  # Start of the bucket
+    samples = Column(Integer, default=0)  # Raw rows folded into the bucket
+    followers_count = Column(Integer, default=0)  # Latest snapshot in the bucket
+    following_count = Column(Integer, default=0)  # Latest snapshot in the bucket
+    impressions = Column(BigInteger, default=0)
+    reach = Column(BigInteger, default=0)
+    likes = Column(BigInteger, default=0)
+    comments = Column(BigInteger, default=0)
+    shares = Column(BigInteger, default=0)
+    clicks = Column(BigInteger, default=0)
+
+
+class PostMetricRollup(Base):
+    """Post metrics aggregated per platform and time bucket."""
+    __tablename__ = "post_metric_rollups"
+
+    platform_id = Column(Integer, ForeignKey("platforms.id", ondelete="CASCADE"), primary_key=True)
+    granularity = Column(String(10), primary_key=True)  # hour, day, week
+    bucket = Column(DateTime, primary_key=True)  # Start of the bucket
+    samples = Column(Integer, default=0)  # Raw rows folded into the bucket
+    likes = Column(BigInteger, default=0)
+    comments = Column(BigInteger, default=0)
+    shares = Column(BigInteger, default=0)
+    saves = Column(BigInteger, default=0)
+    impressions = Column(BigInteger, default=0)
+    reach = Column(BigInteger, default=0)
+    clicks = Column(BigInteger, default=0)
+
+
+class PostingTimeSlot(Base):
+    """Engagement earned by a platform's posts per hour of the week they were published in."""
+    __tablename__ = "posting_time_slots"
+
+    platform_id = Column(Integer, ForeignKey("platforms.id", ondelete="CASCADE"), primary_key=True)
+    slot = Column(SmallInteger, primary_key=True)  # Hour of the week, 0 being Monday 00:00
+    samples = Column(Integer, default=0)  # Post metric samples folded into the slot
+    engagement = Column(BigInteger, default=0)  # Their likes, comments and shares
+
+
+class PostPerformance(Base):
+    """Metric totals of each post with samples, ranked by engagement rate for top post queries."""
+    __tablename__ = "post_performance"
+    __table_args__ = (
+        # Scanned backwards for a platform's top posts
+        Index("ix_post_performance_platform_rate", "platform_id", "engagement_rate", "post_id"),
+        Index("ix_post_performance_platform_published_at", "platform_id", "published_at"),
+    )
+
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    platform_id = Column(Integer, ForeignKey("platforms.id", ondelete="CASCADE"), nullable=False)
+    published_at = Column(DateTime)  # Copied from the post
+    likes = Column(BigInteger, default=0)
+    comments = Column(BigInteger, default=0)
+    shares = Column(BigInteger, default=0)
+    impressions = Column(BigInteger, default=0)
+    reach = Column(BigInteger, default=0)
+    clicks = Column(BigInteger, default=0)
+    engagement_rate = Column(Float, default=0)  # Percentage, rounded to 2 places
+
+
+class AudienceSnapshot(Base):
+    """Follower count and normalized demographics from a platform's latest metrics sample."""
+    __tablename__ = "audience_snapshots"
+
+    platform_id = Column(Integer, ForeignKey("platforms.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(DateTime)  # Date of the sample
+    followers_count = Column(Integer, default=0)
+    demographics = Column(JSON)  # See app.services.audience
+
+
+class UserAudienceSnapshot(Base):
+    """A user's platform audience snapshots merged."""
+    __tablename__ = "user_audience_snapshots"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    followers_count = Column(BigInteger, default=0)
+    demographics = Column(JSON)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -2,7 +2,7 @@
 Schedule model for database representation.
 """
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -11,14 +11,35 @@ from app.core.database import Base
 class Schedule(Base):
     """Schedule model for post scheduling."""
     __tablename__ = "schedules"
+    __table_args__ = (
+        Index("ix_schedules_user_status_scheduled_at", "user_id", "status", "scheduled_at"),
+        Index("ix_schedules_user_scheduled_at_id", "user_id", "scheduled_at", "id"),
+        Index("ix_schedules_post_id", "post_id"),
+        # Due-work lookups only ever touch pending rows
+        Index(
+            "ix_schedules_pending_scheduled_at",
+            "scheduled_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        # Lets the scheduler find abandoned claims without scanning the table
+        Index(
+            "ix_schedules_processing_claimed_at",
+            "claimed_at",
+            postgresql_where=text("status = 'processing'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
     scheduled_at = Column(DateTime, nullable=False)
-    status = Column(String(20), default="pending")  # pending, completed, failed, cancelled
+    status = Column(String(20), default="pending")  # pending, processing, completed, failed, cancelled
     timezone = Column(String(50), default="UTC")
     recurrence = Column(String(50))  # daily, weekly, monthly, custom
+    recurrence_rule = Column(String(255))  # e.g. FREQ=WEEKLY;BYDAY=MO,TH;COUNT=10
+    recurrence_anchor = Column(DateTime)  # Wall-clock time of the first occurrence
+    occurrence_count = Column(Integer, nullable=False, default=0, server_default="0")
+    claimed_at = Column(DateTime)  # Set when a worker claims the schedule, renewed while it publishes
     completed_at = Column(DateTime)
     error_message = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -2,7 +2,7 @@
 User model for database representation.
 """
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -11,6 +11,9 @@ from app.core.database import Base
 class User(Base):
     """User model."""
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     full_name = Column(String, index=True)
@@ -18,7 +21,10 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Part of the keyset pagination cursor, so it is never NULL
+    created_at = Column(
+        DateTime, nullable=False, default=datetime.utcnow, server_default=text("(now() AT TIME ZONE 'utc')")
+    )
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
@@ -1,11 +1,37 @@
 """
 AI-related schemas for request and response validation.
 """
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field, validator
 
 
+VALID_PLATFORMS = [
+    "twitter", "facebook", "instagram", "linkedin",
+    "tiktok", "youtube", "pinterest", "snapchat"
+]
+
+VALID_CONTENT_TYPES = [
+    "text", "image_caption", "video_description", "article",
+    "poll", "story", "reel", "carousel", "blog_post", "link_preview"
+]
+
+VALID_TONES = [
+    "professional", "casual", "humorous", "inspirational",
+    "informative", "promotional", "conversational", "neutral"
+]
+
+VALID_LENGTHS = ["short", "medium", "long"]
+
+BATCH_MAX_TARGETS = 10
+
+
+def _validate_choice(value: str, valid: List[str], label: str) -> str:
+    if value.lower() not in valid:
+        raise ValueError(f"Unsupported {label}. Must be one of: {', '.join(valid)}")
+    return value.lower()
+
+
 class ContentGenerationRequest(BaseModel):
     """Request schema for AI content generation."""
     platform: str = Field(..., description="Target platform: twitter, facebook, instagram, etc.")
@@ -20,43 +46,59 @@ class ContentGenerationRequest(BaseModel):
     @validator("platform")
     def validate_platform(cls, v):
         """Validate platform."""
-        valid_platforms = [
-            "twitter", "facebook", "instagram", "linkedin", 
-            "tiktok", "youtube", "pinterest", "snapchat"
-        ]
-        if v.lower() not in valid_platforms:
-            raise ValueError(f"Unsupported platform. Must be one of: {', '.join(valid_platforms)}")
-        return v.lower()
+        return _validate_choice(v, VALID_PLATFORMS, "platform")
     
     @validator("content_type")
     def validate_content_type(cls, v):
         """Validate content type."""
-        valid_types = [
-            "text", "image_caption", "video_description", "article", 
-            "poll", "story", "reel", "carousel", "blog_post", "link_preview"
-        ]
-        if v.lower() not in valid_types:
-            raise ValueError(f"Unsupported content type. Must be one of: {', '.join(valid_types)}")
-        return v.lower()
+        return _validate_choice(v, VALID_CONTENT_TYPES, "content type")
     
     @validator("tone")
     def validate_tone(cls, v):
         """Validate tone."""
-        valid_tones = [
-            "professional", "casual", "humorous", "inspirational", 
-            "informative", "promotional", "conversational", "neutral"
-        ]
-        if v.lower() not in valid_tones:
-            raise ValueError(f"Unsupported tone. Must be one of: {', '.join(valid_tones)}")
-        return v.lower()
+        return _validate_choice(v, VALID_TONES, "tone")
     
     @validator("length")
     def validate_length(cls, v):
         """Validate length."""
-        valid_lengths = ["short", "medium", "long"]
-        if v.lower() not in valid_lengths:
-            raise ValueError(f"Unsupported length. Must be one of: {', '.join(valid_lengths)}")
-        return v.lower()
+        return _validate_choice(v, VALID_LENGTHS, "length")
+
+
+class ContentTarget(BaseModel):
+    """A platform and content type to generate a variant for."""
+    platform: str = Field(..., description="Target platform: twitter, facebook, instagram, etc.")
+    content_type: str = Field("text", description="Type: text, image_caption, video_description, etc.")
+    
+    @validator("platform")
+    def validate_platform(cls, v):
+        """Validate platform."""
+        return _validate_choice(v, VALID_PLATFORMS, "platform")
+    
+    @validator("content_type")
+    def validate_content_type(cls, v):
+        """Validate content type."""
+        return _validate_choice(v, VALID_CONTENT_TYPES, "content type")
+
+
+class ContentBatchRequest(BaseModel):
+    """Request schema for generating one topic for several platforms."""
+    targets: List[ContentTarget] = Field(..., min_length=1, max_length=BATCH_MAX_TARGETS)
+    topic: str = Field(..., description="Topic or subject for the content")
+    tone: Optional[str] = Field("neutral", description="Tone: professional, casual, humorous, etc.")
+    keywords: Optional[List[str]] = Field([], description="Keywords to include")
+    length: Optional[str] = Field("medium", description="Length: short, medium, long")
+    include_hashtags: Optional[bool] = Field(True, description="Include relevant hashtags")
+    include_emoji: Optional[bool] = Field(True, description="Include relevant emojis")
+    
+    @validator("tone")
+    def validate_tone(cls, v):
+        """Validate tone."""
+        return _validate_choice(v, VALID_TONES, "tone")
+    
+    @validator("length")
+    def validate_length(cls, v):
+        """Validate length."""
+        return _validate_choice(v, VALID_LENGTHS, "length")
 
 
 class ContentGenerationResponse(BaseModel):
@@ -69,6 +111,19 @@ class ContentGenerationResponse(BaseModel):
     platform_optimization: Optional[Dict[str, str]] = None
 
 
+class ContentVariant(BaseModel):
+    """Generated content, or the reason it failed, for one batch target."""
+    platform: str
+    content_type: str
+    content: Optional[ContentGenerationResponse] = None
+    error: Optional[str] = None
+
+
+class ContentBatchResponse(BaseModel):
+    """Response schema for multi-platform content generation."""
+    variants: List[ContentVariant]
+
+
 class ContentImprovement(BaseModel):
     """Response schema for content improvement suggestions."""
     original_content: str
@@ -0,0 +1,25 @@
+"""
+Shared schemas for bulk endpoints.
+"""
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field
+
+# Most items accepted by one bulk request
+BULK_MAX_ITEMS = 1000
+
+
+class BulkRequest(BaseModel):
+    """
+    A list of items to create in one transaction.
+
+    Items are validated one by one so that invalid items are reported back
+    individually instead of rejecting the whole request.
+    """
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class BulkItemError(BaseModel):
+    """Why an item of a bulk request was not created."""
+    index: int
+    detail: Any
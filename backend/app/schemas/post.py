@@ -6,6 +6,8 @@ from typing import Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field, validator
 
+from app.schemas.bulk import BulkItemError
+
 
 class PostBase(BaseModel):
     """Base post schema with common attributes."""
@@ -16,7 +18,7 @@ class PostBase(BaseModel):
     mentions: Optional[List[str]] = None
     media_urls: Optional[List[str]] = None
     og_url: Optional[str] = None
-    status: str = "draft"  # draft, scheduled, published, failed
+    status: str = "draft"  # draft, scheduled, publishing, published, failed
 
 
 class PostCreate(PostBase):
@@ -65,3 +67,30 @@ class PostWithPlatformDetails(Post):
     platform_name: str
     platform_type: str
     metrics: Optional[Dict[str, Union[int, float]]] = None
+
+
+class PostBulkResult(BaseModel):
+    """Outcome of a bulk post creation."""
+    created: List[Post]
+    errors: List[BulkItemError]
+
+
+class PublishJob(BaseModel):
+    """Status of a background publish job."""
+    id: str
+    post_id: int
+    status: str  # queued, running, published, failed
+    attempts: int
+    external_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class PostPage(BaseModel):
+    """A page of posts with the cursor for the next page."""
+    items: List[PostWithPlatformDetails]
+    next_cursor: Optional[str] = None
@@ -2,10 +2,13 @@
 Schedule schemas for request and response validation.
 """
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field, validator
 
+from app.core.recurrence import get_zone, parse_rule
+from app.schemas.bulk import BulkItemError
+
 
 class ScheduleBase(BaseModel):
     """Base schedule schema with common attributes."""
@@ -14,6 +17,7 @@ class ScheduleBase(BaseModel):
     status: str = "pending"  # pending, completed, failed, cancelled
     timezone: str = "UTC"
     recurrence: Optional[str] = None  # daily, weekly, monthly, custom
+    recurrence_rule: Optional[str] = None  # e.g. FREQ=WEEKLY;BYDAY=MO,TH;COUNT=10
 
 
 class ScheduleCreate(ScheduleBase):
@@ -34,6 +38,24 @@ class ScheduleCreate(ScheduleBase):
             if v not in valid_patterns:
                 raise ValueError(f"Invalid recurrence pattern. Must be one of: {', '.join(valid_patterns)}")
         return v
+    
+    @validator("timezone")
+    def validate_timezone(cls, v):
+        """Validate timezone name."""
+        get_zone(v)
+        return v
+    
+    @validator("recurrence_rule", always=True)
+    def validate_recurrence_rule(cls, v, values):
+        """Validate the recurrence rule against the recurrence pattern."""
+        recurrence = values.get("recurrence")
+        if recurrence == "custom" and not v:
+            raise ValueError("A recurrence rule is required for custom recurrence")
+        if v and not recurrence:
+            raise ValueError("A recurrence rule requires a recurrence pattern")
+        if recurrence:
+            parse_rule(recurrence, v)
+        return v
 
 
 class ScheduleUpdate(BaseModel):
@@ -42,6 +64,7 @@ class ScheduleUpdate(BaseModel):
     status: Optional[str] = None
     timezone: Optional[str] = None
     recurrence: Optional[str] = None
+    recurrence_rule: Optional[str] = None
     
     @validator("scheduled_at")
     def validate_scheduled_at(cls, v):
@@ -58,6 +81,13 @@ class ScheduleUpdate(BaseModel):
             if v not in valid_statuses:
                 raise ValueError(f"Invalid status. Must be one of: {', '.join(valid_statuses)}")
         return v
+    
+    @validator("timezone")
+    def validate_timezone(cls, v):
+        """Validate timezone name."""
+        if v:
+            get_zone(v)
+        return v
 
 
 class ScheduleInDBBase(ScheduleBase):
@@ -66,6 +96,8 @@ class ScheduleInDBBase(ScheduleBase):
     user_id: int
     created_at: datetime
     updated_at: datetime
+    recurrence_anchor: Optional[datetime] = None
+    occurrence_count: int = 0
     completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
 
@@ -86,3 +118,15 @@ class ScheduleWithPostDetails(Schedule):
     platform_name: str
     platform_type: str
     metrics: Optional[Dict[str, int]] = None
+
+
+class SchedulePage(BaseModel):
+    """A page of schedules with the cursor for the next page."""
+    items: List[ScheduleWithPostDetails]
+    next_cursor: Optional[str] = None
+
+
+class ScheduleBulkResult(BaseModel):
+    """Outcome of a bulk schedule creation."""
+    created: List[Schedule]
+    errors: List[BulkItemError]
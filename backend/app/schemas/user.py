@@ -1,7 +1,7 @@
 """
 User schemas for request and response validation.
 """
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
@@ -39,6 +39,12 @@ class User(UserInDBBase):
     pass
 
 
+class UserPage(BaseModel):
+    """A page of users with the cursor for the next page."""
+    items: List[User]
+    next_cursor: Optional[str] = None
+
+
 class UserInDB(UserInDBBase):
     """Schema for user with hashed password in DB."""
     hashed_password: str
@@ -0,0 +1,573 @@
+"""
+AI content generation services.
+
+Prompts ask the model for JSON matching the response schemas in
+app.schemas.ai; replies are validated before being returned. All calls go
+through the shared gateway in app.core.ai_gateway. Request bodies carry no
+user identifiers, so identical prompts from different users are coalesced.
+
+Results that depend only on their request parameters are cached under a
+digest of the normalized parameters, first in process and then in Redis.
+"""
+import asyncio
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.ai_gateway import ai_gateway
+from app.core.cache import TTLCache, get_json, set_json
+from app.core.config import settings
+from app.models.platform import Platform
+from app.schemas.ai import (
+    AudienceAnalysis,
+    ContentGenerationResponse,
+    ContentIdeas,
+    ContentImprovement,
+    HashtagSuggestions,
+)
+from app.services.analytics import get_audience_insights, get_best_posting_times
+
+SYSTEM_PROMPT = (
+    "You are an expert social media manager. Always answer with a single JSON "
+    "object using exactly the keys requested, and no other text."
+)
+
+# Streamed replies are plain text followed by this marker and a JSON object
+# of the remaining fields, so the text can be forwarded as it is generated.
+STREAM_MARKER = "@@FIELDS@@"
+
+STREAM_SYSTEM_PROMPT = (
+    "You are an expert social media manager. Follow the requested answer "
+    "format exactly."
+)
+
+# Maximum post length per platform, in characters
+PLATFORM_CHARACTER_LIMITS = {
+    "twitter": 280,
+    "facebook": 63206,
+    "instagram": 2200,
+    "linkedin": 3000,
+    "tiktok": 2200,
+    "youtube": 5000,
+    "pinterest": 500,
+    "snapchat": 250,
+}
+
+LENGTH_GUIDES = {
+    "short": "under 50 words",
+    "medium": "50 to 150 words",
+    "long": "150 to 300 words",
+}
+
+LENGTH_MAX_TOKENS = {"short": 300, "medium": 600, "long": 1000}
+
+# Seconds each kind of AI result may be served from cache. Ideas without a
+# topic follow trends, so they go stale sooner.
+AI_CACHE_TTLS = {
+    "generate": 24 * 60 * 60,
+    "hashtags": 24 * 60 * 60,
+    "ideas": 60 * 60,
+}
+
+# Cached topics remembered per parameter family for near-duplicate matching
+TOPICS_PER_FAMILY = 256
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or our the this to what with your".split()
+)
+
+
+def normalize_text(value: str) -> str:
+    """Case- and whitespace-insensitive form of free text."""
+    return " ".join(value.lower().split())
+
+
+def topic_tokens(topic: str) -> FrozenSet[str]:
+    """Significant words of a topic, for near-duplicate matching."""
+    return frozenset(re.findall(r"[\w#@']+", topic.lower())) - STOPWORDS
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two word sets."""
+    union = a | b
+    return len(a & b) / len(union) if union else 1.0
+
+
+def _digest(value: Dict[str, Any]) -> str:
+    normalized = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+class AIResultCache:
+    """
+    Content-addressed cache of AI results.
+
+    Entries are keyed by a digest of the route and its normalized
+    parameters, kept in an in-process LRU and, when available, in Redis so
+    that other processes can reuse them. With a ``similarity`` threshold,
+    a miss on a request with a topic falls back to a cached result for a
+    near-identical topic (by word-set Jaccard similarity) with otherwise
+    equal parameters; that index covers topics this process has seen.
+    """
+
+    def __init__(self, maxsize: int, similarity: float) -> None:
+        self.similarity = similarity
+        self._memory = TTLCache(maxsize, max(AI_CACHE_TTLS.values()))
+        self._topics: "OrderedDict[str, OrderedDict[str, FrozenSet[str]]]" = OrderedDict()
+        self.stats = {
+            route: {"hits": 0, "redis_hits": 0, "near_hits": 0, "misses": 0} for route in AI_CACHE_TTLS
+        }
+
+    async def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        result = self._memory.get(key)
+        if result is None:
+            result = await get_json(key)
+            if result is not None:
+                self._memory.set(key, result)
+        return result
+
+    def _keys(self, route: str, params: Dict[str, Any], topic: Optional[str]) -> Tuple[str, str]:
+        family = _digest({"route": route, **params})
+        key = f"cache:ai:{route}:" + _digest({"family": family, "topic": normalize_text(topic or "")})
+        return family, key
+
+    async def get(
+        self, route: str, params: Dict[str, Any], topic: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Get a cached result for a request, or None on a miss."""
+        if not settings.AI_CACHE_ENABLED:
+            return None
+        stats = self.stats[route]
+        family, key = self._keys(route, params, topic)
+
+        result = self._memory.get(key)
+        if result is not None:
+            stats["hits"] += 1
+            return result
+        result = await get_json(key)
+        if result is not None:
+            self._memory.set(key, result)
+            stats["redis_hits"] += 1
+            return result
+
+        tokens = topic_tokens(topic) if topic else None
+        if tokens and self.similarity:
+            for candidate, candidate_tokens in reversed(self._topics.get(family, {}).items()):
+                if candidate != key and jaccard(tokens, candidate_tokens) >= self.similarity:
+                    result = await self._lookup(candidate)
+                    if result is not None:
+                        stats["near_hits"] += 1
+                        return result
+
+        stats["misses"] += 1
+        return None
+
+    async def set(
+        self, route: str, params: Dict[str, Any], result: Dict[str, Any], topic: Optional[str] = None
+    ) -> None:
+        """Cache the result of a request."""
+        if not settings.AI_CACHE_ENABLED:
+            return
+        family, key = self._keys(route, params, topic)
+        ttl = AI_CACHE_TTLS[route]
+        self._memory.set(key, result, ttl)
+        await set_json(key, result, ttl)
+
+        tokens = topic_tokens(topic) if topic else None
+        if tokens:
+            topics = self._topics.setdefault(family, OrderedDict())
+            self._topics.move_to_end(family)
+            topics[key] = tokens
+            while len(topics) > TOPICS_PER_FAMILY:
+                topics.popitem(last=False)
+            while len(self._topics) > self._memory.maxsize:
+                self._topics.popitem(last=False)
+
+    async def get_or_generate(
+        self,
+        route: str,
+        params: Dict[str, Any],
+        generate: Callable[[], Awaitable[Dict[str, Any]]],
+        topic: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Return a cached result for the request, generating it on a miss."""
+        result = await self.get(route, params, topic)
+        if result is None:
+            result = await generate()
+            await self.set(route, params, result, topic)
+        return result
+
+    def clear(self) -> None:
+        self._memory.clear()
+        self._topics.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        routes = {}
+        for route, stats in self.stats.items():
+            hits = stats["hits"] + stats["redis_hits"] + stats["near_hits"]
+            total = hits + stats["misses"]
+            routes[route] = {**stats, "hit_rate": round(hits / total, 4) if total else 0.0}
+        return {
+            "enabled": settings.AI_CACHE_ENABLED,
+            "entries": len(self._memory),
+            "max_entries": self._memory.maxsize,
+            "topic_similarity": self.similarity,
+            "routes": routes,
+        }
+
+
+ai_result_cache = AIResultCache(settings.AI_CACHE_SIZE, settings.AI_CACHE_TOPIC_SIMILARITY)
+
+
+def _platform_guide(platform: str) -> str:
+    limit = PLATFORM_CHARACTER_LIMITS.get(platform)
+    return f"{platform} (at most {limit} characters)" if limit else platform
+
+
+def _parse_reply(reply: str, schema: Type[BaseModel], **fields: Any) -> Dict[str, Any]:
+    """Validate a JSON reply against a response schema, adding known fields."""
+    try:
+        data = json.loads(reply)
+        return schema.parse_obj({**data, **fields}).dict()
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="AI provider returned malformed content"
+        )
+
+
+def _response_format(text_field: str, text_description: str, other_keys: str, stream: bool) -> str:
+    """Instructions for a reply whose main text is ``text_field``."""
+    if stream:
+        return (
+            f"First write {text_description} as plain text. Then write {STREAM_MARKER} on its "
+            f"own line, followed by a JSON object with keys {other_keys}."
+        )
+    return f'Respond with keys "{text_field}" ({text_description}), {other_keys}.'
+
+
+async def _ask(
+    user_id: int,
+    prompt: str,
+    schema: Type[BaseModel],
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    **fields: Any,
+) -> Dict[str, Any]:
+    reply = await ai_gateway.chat(
+        user_id,
+        [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        json_response=True,
+    )
+    return _parse_reply(reply, schema, **fields)
+
+
+async def _stream_reply(
+    user_id: int,
+    prompt: str,
+    schema: Type[BaseModel],
+    text_field: str,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    **fields: Any,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Yield ("token", text) events as a reply's main text is generated, then a
+    ("result", payload) event with the validated response.
+    """
+    messages = [
+        {"role": "system", "content": STREAM_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    reply = ""
+    sent = 0
+    marker_at = -1
+    async for chunk in ai_gateway.stream_chat(
+        user_id, messages, temperature=temperature, max_tokens=max_tokens
+    ):
+        reply += chunk
+        if marker_at >= 0:
+            continue
+        marker_at = reply.find(STREAM_MARKER, sent)
+        # Hold back anything that could be the start of a split marker
+        end = marker_at if marker_at >= 0 else len(reply) - len(STREAM_MARKER) + 1
+        if end > sent:
+            yield "token", reply[sent:end]
+            sent = end
+
+    if marker_at < 0:
+        if len(reply) > sent:
+            yield "token", reply[sent:]
+        text, rest = reply, "{}"
+    else:
+        text, rest = reply[:marker_at], reply[marker_at + len(STREAM_MARKER):]
+    yield "result", _parse_reply(rest, schema, **{text_field: text.strip()}, **fields)
+
+
+def _generation_cache_params(
+    platform: str,
+    content_type: str,
+    tone: str,
+    keywords: Optional[List[str]],
+    length: str,
+    include_hashtags: bool,
+    include_emoji: bool,
+) -> Dict[str, Any]:
+    """Normalized parameters, other than the topic, that a generation depends on."""
+    return {
+        "platform": platform,
+        "content_type": content_type,
+        "tone": tone,
+        "keywords": sorted({normalize_text(keyword) for keyword in keywords or []}),
+        "length": length,
+        "include_hashtags": include_hashtags,
+        "include_emoji": include_emoji,
+    }
+
+
+async def generate_content(
+    db: AsyncSession,
+    user_id: int,
+    platform: str,
+    content_type: str,
+    topic: str,
+    tone: str = "neutral",
+    keywords: Optional[List[str]] = None,
+    length: str = "medium",
+    include_hashtags: bool = True,
+    include_emoji: bool = True,
+) -> Dict[str, Any]:
+    """Generate a post for a platform."""
+    params = _generation_cache_params(
+        platform, content_type, tone, keywords, length, include_hashtags, include_emoji
+    )
+    return await ai_result_cache.get_or_generate(
+        "generate",
+        params,
+        lambda: _ask(
+            user_id,
+            _generation_prompt(
+                platform, content_type, topic, tone, keywords or [],
+                length, include_hashtags, include_emoji,
+            ),
+            ContentGenerationResponse,
+            max_tokens=LENGTH_MAX_TOKENS.get(length),
+        ),
+        topic=topic,
+    )
+
+
+async def generate_content_batch(
+    db: AsyncSession,
+    user_id: int,
+    targets: List[Dict[str, str]],
+    topic: str,
+    tone: str = "neutral",
+    keywords: Optional[List[str]] = None,
+    length: str = "medium",
+    include_hashtags: bool = True,
+    include_emoji: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Generate a topic for several platforms and content types concurrently.
+
+    Each variant goes through generate_content, so it is served from cache
+    when possible, and a failed variant doesn't fail the others.
+    """
+    async def generate_variant(target: Dict[str, str]) -> Dict[str, Any]:
+        variant = {**target, "content": None, "error": None}
+        try:
+            variant["content"] = await generate_content(
+                db,
+                user_id,
+                target["platform"],
+                target["content_type"],
+                topic,
+                tone=tone,
+                keywords=keywords,
+                length=length,
+                include_hashtags=include_hashtags,
+                include_emoji=include_emoji,
+            )
+        except HTTPException as exc:
+            variant["error"] = exc.detail
+        return variant
+
+    return list(await asyncio.gather(*(generate_variant(target) for target in targets)))
+
+
+async def stream_content(
+    db: AsyncSession,
+    user_id: int,
+    platform: str,
+    content_type: str,
+    topic: str,
+    tone: str = "neutral",
+    keywords: Optional[List[str]] = None,
+    length: str = "medium",
+    include_hashtags: bool = True,
+    include_emoji: bool = True,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Generate a post, yielding its text as it is written and then the full response."""
+    params = _generation_cache_params(
+        platform, content_type, tone, keywords, length, include_hashtags, include_emoji
+    )
+    cached = await ai_result_cache.get("generate", params, topic)
+    if cached is not None:
+        yield "token", cached["content"]
+        yield "result", cached
+        return
+
+    prompt = _generation_prompt(
+        platform, content_type, topic, tone, keywords or [],
+        length, include_hashtags, include_emoji, stream=True,
+    )
+    async for event, data in _stream_reply(
+        user_id, prompt, ContentGenerationResponse, "content", max_tokens=LENGTH_MAX_TOKENS.get(length)
+    ):
+        if event == "result":
+            await ai_result_cache.set("generate", params, data, topic)
+        yield event, data
+
+
+def _generation_prompt(
+    platform: str,
+    content_type: str,
+    topic: str,
+    tone: str,
+    keywords: List[str],
+    length: str,
+    include_hashtags: bool,
+    include_emoji: bool,
+    stream: bool = False,
+) -> str:
+    prompt = (
+        f"Write a {tone} {content_type.replace('_', ' ')} for {_platform_guide(platform)} "
+        f"about: {topic}.\n"
+        f"Length: {LENGTH_GUIDES.get(length, LENGTH_GUIDES['medium'])}.\n"
+        f"{'Use' if include_emoji else 'Do not use'} emojis.\n"
+    )
+    if keywords:
+        prompt += f"Include these keywords: {', '.join(keywords)}.\n"
+    return prompt + _response_format(
+        "content",
+        "the post text, without hashtags",
+        f'"hashtags" ({"a list of relevant hashtags without #" if include_hashtags else "an empty list"}), '
+        '"mentions" (a list of accounts worth mentioning), '
+        '"media_suggestions" (a list of images or videos to attach), '
+        '"improvement_tips" (a list of short tips) and '
+        '"platform_optimization" (an object of short platform-specific notes)',
+        stream,
+    )
+
+
+async def improve_content(
+    db: AsyncSession, user_id: int, content: str, platform: str, aspect: str
+) -> Dict[str, Any]:
+    """Rewrite a post to improve one aspect of it."""
+    prompt = _improvement_prompt(content, platform, aspect)
+    return await _ask(user_id, prompt, ContentImprovement, original_content=content)
+
+
+async def stream_improvement(
+    db: AsyncSession, user_id: int, content: str, platform: str, aspect: str
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Rewrite a post, yielding the new text as it is written and then the full response."""
+    prompt = _improvement_prompt(content, platform, aspect, stream=True)
+    async for event in _stream_reply(
+        user_id, prompt, ContentImprovement, "improved_content", original_content=content
+    ):
+        yield event
+
+
+def _improvement_prompt(content: str, platform: str, aspect: str, stream: bool = False) -> str:
+    prompt = f"Improve the {aspect} of this {_platform_guide(platform)} post:\n\n{content}\n\n"
+    return prompt + _response_format(
+        "improved_content",
+        "the improved post",
+        '"changes_made" (a list of short descriptions), "reasoning" and '
+        '"additional_suggestions" (a list)',
+        stream,
+    )
+
+
+async def generate_content_ideas(
+    db: AsyncSession, user_id: int, platform: str, topic: Optional[str] = None, count: int = 5
+) -> Dict[str, Any]:
+    """Suggest post ideas for a platform, optionally around a topic."""
+    return await ai_result_cache.get_or_generate(
+        "ideas",
+        {"platform": platform, "count": count},
+        lambda: _generate_content_ideas(user_id, platform, topic, count),
+        topic=topic,
+    )
+
+
+async def _generate_content_ideas(
+    user_id: int, platform: str, topic: Optional[str], count: int
+) -> Dict[str, Any]:
+    subject = f"about {topic}" if topic else "based on currently trending subjects"
+    prompt = (
+        f"Suggest {count} content ideas for {platform} {subject}.\n"
+        'Respond with keys "ideas" (a list of objects with "title", "description", "hashtags", '
+        '"best_time_to_post", "content_type" and "estimated_engagement" as high, medium or low), '
+        '"trending_topics" (a list) and "best_performing_categories" '
+        "(an object mapping categories to an expected engagement rate in percent)."
+    )
+    return await _ask(user_id, prompt, ContentIdeas, temperature=0.9)
+
+
+async def suggest_hashtags(
+    db: AsyncSession, user_id: int, content: str, platform: str, count: int = 10
+) -> Dict[str, Any]:
+    """Suggest hashtags for a post."""
+    return await ai_result_cache.get_or_generate(
+        "hashtags",
+        {"content": normalize_text(content), "platform": platform, "count": count},
+        lambda: _suggest_hashtags(user_id, content, platform, count),
+    )
+
+
+async def _suggest_hashtags(user_id: int, content: str, platform: str, count: int) -> Dict[str, Any]:
+    prompt = (
+        f"Suggest {count} hashtags for this {platform} post:\n\n{content}\n\n"
+        'Respond with keys "hashtags" (a list, without #), "trending_hashtags", '
+        '"niche_hashtags", "popular_hashtags" (lists drawn from "hashtags") and '
+        '"engagement_potential" (an object mapping each hashtag to high, medium or low).'
+    )
+    return await _ask(user_id, prompt, HashtagSuggestions, temperature=0.3)
+
+
+async def analyze_audience(db: AsyncSession, user_id: int, platform_id: int) -> Dict[str, Any]:
+    """Recommend a content strategy from a platform's audience data."""
+    platform = await db.get(Platform, platform_id)
+    if not platform or platform.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Platform not found"
+        )
+
+    audience = await get_audience_insights(db, user_id, platform_id)
+    best_times = await get_best_posting_times(db, [platform_id])
+    has_times = any(best_times.values())
+
+    prompt = (
+        f"Analyze this {platform.type} audience of {audience['total_followers']} followers.\n"
+        f"Demographics: {json.dumps(audience['demographics'], sort_keys=True)}\n"
+        f"Best posting times by past engagement: {json.dumps(best_times) if has_times else 'unknown'}\n"
+        'Respond with keys "insights" (a list of objects with "category", "data" and '
+        '"recommendations"), "content_recommendations" (a list of objects of strings), '
+        '"best_posting_times" (an object mapping weekdays to lists of HH:MM times), '
+        '"engagement_patterns" (an object) and "growth_opportunities" (a list).'
+    )
+    # Measured posting times take precedence over the model's guesses
+    fields = {"best_posting_times": best_times} if has_times else {}
+    return await _ask(user_id, prompt, AudienceAnalysis, temperature=0.5, **fields)
@@ -0,0 +1,782 @@
+"""
+Analytics services for social media data.
+"""
+import asyncio
+import csv
+import gzip
+import heapq
+import json
+import logging
+import os
+import time
+import uuid
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import groupby, islice
+from typing import IO, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+from xml.sax.saxutils import escape
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, literal, null, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache, get_json, get_or_compute, platform_scope, set_json, user_scope
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.platform import Platform, PlatformMetric
+from app.models.post import Post, PostMetric
+from app.models.rollup import (
+    AudienceSnapshot,
+    PlatformMetricRollup,
+    PostMetricRollup,
+    PostingTimeSlot,
+    PostPerformance,
+    UserAudienceSnapshot,
+)
+from app.services.audience import normalize_demographics
+from app.services.metric_series import MetricSeries, counter, epoch_us, percentile
+from app.services.metrics import ROLLUP_FOR_INTERVAL, bucket_floor
+
+logger = logging.getLogger(__name__)
+
+VALID_INTERVALS = ("hour", "day", "week", "month")
+
+ENGAGEMENT_FIELDS = ("likes", "comments", "shares", "impressions", "reach", "clicks")
+
+DAYS_OF_WEEK = (
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
+)
+
+# Hours of the week posted in only count as best times if their engagement
+# reaches this percentile of all of them
+BEST_TIME_PERCENTILE = 50
+
+# Buckets engagement moving averages are taken over, per interval
+MOVING_AVERAGE_WINDOWS = {"hour": 24, "day": 7, "week": 4, "month": 3}
+
+# Seconds each kind of analytics result may be served from cache. New metric
+# rows invalidate entries sooner (see services.metrics).
+ANALYTICS_CACHE_TTLS = {
+    "platform": 300,
+    "performance": 300,
+    "audience": 3600,
+    "engagement": 300,
+    "growth": 900,
+}
+
+
+async def cached_analytics(
+    route: str,
+    user_id: int,
+    platform_id: Optional[int],
+    params: Dict[str, Any],
+    compute: Callable[[], Awaitable[Any]],
+) -> Any:
+    """Serve an analytics result from cache, computing it on a miss."""
+    scope = platform_scope(platform_id) if platform_id is not None else user_scope(user_id)
+    return await get_or_compute(
+        f"analytics:{route}",
+        scope,
+        user_id,
+        {"platform_id": platform_id, **params},
+        ANALYTICS_CACHE_TTLS[route],
+        compute,
+    )
+
+
+def _validate_interval(interval: str) -> None:
+    if interval not in VALID_INTERVALS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported interval: {interval}. Supported intervals: {', '.join(VALID_INTERVALS)}"
+        )
+
+
+async def _get_user_platform(db: AsyncSession, platform_id: int, user_id: int) -> Platform:
+    platform = await db.get(Platform, platform_id)
+    if not platform or platform.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Platform not found"
+        )
+    return platform
+
+
+async def _get_platform_ids(
+    db: AsyncSession, user_id: int, platform_id: Optional[int] = None
+) -> List[int]:
+    if platform_id is not None:
+        await _get_user_platform(db, platform_id, user_id)
+        return [platform_id]
+    result = await db.execute(select(Platform.id).where(Platform.user_id == user_id))
+    return list(result.scalars().all())
+
+
+async def get_platform_analytics(
+    db: AsyncSession,
+    platform_id: int,
+    user_id: int,
+    from_date: datetime,
+    to_date: datetime,
+    metrics: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Get analytics time series for a single platform."""
+    platform = await _get_user_platform(db, platform_id, user_id)
+    metrics = metrics or ["followers", "engagement", "impressions", "reach"]
+
+    # Plain columns into arrays, rather than a full ORM object per sample
+    result = await db.execute(
+        select(
+            epoch_us(PlatformMetric.date),
+            counter(PlatformMetric.followers_count),
+            counter(PlatformMetric.engagement_rate),
+            counter(PlatformMetric.impressions),
+            counter(PlatformMetric.reach),
+        )
+        .where(
+            PlatformMetric.platform_id == platform_id,
+            PlatformMetric.date >= from_date,
+            PlatformMetric.date <= to_date,
+        )
+        .order_by(PlatformMetric.date)
+    )
+    series = MetricSeries.from_rows(
+        result.all(), ("followers_count", "engagement_rate", "impressions", "reach")
+    )
+
+    analytics: Dict[str, Any] = {
+        "platform_id": platform.id,
+        "platform_name": platform.name,
+        "platform_type": platform.type,
+        "from_date": from_date,
+        "to_date": to_date,
+    }
+    if "followers" in metrics:
+        analytics["followers"] = series.points("followers_count")
+    if "engagement" in metrics:
+        # Stored as percentage * 100
+        analytics["engagement"] = series.points("engagement_rate", scale=100)
+    if "impressions" in metrics:
+        analytics["impressions"] = series.points("impressions")
+    if "reach" in metrics:
+        analytics["reach"] = series.points("reach")
+    if "demographics" in metrics:
+        latest = (
+            await db.execute(
+                select(PlatformMetric.demographics)
+                .where(
+                    PlatformMetric.platform_id == platform_id,
+                    PlatformMetric.date >= from_date,
+                    PlatformMetric.date <= to_date,
+                    func.json_typeof(PlatformMetric.demographics) == "object",
+                )
+                .order_by(PlatformMetric.date.desc())
+                .limit(1)
+            )
+        ).scalar_one_or_none()
+        analytics["demographics"] = normalize_demographics(latest)
+    if "best_time" in metrics:
+        analytics["best_time"] = await get_best_posting_times(db, [platform_id])
+
+    return analytics
+
+
+async def get_best_posting_times(
+    db: AsyncSession, platform_ids: List[int], top: int = 3
+) -> Dict[str, List[str]]:
+    """Rank hours of the week by the engagement earned by posts published in them."""
+    # Slots are maintained as metrics arrive, so this reads at most 168 rows
+    # per platform however much history there is
+    result = await db.execute(
+        select(PostingTimeSlot.slot, func.sum(PostingTimeSlot.engagement))
+        .where(PostingTimeSlot.platform_id.in_(platform_ids), PostingTimeSlot.samples > 0)
+        .group_by(PostingTimeSlot.slot)
+    )
+    totals = np.zeros(168, dtype=np.int64)
+    posted = np.zeros(168, dtype=bool)
+    for slot, engagement in result.all():
+        totals[slot] = engagement
+        posted[slot] = True
+    threshold = percentile(totals[posted], (BEST_TIME_PERCENTILE,))[0]
+    candidates = posted & (totals >= threshold)
+
+    best: Dict[str, List[str]] = {}
+    for day_index, day in enumerate(DAYS_OF_WEEK):
+        day_slots = slice(day_index * 24, day_index * 24 + 24)
+        # Candidate hours, highest engagement first, earlier hours winning ties
+        hours = [hour for hour in np.argsort(-totals[day_slots], kind="stable") if candidates[day_slots][hour]]
+        best[day] = [f"{hour:02d}:00" for hour in hours[:top]]
+    return best
+
+
+async def get_best_times(
+    db: AsyncSession, user_id: int, platform_id: Optional[int] = None, top: int = 3
+) -> Dict[str, Any]:
+    """Best hours to post on across the user's platforms, or on one of them."""
+    platform_ids = await _get_platform_ids(db, user_id, platform_id)
+    return {
+        "platform_ids": platform_ids,
+        "best_times": await get_best_posting_times(db, platform_ids, top=top),
+    }
+
+
+async def get_post_performance(
+    db: AsyncSession,
+    user_id: int,
+    platform_id: Optional[int],
+    from_date: datetime,
+    to_date: datetime,
+    limit: int = 10,
+) -> Dict[str, Any]:
+    """Get the top performing posts by engagement rate."""
+    platform_ids = await _get_platform_ids(db, user_id, platform_id)
+    in_window = and_(PostPerformance.published_at >= from_date, PostPerformance.published_at <= to_date)
+
+    # Each platform's top posts are read off its leaderboard index in one
+    # round trip, then merged; no post beyond the top `limit` of its
+    # platform is ever looked at.
+    leaders = (
+        select(PostPerformance)
+        .where(PostPerformance.platform_id == Platform.id, in_window)
+        .order_by(PostPerformance.engagement_rate.desc(), PostPerformance.post_id.desc())
+        .limit(limit)
+        .lateral()
+    )
+    result = await db.execute(
+        select(leaders)
+        .select_from(Platform)
+        .join(leaders, true())
+        .where(Platform.id.in_(platform_ids))
+        .order_by(leaders.c.platform_id, leaders.c.engagement_rate.desc(), leaders.c.post_id.desc())
+    )
+    rankings = [list(rows) for _, rows in groupby(result.all(), key=lambda row: row.platform_id)]
+    top = list(islice(
+        heapq.merge(*rankings, key=lambda row: (-row.engagement_rate, -row.post_id)), limit
+    ))
+
+    contents = dict(
+        (await db.execute(select(Post.id, Post.content).where(Post.id.in_([row.post_id for row in top])))).all()
+    ) if top else {}
+    total_posts = await db.scalar(
+        select(func.count())
+        .select_from(PostPerformance)
+        .where(PostPerformance.platform_id.in_(platform_ids), in_window)
+    )
+
+    return {
+        "from_date": from_date,
+        "to_date": to_date,
+        "total_posts": total_posts,
+        "top_posts": [
+            {
+                "post_id": row.post_id,
+                "platform_id": row.platform_id,
+                "content": contents[row.post_id],
+                "published_at": row.published_at,
+                **{field: row._mapping[field] for field in ENGAGEMENT_FIELDS},
+                "engagement_rate": row.engagement_rate,
+            }
+            for row in top
+        ],
+    }
+
+
+async def get_audience_insights(
+    db: AsyncSession, user_id: int, platform_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """Merge the latest demographics of the user's platforms."""
+    platform_ids = await _get_platform_ids(db, user_id, platform_id)
+
+    # Snapshots are kept current as metrics arrive, merged per user
+    if platform_id is not None:
+        snapshot = await db.get(AudienceSnapshot, platform_id)
+    else:
+        snapshot = await db.get(UserAudienceSnapshot, user_id)
+
+    return {
+        "platform_ids": platform_ids,
+        "total_followers": (snapshot.followers_count if snapshot else 0) or 0,
+        "demographics": (snapshot.demographics if snapshot else None) or {},
+    }
+
+
+async def get_engagement_metrics(
+    db: AsyncSession,
+    user_id: int,
+    platform_id: Optional[int],
+    from_date: datetime,
+    to_date: datetime,
+    interval: str = "day",
+) -> Dict[str, Any]:
+    """Get post engagement totals bucketed by interval."""
+    _validate_interval(interval)
+    platform_ids = await _get_platform_ids(db, user_id, platform_id)
+
+    # Rollup buckets nest inside the interval's, so each platform's are
+    # read as stored and summed into the interval's buckets in NumPy
+    granularity = ROLLUP_FOR_INTERVAL[interval]
+    result = await db.execute(
+        select(
+            epoch_us(PostMetricRollup.bucket),
+            *(counter(getattr(PostMetricRollup, field)) for field in ENGAGEMENT_FIELDS),
+        )
+        .where(
+            PostMetricRollup.platform_id.in_(platform_ids),
+            PostMetricRollup.granularity == granularity,
+            PostMetricRollup.bucket >= bucket_floor(from_date, granularity),
+            PostMetricRollup.bucket <= to_date,
+        )
+    )
+    series = MetricSeries.from_rows(result.all(), ENGAGEMENT_FIELDS, dtype=np.int64).resample(interval)
+    series.counters["engagements"] = series.total("likes", "comments", "shares")
+    moving_average = np.round(series.rolling_mean("engagements", MOVING_AVERAGE_WINDOWS[interval]), 2)
+
+    return {
+        "interval": interval,
+        "from_date": from_date,
+        "to_date": to_date,
+        "data": series.records(moving_average=moving_average),
+    }
+
+
+async def get_growth_metrics(
+    db: AsyncSession,
+    user_id: int,
+    platform_id: Optional[int],
+    from_date: datetime,
+    to_date: datetime,
+    interval: str = "day",
+) -> Dict[str, Any]:
+    """Get follower counts bucketed by interval."""
+    _validate_interval(interval)
+    platform_ids = await _get_platform_ids(db, user_id, platform_id)
+
+    # Followers are a snapshot, so resampling keeps each platform's latest
+    # value per bucket and sums those across platforms.
+    granularity = ROLLUP_FOR_INTERVAL[interval]
+    result = await db.execute(
+        select(
+            PlatformMetricRollup.platform_id,
+            epoch_us(PlatformMetricRollup.bucket),
+            counter(PlatformMetricRollup.followers_count),
+        )
+        .where(
+            PlatformMetricRollup.platform_id.in_(platform_ids),
+            PlatformMetricRollup.granularity == granularity,
+            PlatformMetricRollup.bucket >= bucket_floor(from_date, granularity),
+            PlatformMetricRollup.bucket <= to_date,
+        )
+    )
+    series = MetricSeries.from_rows(result.all(), ("followers",), keyed=True, dtype=np.int64).resample(
+        interval, last=("followers",)
+    )
+
+    return {
+        "interval": interval,
+        "from_date": from_date,
+        "to_date": to_date,
+        "data": series.records(change=series.change("followers")),
+    }
+
+
+EXPORT_COLUMNS = (
+    "type", "platform_id", "post_id", "date", "followers_count",
+    "likes", "comments", "shares", "impressions", "reach", "clicks", "engagement_rate",
+)
+
+# Export jobs this process keeps for status lookups while Redis is unavailable
+EXPORT_JOB_HISTORY = 1000
+# How often a process sweeps expired export files
+EXPORT_SWEEP_SECONDS = 60 * 60
+
+
+def _export_queries(platform_ids: List[int], from_date: datetime, to_date: datetime):
+    """SELECTs producing export rows in EXPORT_COLUMNS order."""
+    platform_rows = (
+        select(
+            literal("platform"),
+            PlatformMetric.platform_id,
+            null(),
+            PlatformMetric.date,
+            PlatformMetric.followers_count,
+            *(getattr(PlatformMetric, field) for field in ENGAGEMENT_FIELDS),
+            PlatformMetric.engagement_rate,
+        )
+        .where(
+            PlatformMetric.platform_id.in_(platform_ids),
+            PlatformMetric.date >= from_date,
+            PlatformMetric.date <= to_date,
+        )
+        .order_by(PlatformMetric.date)
+    )
+    post_rows = (
+        select(
+            literal("post"),
+            Post.platform_id,
+            PostMetric.post_id,
+            PostMetric.date,
+            null(),
+            *(getattr(PostMetric, field) for field in ENGAGEMENT_FIELDS),
+            PostMetric.engagement_rate,
+        )
+        .join(Post, Post.id == PostMetric.post_id)
+        .where(
+            Post.platform_id.in_(platform_ids),
+            PostMetric.date >= from_date,
+            PostMetric.date <= to_date,
+        )
+        .order_by(PostMetric.date)
+    )
+    return platform_rows, post_rows
+
+
+async def _count_export_rows(
+    db: AsyncSession, platform_ids: List[int], from_date: datetime, to_date: datetime
+) -> int:
+    total = 0
+    for query in _export_queries(platform_ids, from_date, to_date):
+        total += await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+    return total
+
+
+async def _iter_export_batches(
+    db: AsyncSession, platform_ids: List[int], from_date: datetime, to_date: datetime
+) -> AsyncIterator[List[tuple]]:
+    """Yield export rows in batches, read through server-side cursors."""
+    for query in _export_queries(platform_ids, from_date, to_date):
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield [
+                (*row[:3], row[3].isoformat() if row[3] else None, *row[4:-1], (row[-1] or 0) / 100)
+                for row in partition
+            ]
+
+
+class _CsvExportWriter:
+    def __init__(self, export_file: IO[str]):
+        self.writer = csv.writer(export_file)
+        self.writer.writerow(EXPORT_COLUMNS)
+
+    def write_rows(self, rows: List[tuple]) -> None:
+        self.writer.writerows(rows)
+
+    def close(self) -> None:
+        pass
+
+
+class _JsonExportWriter:
+    def __init__(self, export_file: IO[str]):
+        self.file = export_file
+        self.separator = "\n"
+        self.file.write("[")
+
+    def write_rows(self, rows: List[tuple]) -> None:
+        for row in rows:
+            self.file.write(self.separator)
+            self.file.write(json.dumps(dict(zip(EXPORT_COLUMNS, row))))
+            self.separator = ",\n"
+
+    def close(self) -> None:
+        self.file.write("\n]\n")
+
+
+class _XlsxExportWriter:
+    """Writes a single-sheet XLSX workbook, streaming the sheet into the archive."""
+
+    def __init__(self, workbook: zipfile.ZipFile):
+        workbook.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        workbook.writestr("_rels/.rels", XLSX_ROOT_RELS)
+        workbook.writestr("xl/workbook.xml", XLSX_WORKBOOK)
+        workbook.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS)
+        self.sheet = workbook.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self.sheet.write(XLSX_SHEET_HEADER.encode())
+        self.write_rows([EXPORT_COLUMNS])
+
+    @staticmethod
+    def _cell(value: Any) -> str:
+        if value is None:
+            return "<c/>"
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return f"<c><v>{value}</v></c>"
+        return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+    def write_rows(self, rows: List[tuple]) -> None:
+        self.sheet.write("".join(
+            "<row>" + "".join(self._cell(value) for value in row) + "</row>" for row in rows
+        ).encode())
+
+    def close(self) -> None:
+        self.sheet.write(XLSX_SHEET_FOOTER.encode())
+        self.sheet.close()
+
+
+@contextmanager
+def _open_export_writer(path: str, format: str, compress: bool):
+    """Open a streaming writer for an export file."""
+    if format == "xlsx":
+        # XLSX is a zip archive already, so it is never gzipped again
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as workbook:
+            writer = _XlsxExportWriter(workbook)
+            yield writer
+            writer.close()
+        return
+
+    opener = gzip.open if compress else open
+    with opener(path, "wt", newline="") as export_file:
+        writer = _CsvExportWriter(export_file) if format == "csv" else _JsonExportWriter(export_file)
+        yield writer
+        writer.close()
+
+
+class ExportJob:
+    """
+    A background analytics export. Its status is kept in Redis, so any API
+    process can report it, with a local copy on the process running it.
+    """
+
+    def __init__(self, user_id: int, filename: str, total_rows: int):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.filename = filename
+        self.total_rows = total_rows
+        self.status = "running"  # running, completed, failed
+        self.rows_written = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        return round(self.rows_written / self.total_rows, 4) if self.total_rows else 0.0
+
+    @staticmethod
+    def redis_key(job_id: str) -> str:
+        return f"export:job:{job_id}"
+
+    async def save(self) -> None:
+        """Publish the job's status to every process until it expires."""
+        await set_json(
+            self.redis_key(self.id),
+            {**self.as_dict(), "user_id": self.user_id},
+            settings.EXPORT_TTL_SECONDS,
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "rows_written": self.rows_written,
+            "total_rows": self.total_rows,
+            "progress": self.progress,
+            "download_url": _download_url(self.filename) if self.status == "completed" else None,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+_export_jobs = TTLCache(maxsize=EXPORT_JOB_HISTORY, ttl=settings.EXPORT_TTL_SECONDS)
+_export_tasks: Set[asyncio.Task] = set()
+_last_export_sweep = 0.0
+
+
+def _download_url(filename: str) -> str:
+    return f"{settings.API_PREFIX}/analytics/exports/{filename}"
+
+
+async def _write_export(
+    db: AsyncSession,
+    path: str,
+    format: str,
+    compress: bool,
+    platform_ids: List[int],
+    from_date: datetime,
+    to_date: datetime,
+    job: Optional[ExportJob] = None,
+) -> None:
+    """Stream export rows from the database into a file, batch by batch."""
+    try:
+        with _open_export_writer(path, format, compress) as writer:
+            async for batch in _iter_export_batches(db, platform_ids, from_date, to_date):
+                # Compression and file IO run off the event loop
+                await asyncio.to_thread(writer.write_rows, batch)
+                if job:
+                    job.rows_written += len(batch)
+                    await job.save()
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+async def _run_export_job(
+    job: ExportJob,
+    format: str,
+    compress: bool,
+    platform_ids: List[int],
+    from_date: datetime,
+    to_date: datetime,
+) -> None:
+    path = os.path.join(settings.EXPORT_DIR, job.filename)
+    try:
+        async with AsyncSessionLocal() as db:
+            await _write_export(db, path, format, compress, platform_ids, from_date, to_date, job)
+        job.status = "completed"
+    except Exception as exc:
+        logger.exception("Analytics export %s failed", job.id)
+        job.status = "failed"
+        job.error = str(exc) or exc.__class__.__name__
+    job.finished_at = datetime.utcnow()
+    await job.save()
+
+
+def _export_expired(path: str) -> bool:
+    try:
+        return os.path.getmtime(path) < time.time() - settings.EXPORT_TTL_SECONDS
+    except OSError:
+        return True
+
+
+def remove_expired_exports() -> int:
+    """Delete export files older than EXPORT_TTL_SECONDS. Returns how many."""
+    removed = 0
+    try:
+        entries = list(os.scandir(settings.EXPORT_DIR))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if entry.name.startswith("analytics-") and entry.is_file() and _export_expired(entry.path):
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                pass  # Swept by another process
+    return removed
+
+
+async def _sweep_expired_exports() -> None:
+    """Remove expired export files, at most once per EXPORT_SWEEP_SECONDS."""
+    global _last_export_sweep
+    now = time.monotonic()
+    if now - _last_export_sweep < EXPORT_SWEEP_SECONDS:
+        return
+    _last_export_sweep = now
+    removed = await asyncio.to_thread(remove_expired_exports)
+    if removed:
+        logger.info("Removed %s expired analytics exports", removed)
+
+
+async def export_analytics(
+    db: AsyncSession,
+    user_id: int,
+    platform_id: Optional[int],
+    from_date: datetime,
+    to_date: datetime,
+    format: str = "csv",
+    compress: bool = True,
+) -> Dict[str, str]:
+    """
+    Export analytics data to a file.
+
+    Rows are streamed from server-side cursors into the file, so memory use
+    doesn't grow with the export. Small exports are written before returning
+    their download URL; larger ones run as a background job whose id is
+    returned for progress polling.
+    """
+    platform_ids = await _get_platform_ids(db, user_id, platform_id)
+    total_rows = await _count_export_rows(db, platform_ids, from_date, to_date)
+
+    os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+    await _sweep_expired_exports()
+    suffix = ".gz" if compress and format != "xlsx" else ""
+    filename = f"analytics-{user_id}-{uuid.uuid4().hex}.{format}{suffix}"
+
+    if total_rows <= settings.EXPORT_BACKGROUND_ROWS:
+        path = os.path.join(settings.EXPORT_DIR, filename)
+        await _write_export(db, path, format, compress, platform_ids, from_date, to_date)
+        return {"download_url": _download_url(filename)}
+
+    job = ExportJob(user_id=user_id, filename=filename, total_rows=total_rows)
+    _export_jobs.set(job.id, job)
+    await job.save()
+
+    task = asyncio.create_task(
+        _run_export_job(job, format, compress, platform_ids, from_date, to_date)
+    )
+    _export_tasks.add(task)
+    task.add_done_callback(_export_tasks.discard)
+    return {
+        "job_id": job.id,
+        "status_url": f"{settings.API_PREFIX}/analytics/export-jobs/{job.id}",
+    }
+
+
+async def get_export_job(user_id: int, job_id: str) -> Optional[Dict[str, Any]]:
+    """Get the progress of one of a user's export jobs, run by any process."""
+    job = _export_jobs.get(job_id)
+    if job is not None:
+        # The running process' copy is never behind the shared one
+        return job.as_dict() if job.user_id == user_id else None
+
+    shared = await get_json(ExportJob.redis_key(job_id))
+    if not shared or shared.pop("user_id") != user_id:
+        return None
+    return shared
+
+
+def get_export_path(user_id: int, filename: str) -> Optional[str]:
+    """Resolve an unexpired export file owned by a user, if it exists."""
+    if os.path.basename(filename) != filename or not filename.startswith(f"analytics-{user_id}-"):
+        return None
+    path = os.path.join(settings.EXPORT_DIR, filename)
+    return path if os.path.isfile(path) and not _export_expired(path) else None
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Analytics" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+XLSX_SHEET_FOOTER = "</sheetData></worksheet>"
@@ -0,0 +1,177 @@
+"""
+Audience demographics as compact, mergeable histograms.
+
+Platforms report demographics in their own shapes. They are normalized as
+samples are stored into ``{category: {bucket: count}}`` histograms: category
+names are canonical (``age``, ``gender``, ``geo``; others lowercased), gender
+buckets are canonical, non-numeric and zero counts are dropped, and ``geo``
+keeps its ``GEO_MAX_BUCKETS`` largest buckets with the rest summed into
+``other``. Histograms merge by adding counts, so totals survive merging.
+
+Each platform's latest sample is kept as an ``AudienceSnapshot`` and each
+user's platforms merged as a ``UserAudienceSnapshot``, both refreshed on
+ingest, so audience lookups read one small row instead of merging raw
+samples.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.platform import Platform
+from app.models.rollup import AudienceSnapshot, UserAudienceSnapshot
+
+Histogram = Dict[str, Dict[str, Union[int, float]]]
+
+CATEGORY_ALIASES = {
+    "ages": "age", "age_range": "age", "age_ranges": "age", "age_group": "age", "age_groups": "age",
+    "genders": "gender", "sex": "gender",
+    "country": "geo", "countries": "geo", "location": "geo", "locations": "geo",
+    "region": "geo", "regions": "geo",
+}
+GENDER_ALIASES = {
+    "m": "male", "man": "male", "men": "male",
+    "f": "female", "woman": "female", "women": "female",
+    "u": "unknown", "n/a": "unknown", "undisclosed": "unknown", "unspecified": "unknown",
+}
+GEO_MAX_BUCKETS = 50
+OTHER_BUCKET = "other"
+
+
+def _bucket_name(category: str, bucket: Any) -> str:
+    name = str(bucket).strip()
+    if category == "gender":
+        name = name.lower()
+        return GENDER_ALIASES.get(name, name)
+    if category == "geo" and len(name) == 2:
+        return name.upper()  # ISO country code
+    return name.replace(" ", "")
+
+
+def _compact(histogram: Histogram) -> Histogram:
+    """Fold the smallest geo buckets into ``other``."""
+    geo = histogram.get("geo")
+    if geo and len(geo) > GEO_MAX_BUCKETS:
+        ranked = sorted(
+            ((bucket, count) for bucket, count in geo.items() if bucket != OTHER_BUCKET),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        kept = dict(ranked[:GEO_MAX_BUCKETS - 1])
+        kept[OTHER_BUCKET] = geo.get(OTHER_BUCKET, 0) + sum(count for _, count in ranked[GEO_MAX_BUCKETS - 1:])
+        histogram["geo"] = kept
+    return histogram
+
+
+def normalize_demographics(raw: Any) -> Histogram:
+    """Normalize a platform's demographics payload into a compact histogram."""
+    histogram: Histogram = {}
+    if not isinstance(raw, dict):
+        return histogram
+    for category, buckets in raw.items():
+        if not isinstance(buckets, dict):
+            continue
+        category = str(category).strip().lower()
+        category = CATEGORY_ALIASES.get(category, category)
+        counts = histogram.setdefault(category, {})
+        for bucket, count in buckets.items():
+            if isinstance(count, bool) or not isinstance(count, (int, float)) or not count:
+                continue
+            name = _bucket_name(category, bucket)
+            counts[name] = counts.get(name, 0) + count
+        if not counts:
+            del histogram[category]
+    return _compact(histogram)
+
+
+def merge_demographics(histograms: Iterable[Optional[Histogram]]) -> Histogram:
+    """Add normalized histograms together."""
+    merged: Histogram = {}
+    for histogram in histograms:
+        for category, buckets in (histogram or {}).items():
+            counts = merged.setdefault(category, {})
+            for bucket, count in buckets.items():
+                counts[bucket] = counts.get(bucket, 0) + count
+    return _compact(merged)
+
+
+async def refresh_user_audiences(db: AsyncSession, user_ids: Iterable[int]) -> None:
+    """Re-merge the users' platform snapshots into their user snapshots, without committing."""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    # Serializes concurrent refreshes of a user, so each merge sees the
+    # platform snapshots committed before it; sorted to avoid deadlocks
+    for user_id in user_ids:
+        await db.execute(select(func.pg_advisory_xact_lock(func.hashtext("audience"), user_id)))
+
+    result = await db.execute(
+        select(Platform.user_id, AudienceSnapshot.followers_count, AudienceSnapshot.demographics)
+        .join(AudienceSnapshot, AudienceSnapshot.platform_id == Platform.id)
+        .where(Platform.user_id.in_(user_ids))
+    )
+    snapshots: Dict[int, List[Any]] = {user_id: [] for user_id in user_ids}
+    for row in result.all():
+        snapshots[row.user_id].append(row)
+
+    statement = pg_insert(UserAudienceSnapshot)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                column: statement.excluded[column]
+                for column in ("followers_count", "demographics", "updated_at")
+            },
+        ),
+        [
+            {
+                "user_id": user_id,
+                "followers_count": sum(row.followers_count or 0 for row in rows),
+                "demographics": merge_demographics(row.demographics for row in rows),
+                "updated_at": datetime.utcnow(),
+            }
+            for user_id, rows in snapshots.items()
+        ],
+    )
+
+
+async def refresh_audience_snapshots(db: AsyncSession, rows: Sequence[Dict[str, Any]]) -> None:
+    """
+    Take the newest of these platform metric samples as their platforms'
+    audience snapshots, unless a newer sample is already stored, and
+    re-merge the owners' user snapshots. Doesn't commit.
+    """
+    latest: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        current = latest.get(row["platform_id"])
+        if current is None or row["date"] >= current["date"]:
+            latest[row["platform_id"]] = row
+    if not latest:
+        return
+
+    statement = pg_insert(AudienceSnapshot)
+    statement = statement.on_conflict_do_update(
+        index_elements=["platform_id"],
+        set_={column: statement.excluded[column] for column in ("date", "followers_count", "demographics")},
+        # Backfilled samples don't replace a newer snapshot
+        where=AudienceSnapshot.date <= statement.excluded.date,
+    )
+    await db.execute(
+        statement,
+        [
+            {
+                "platform_id": platform_id,
+                "date": row["date"],
+                "followers_count": row.get("followers_count") or 0,
+                "demographics": normalize_demographics(row.get("demographics")),
+            }
+            for platform_id, row in latest.items()
+        ],
+    )
+
+    user_ids = (
+        await db.execute(select(Platform.user_id).where(Platform.id.in_(latest)).distinct())
+    ).scalars().all()
+    await refresh_user_audiences(db, user_ids)
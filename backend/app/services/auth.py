@@ -0,0 +1,98 @@
+"""
+Authentication services and dependencies.
+"""
+import time
+from typing import Any, Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.security import verify_and_update_password
+from app.models.user import User
+from app.schemas.auth import TokenPayload
+from app.services.user import get_cached_user, get_user, get_user_by_email
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_PREFIX}/auth/login")
+
+# Decoded access tokens, so repeat requests skip signature verification
+_token_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def decode_access_token(token: str) -> Optional[TokenPayload]:
+    """Decode and verify an access token, reusing recent results."""
+    payload = _token_cache.get(token)
+    if payload is not None:
+        # Cached entries never outlive the token, but check in case of clock skew
+        if payload.exp and payload.exp.timestamp() <= time.time():
+            _token_cache.pop(token)
+            return None
+        return payload
+
+    payload = TokenPayload.from_jwt(token, settings.JWT_SECRET_KEY)
+    if not payload or payload.type != "access":
+        return None
+    ttl = _token_cache.ttl
+    if payload.exp:
+        ttl = min(ttl, payload.exp.timestamp() - time.time())
+    _token_cache.set(token, payload, ttl)
+    return payload
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    """Authenticate a user by email and password."""
+    user = await get_user_by_email(db, email=email)
+    if not user:
+        return None
+    valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        # Stored with outdated bcrypt settings; upgrade while we have the password
+        user.hashed_password = new_hash
+        await db.commit()
+    return user
+
+
+async def get_current_user(db: AsyncSession, user_id: Any) -> Optional[User]:
+    """Get the user referenced by a token subject."""
+    try:
+        return await get_user(db, id=int(user_id))
+    except (TypeError, ValueError):
+        return None
+
+
+async def get_current_active_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """
+    Dependency that resolves the authenticated, active user for a request.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    payload = decode_access_token(token)
+    if not payload:
+        raise credentials_exception
+
+    try:
+        user = await get_cached_user(db, int(payload.sub))
+    except (TypeError, ValueError):
+        user = None
+    if not user:
+        raise credentials_exception
+
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+
+    return user
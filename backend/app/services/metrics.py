@@ -0,0 +1,409 @@
+"""
+Metric ingestion services and rollup maintenance.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import DateTime, Float, Integer, Numeric, and_, case, delete, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import bump_generations, platform_scope, user_scope
+from app.models.platform import Platform, PlatformMetric
+from app.models.post import Post, PostMetric
+from app.models.rollup import PlatformMetricRollup, PostMetricRollup, PostingTimeSlot, PostPerformance
+from app.services.audience import refresh_audience_snapshots
+from app.services.partitions import ensure_partitions
+
+ROLLUP_GRANULARITIES = ("hour", "day", "week")
+
+# Coarsest rollup whose buckets nest inside each analytics interval
+ROLLUP_FOR_INTERVAL = {"hour": "hour", "day": "day", "week": "week", "month": "day"}
+
+PLATFORM_ROLLUP_SUMS = ("impressions", "reach", "likes", "comments", "shares", "clicks")
+PLATFORM_ROLLUP_SNAPSHOTS = ("followers_count", "following_count")
+POST_ROLLUP_SUMS = ("likes", "comments", "shares", "saves", "impressions", "reach", "clicks")
+
+# Counters making up the engagement posting time slots rank hours by
+POSTING_TIME_SUMS = ("likes", "comments", "shares")
+POST_PERFORMANCE_SUMS = ("likes", "comments", "shares", "impressions", "reach", "clicks")
+
+
+def date_bucket(column, interval: str):
+    """SQL expression truncating a timestamp column to its interval bucket."""
+    # The interval is whitelisted, so it is inlined to keep the expression
+    # identical between the SELECT list and the GROUP BY clause.
+    return func.date_trunc(literal_column(f"'{interval}'"), column)
+
+
+def bucket_floor(value: datetime, granularity: str) -> datetime:
+    """Start of the bucket containing a timestamp (matches Postgres date_trunc)."""
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_after(value: datetime, granularity: str) -> datetime:
+    """Start of the bucket following the one containing a timestamp."""
+    start = bucket_floor(value, granularity)
+    if granularity == "hour":
+        return start + timedelta(hours=1)
+    if granularity == "week":
+        return start + timedelta(weeks=1)
+    if granularity == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def _upsert_rollup(model, source, columns: Sequence[str]):
+    """INSERT ... SELECT into a rollup table, replacing buckets that already exist."""
+    statement = pg_insert(model).from_select(list(columns), source)
+    keys = ("platform_id", "granularity", "bucket")
+    return statement.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={column: statement.excluded[column] for column in columns if column not in keys},
+    )
+
+
+async def refresh_platform_rollups(
+    db: AsyncSession, platform_ids: Iterable[int], start: datetime, end: datetime
+) -> None:
+    """Recompute the platform rollup buckets overlapping [start, end]."""
+    platform_ids = list(platform_ids)
+    for granularity in ROLLUP_GRANULARITIES:
+        bucket = date_bucket(PlatformMetric.date, granularity)
+        source = (
+            select(
+                PlatformMetric.platform_id,
+                literal(granularity),
+                bucket,
+                func.count(),
+                *(
+                    func.array_agg(
+                        aggregate_order_by(getattr(PlatformMetric, column), PlatformMetric.date.desc())
+                    )[1]
+                    for column in PLATFORM_ROLLUP_SNAPSHOTS
+                ),
+                *(
+                    func.coalesce(func.sum(getattr(PlatformMetric, column)), 0)
+                    for column in PLATFORM_ROLLUP_SUMS
+                ),
+            )
+            .where(
+                PlatformMetric.platform_id.in_(platform_ids),
+                PlatformMetric.date >= bucket_floor(start, granularity),
+                PlatformMetric.date < bucket_after(end, granularity),
+            )
+            .group_by(PlatformMetric.platform_id, bucket)
+        )
+        columns = (
+            "platform_id", "granularity", "bucket", "samples",
+            *PLATFORM_ROLLUP_SNAPSHOTS, *PLATFORM_ROLLUP_SUMS,
+        )
+        await db.execute(_upsert_rollup(PlatformMetricRollup, source, columns))
+
+
+async def refresh_post_rollups(
+    db: AsyncSession, platform_ids: Iterable[int], start: datetime, end: datetime
+) -> None:
+    """Recompute the post rollup buckets overlapping [start, end]."""
+    platform_ids = list(platform_ids)
+    for granularity in ROLLUP_GRANULARITIES:
+        # Buckets whose samples are all gone (their posts were deleted) would
+        # get no row from the recompute, so they are cleared first
+        await db.execute(
+            delete(PostMetricRollup).where(
+                PostMetricRollup.platform_id.in_(platform_ids),
+                PostMetricRollup.granularity == granularity,
+                PostMetricRollup.bucket >= bucket_floor(start, granularity),
+                PostMetricRollup.bucket <= end,
+            )
+        )
+        bucket = date_bucket(PostMetric.date, granularity)
+        source = (
+            select(
+                Post.platform_id,
+                literal(granularity),
+                bucket,
+                func.count(),
+                *(
+                    func.coalesce(func.sum(getattr(PostMetric, column)), 0)
+                    for column in POST_ROLLUP_SUMS
+                ),
+            )
+            .join(Post, Post.id == PostMetric.post_id)
+            .where(
+                Post.platform_id.in_(platform_ids),
+                PostMetric.date >= bucket_floor(start, granularity),
+                PostMetric.date < bucket_after(end, granularity),
+            )
+            .group_by(Post.platform_id, bucket)
+        )
+        columns = ("platform_id", "granularity", "bucket", "samples", *POST_ROLLUP_SUMS)
+        await db.execute(_upsert_rollup(PostMetricRollup, source, columns))
+
+
+async def refresh_post_performance(db: AsyncSession, post_ids: Iterable[int]) -> None:
+    """Recompute the metric totals and engagement rates of these posts."""
+    totals = (
+        select(
+            PostMetric.post_id,
+            Post.platform_id,
+            Post.published_at,
+            *(
+                func.coalesce(func.sum(getattr(PostMetric, column)), 0).label(column)
+                for column in POST_PERFORMANCE_SUMS
+            ),
+        )
+        .join(Post, Post.id == PostMetric.post_id)
+        .where(PostMetric.post_id.in_(list(post_ids)))
+        .group_by(PostMetric.post_id, Post.platform_id, Post.published_at)
+        .subquery()
+    )
+    engagements = totals.c.likes + totals.c.comments + totals.c.shares
+    rate = case(
+        (totals.c.impressions > 0, func.round((engagements * 100.0 / totals.c.impressions).cast(Numeric), 2)),
+        else_=0,
+    ).cast(Float)
+    columns = ("post_id", "platform_id", "published_at", *POST_PERFORMANCE_SUMS)
+    statement = pg_insert(PostPerformance).from_select(
+        [*columns, "engagement_rate"], select(*(totals.c[column] for column in columns), rate)
+    )
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["post_id"],
+            set_={
+                column: statement.excluded[column]
+                for column in (*columns, "engagement_rate") if column != "post_id"
+            },
+        )
+    )
+
+
+def posting_time_slot(published_at: datetime) -> int:
+    """Hour of the week a post was published in, 0 being Monday 00:00."""
+    return published_at.weekday() * 24 + published_at.hour
+
+
+def posting_engagement():
+    """SQL expression for the engagement of a post metric sample."""
+    return (
+        func.coalesce(PostMetric.likes, 0)
+        + func.coalesce(PostMetric.comments, 0)
+        + func.coalesce(PostMetric.shares, 0)
+    )
+
+
+def _engagement(row: Dict[str, Any]) -> int:
+    return sum(row.get(column) or 0 for column in POSTING_TIME_SUMS)
+
+
+async def _add_to_posting_time_slots(db: AsyncSession, deltas: Dict[tuple, List[int]]) -> None:
+    """Add (samples, engagement) deltas to (platform_id, slot) posting time slots."""
+    if not deltas:
+        return
+    statement = pg_insert(PostingTimeSlot)
+    statement = statement.on_conflict_do_update(
+        index_elements=["platform_id", "slot"],
+        set_={
+            "samples": PostingTimeSlot.samples + statement.excluded.samples,
+            "engagement": PostingTimeSlot.engagement + statement.excluded.engagement,
+        },
+    )
+    await db.execute(
+        statement,
+        [
+            {"platform_id": platform_id, "slot": slot, "samples": samples, "engagement": engagement}
+            for (platform_id, slot), (samples, engagement) in deltas.items()
+        ],
+    )
+
+
+async def fold_posting_times(db: AsyncSession, rows: Sequence[Dict[str, Any]]) -> None:
+    """
+    Fold post metric samples into their platforms' posting time slots,
+    counting only what they change. Runs before the samples are upserted,
+    so samples replacing stored ones contribute the difference.
+    """
+    posts = {
+        post_id: (platform_id, posting_time_slot(published_at))
+        for post_id, platform_id, published_at in (
+            await db.execute(
+                select(Post.id, Post.platform_id, Post.published_at).where(
+                    Post.id.in_({row["post_id"] for row in rows}), Post.published_at.isnot(None)
+                )
+            )
+        ).all()
+    }
+    rows = [row for row in rows if row["post_id"] in posts]
+    if not rows:
+        return
+
+    keys = func.unnest(
+        literal([row["post_id"] for row in rows], ARRAY(Integer)),
+        literal([row["date"] for row in rows], ARRAY(DateTime)),
+    ).table_valued("post_id", "date").render_derived()
+    dates = [row["date"] for row in rows]
+    stored = {
+        (post_id, date): engagement
+        for post_id, date, engagement in (
+            await db.execute(
+                select(PostMetric.post_id, PostMetric.date, posting_engagement())
+                .join(keys, and_(PostMetric.post_id == keys.c.post_id, PostMetric.date == keys.c.date))
+                # Lets the planner skip partitions outside the samples' range
+                .where(PostMetric.date >= min(dates), PostMetric.date <= max(dates))
+            )
+        ).all()
+    }
+
+    deltas: Dict[tuple, List[int]] = {}
+    for row in rows:
+        previous = stored.get((row["post_id"], row["date"]), 0)
+        delta = deltas.setdefault(posts[row["post_id"]], [0, 0])
+        delta[0] += (row["post_id"], row["date"]) not in stored
+        delta[1] += _engagement(row) - previous
+    await _add_to_posting_time_slots(db, deltas)
+
+
+async def move_posting_times(db: AsyncSession, post: Post, published_at: Optional[datetime]) -> None:
+    """
+    Move a post's samples from the posting time slot of its current publish
+    time to that of ``published_at`` (None takes them out), without
+    committing. Call before changing the post's ``published_at``.
+    """
+    old_slot = posting_time_slot(post.published_at) if post.published_at else None
+    new_slot = posting_time_slot(published_at) if published_at else None
+    if old_slot == new_slot:
+        return
+    samples, engagement = (
+        await db.execute(
+            select(func.count(), func.coalesce(func.sum(posting_engagement()), 0))
+            .where(PostMetric.post_id == post.id)
+        )
+    ).one()
+    if not samples:
+        return
+    deltas = {}
+    if old_slot is not None:
+        deltas[(post.platform_id, old_slot)] = [-samples, -engagement]
+    if new_slot is not None:
+        deltas[(post.platform_id, new_slot)] = [samples, engagement]
+    await _add_to_posting_time_slots(db, deltas)
+
+
+async def unfold_posting_times(db: AsyncSession, post: Post) -> None:
+    """Take a post's samples out of its platform's posting time slots, without committing."""
+    await move_posting_times(db, post, None)
+
+
+async def invalidate_metric_caches(
+    db: AsyncSession, platform_ids: Iterable[int], user_ids: Iterable[int] = ()
+) -> None:
+    """
+    Drop cached results derived from these platforms' metrics. Owners of
+    platforms already deleted aren't found, so pass them as ``user_ids``.
+    """
+    platform_ids = list(platform_ids)
+    user_ids = set(user_ids)
+    if platform_ids:
+        user_ids.update(
+            (
+                await db.execute(
+                    select(Platform.user_id).where(Platform.id.in_(platform_ids)).distinct()
+                )
+            ).scalars().all()
+        )
+    await bump_generations(
+        [platform_scope(id) for id in platform_ids] + [user_scope(id) for id in user_ids]
+    )
+
+
+def _with_dates(rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    return [{**row, "date": row.get("date") or now} for row in rows]
+
+
+async def _upsert_metrics(
+    db: AsyncSession, model, rows: Sequence[Dict[str, Any]], keys: Sequence[str]
+) -> None:
+    """
+    Bulk INSERT ... ON CONFLICT, replacing samples that already exist.
+
+    Rows must share the same keys. Later rows win over earlier ones with the
+    same conflict key, since Postgres can't update a row twice per statement.
+    """
+    unique = {tuple(row[key] for key in keys): row for row in rows}
+    await ensure_partitions(db, model.__tablename__, (row["date"] for row in unique.values()))
+    statement = pg_insert(model)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={column: statement.excluded[column] for column in rows[0] if column not in keys},
+    )
+    # Executed as batched multi-row VALUES by the insertmanyvalues feature
+    await db.execute(statement, list(unique.values()))
+
+
+async def upsert_platform_metrics(db: AsyncSession, rows: Sequence[Dict[str, Any]]) -> List[int]:
+    """
+    Store platform metric samples and fold them into the rollups, without
+    committing. Returns the affected platform IDs.
+    """
+    if not rows:
+        return []
+    rows = _with_dates(rows)
+    await _upsert_metrics(db, PlatformMetric, rows, ("platform_id", "date"))
+    await refresh_audience_snapshots(db, rows)
+
+    platform_ids = list({row["platform_id"] for row in rows})
+    dates = [row["date"] for row in rows]
+    await refresh_platform_rollups(db, platform_ids, min(dates), max(dates))
+    return platform_ids
+
+
+async def upsert_post_metrics(db: AsyncSession, rows: Sequence[Dict[str, Any]]) -> List[int]:
+    """
+    Store post metric samples and fold them into the rollups, without
+    committing. Returns the affected platform IDs.
+    """
+    if not rows:
+        return []
+    # Deduplicated up front so the posting time slots see what gets stored
+    rows = list({(row["post_id"], row["date"]): row for row in _with_dates(rows)}.values())
+    await fold_posting_times(db, rows)
+    await _upsert_metrics(db, PostMetric, rows, ("post_id", "date"))
+    await refresh_post_performance(db, {row["post_id"] for row in rows})
+
+    platform_ids = list(
+        (
+            await db.execute(
+                select(Post.platform_id)
+                .where(Post.id.in_({row["post_id"] for row in rows}))
+                .distinct()
+            )
+        ).scalars().all()
+    )
+    dates = [row["date"] for row in rows]
+    await refresh_post_rollups(db, platform_ids, min(dates), max(dates))
+    return platform_ids
+
+
+async def record_platform_metrics(db: AsyncSession, rows: Sequence[Dict[str, Any]]) -> None:
+    """Store platform metric rows and fold them into the rollups."""
+    platform_ids = await upsert_platform_metrics(db, rows)
+    if platform_ids:
+        await db.commit()
+        await invalidate_metric_caches(db, platform_ids)
+
+
+async def record_post_metrics(db: AsyncSession, rows: Sequence[Dict[str, Any]]) -> None:
+    """Store post metric rows and fold them into the rollups."""
+    platform_ids = await upsert_post_metrics(db, rows)
+    if platform_ids:
+        await db.commit()
+        await invalidate_metric_caches(db, platform_ids)
@@ -0,0 +1,135 @@
+"""
+Monthly range partitions of the metric sample tables.
+
+``platform_metrics`` and ``post_metrics`` are partitioned by month on
+``date``, so range queries only scan the months they cover and expiring old
+samples drops whole partitions instead of deleting rows. Partitions for the
+coming months are created ahead of time by the metrics sync worker, and a
+partition missing for a backfilled month is created when its first samples
+are stored.
+"""
+import re
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PARTITIONED_TABLES = ("platform_metrics", "post_metrics")
+
+PARTITION_NAME = re.compile(r"^(?P<table>\w+)_y(?P<year>\d{4})m(?P<month>\d{2})$")
+
+# Partitions known to exist, so storing samples doesn't look them up each time
+_known_partitions: Set[str] = set()
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant of the month containing a timestamp."""
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    """Start of the month ``count`` months after a month start."""
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    """Name of a table's partition holding a month, e.g. ``post_metrics_y2026m10``."""
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def parse_partition_name(name: str) -> Optional[Tuple[str, datetime]]:
+    """Table and month of a partition name, or None for other tables."""
+    match = PARTITION_NAME.match(name)
+    if not match or match.group("table") not in PARTITIONED_TABLES:
+        return None
+    return match.group("table"), datetime(int(match.group("year")), int(match.group("month")), 1)
+
+
+async def ensure_partitions(db: AsyncSession, table: str, months: Iterable[datetime]) -> List[str]:
+    """
+    Create a table's missing partitions for the given months, without
+    committing. Returns the names of the partitions created.
+    """
+    created = []
+    for month in sorted({month_start(month) for month in months}):
+        name = partition_name(table, month)
+        if name in _known_partitions:
+            continue
+        exists = (await db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})).scalar()
+        if exists:
+            _known_partitions.add(name)
+            continue
+
+        # Serializes concurrent creators of the same partition; the loser
+        # finds it created once the winner commits
+        await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": name})
+        # Names and bounds are generated from datetimes, never user input
+        await db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+            )
+        )
+        # Not cached until a later lookup sees it, in case this transaction rolls back
+        created.append(name)
+    return created
+
+
+async def get_partitions(db: AsyncSession, table: str) -> List[Tuple[str, datetime]]:
+    """A table's monthly partitions as (name, month), oldest first."""
+    result = await db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": table},
+    )
+    partitions = []
+    for (name,) in result.all():
+        parsed = parse_partition_name(name)
+        if parsed and parsed[0] == table:
+            partitions.append((name, parsed[1]))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+async def drop_expired_partitions(
+    db: AsyncSession, retention_months: int, now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Drop the partitions whose months all lie more than ``retention_months``
+    before the current month, committing after each. Returns their names.
+    """
+    cutoff = add_months(month_start(now or datetime.utcnow()), -retention_months)
+    dropped = []
+    for table in PARTITIONED_TABLES:
+        for name, month in await get_partitions(db, table):
+            if month >= cutoff:
+                break
+            await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            await db.execute(text(f"DROP TABLE {name}"))
+            await db.commit()
+            _known_partitions.discard(name)
+            dropped.append(name)
+    return dropped
+
+
+async def maintain_partitions(
+    db: AsyncSession, months_ahead: int, retention_months: int
+) -> Tuple[List[str], List[str]]:
+    """
+    Create the partitions from the current month through ``months_ahead``
+    months ahead and drop expired ones; a retention of 0 keeps every month.
+    Returns the names of the partitions created and dropped.
+    """
+    current = month_start(datetime.utcnow())
+    months = [add_months(current, offset) for offset in range(months_ahead + 1)]
+    created = []
+    for table in PARTITIONED_TABLES:
+        created += await ensure_partitions(db, table, months)
+    await db.commit()
+
+    dropped = await drop_expired_partitions(db, retention_months) if retention_months else []
+    return created, dropped
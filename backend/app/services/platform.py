@@ -0,0 +1,119 @@
+"""
+Social media platform services.
+"""
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.platform import Platform, PlatformMetric
+from app.models.post import Post
+from app.schemas.platform import PlatformCreate, PlatformUpdate
+from app.services.audience import refresh_user_audiences
+from app.services.metrics import invalidate_metric_caches
+
+# Credentials required to talk to each supported platform API
+REQUIRED_CREDENTIALS = {
+    "twitter": ["api_key", "api_secret", "access_token", "access_token_secret"],
+    "facebook": ["app_id", "app_secret", "access_token"],
+    "instagram": ["app_id", "app_secret", "access_token"],
+    "linkedin": ["client_id", "client_secret", "access_token"],
+    "tiktok": ["client_key", "client_secret", "access_token"],
+    "youtube": ["api_key"],
+}
+
+
+async def get_platform(db: AsyncSession, id: int) -> Optional[Platform]:
+    """Get a platform by ID."""
+    return await db.get(Platform, id)
+
+
+async def get_platforms_by_user(db: AsyncSession, user_id: int) -> List[Platform]:
+    """Get all platforms connected by a user."""
+    result = await db.execute(
+        select(Platform).where(Platform.user_id == user_id).order_by(Platform.id)
+    )
+    return list(result.scalars().all())
+
+
+async def create_platform(db: AsyncSession, obj_in: PlatformCreate, user_id: int) -> Platform:
+    """Create a platform for a user."""
+    db_obj = Platform(**obj_in.dict(), user_id=user_id)
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def update_platform(
+    db: AsyncSession, db_obj: Platform, obj_in: Union[PlatformUpdate, Dict[str, Any]]
+) -> Platform:
+    """Update a platform."""
+    update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_obj, field, value)
+
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def delete_platform(db: AsyncSession, id: int) -> Optional[Platform]:
+    """Delete a platform."""
+    db_obj = await db.get(Platform, id)
+    if db_obj:
+        await db.delete(db_obj)
+        await db.flush()
+        # Drop the platform's audience from its owner's merged snapshot
+        await refresh_user_audiences(db, [db_obj.user_id])
+        await db.commit()
+        await invalidate_metric_caches(db, [id], user_ids=[db_obj.user_id])
+    return db_obj
+
+
+def verify_platform_credentials(platform_type: str, credentials: Dict[str, Any]) -> bool:
+    """Check that the credentials required by a platform type are present."""
+    credentials = credentials.get("credentials", credentials)
+    required = REQUIRED_CREDENTIALS.get(platform_type)
+    if required is None:
+        # Custom platforms only need at least one credential
+        return bool(credentials)
+    return all(credentials.get(field) for field in required)
+
+
+async def get_platform_stats(db: AsyncSession, platform: Platform) -> Dict[str, Any]:
+    """Build a PlatformWithStats payload for a platform."""
+    latest = (
+        await db.execute(
+            select(PlatformMetric)
+            .where(PlatformMetric.platform_id == platform.id)
+            .order_by(PlatformMetric.date.desc())
+            .limit(1)
+        )
+    ).scalar_one_or_none()
+
+    total_posts = (
+        await db.execute(
+            select(func.count(Post.id)).where(
+                Post.platform_id == platform.id, Post.status == "published"
+            )
+        )
+    ).scalar_one()
+
+    stats = {column.key: getattr(platform, column.key) for column in Platform.__table__.columns}
+    stats.update(
+        followers_count=latest.followers_count if latest else 0,
+        following_count=latest.following_count if latest else 0,
+        total_posts=total_posts,
+        engagement_rate=(latest.engagement_rate or 0) / 100 if latest else 0.0,
+        stats={
+            "impressions": latest.impressions,
+            "reach": latest.reach,
+            "likes": latest.likes,
+            "comments": latest.comments,
+            "shares": latest.shares,
+            "clicks": latest.clicks,
+        } if latest else None,
+    )
+    return stats
@@ -0,0 +1,223 @@
+"""
+Incremental synchronization of platform and post metrics.
+
+Each sync asks a platform's API only for the samples since the platform's
+``last_sync``, re-reading the hour it last synced since that hour was still
+in progress then. Samples are upserted, so re-reads replace earlier values
+instead of duplicating them, and ``last_sync`` advances in the same
+transaction as the samples it covers.
+
+Metrics are read through the pooled clients of the publishing pipeline, so
+``PUBLISH_API_BASE_URL`` points syncs at a sandbox or mock API too. Every
+platform's metrics endpoint returns the normalized payload parsed by
+``parse_metrics_page``::
+
+    {"account": [{"date": ..., "followers_count": ..., ...}],
+     "posts": [{"id": "<external id>", "date": ..., "likes": ..., ...}],
+     "next_cursor": null}
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.platform import Platform
+from app.models.post import Post
+from app.services.metrics import (
+    bucket_floor,
+    invalidate_metric_caches,
+    upsert_platform_metrics,
+    upsert_post_metrics,
+)
+from app.services.publisher import get_client
+
+# Path of each supported platform's metrics endpoint
+PLATFORM_METRICS_PATHS = {
+    "twitter": "/2/users/me/metrics",
+    "facebook": "/v18.0/me/insights",
+    "instagram": "/v18.0/me/insights",
+    "linkedin": "/v2/organizationalEntityShareStatistics",
+    "tiktok": "/v2/user/metrics/",
+    "youtube": "/youtube/v3/channels/metrics",
+}
+
+PLATFORM_METRIC_FIELDS = (
+    "followers_count", "following_count", "posts_count", "impressions",
+    "reach", "likes", "comments", "shares", "clicks",
+)
+POST_METRIC_FIELDS = ("likes", "comments", "shares", "saves", "impressions", "reach", "clicks")
+
+
+class SyncError(Exception):
+    """A platform's metrics could not be fetched."""
+
+
+def _parse_date(value: str) -> datetime:
+    """Parse an ISO timestamp into naive UTC."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _engagement_rate(value: Any) -> int:
+    # Stored as percentage * 100
+    return round(float(value or 0) * 100)
+
+
+def parse_metrics_page(
+    platform_id: int, data: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Convert a metrics response into platform metric rows and post metric
+    rows. Post rows carry the post's external ID as ``external_id``.
+    """
+    account_rows = [
+        {
+            "platform_id": platform_id,
+            "date": _parse_date(sample["date"]),
+            **{field: int(sample.get(field) or 0) for field in PLATFORM_METRIC_FIELDS},
+            "engagement_rate": _engagement_rate(sample.get("engagement_rate")),
+            "demographics": sample.get("demographics"),
+        }
+        for sample in data.get("account") or []
+    ]
+    post_rows = [
+        {
+            "external_id": str(sample["id"]),
+            "date": _parse_date(sample["date"]),
+            **{field: int(sample.get(field) or 0) for field in POST_METRIC_FIELDS},
+            "engagement_rate": _engagement_rate(sample.get("engagement_rate")),
+            "sentiment": sample.get("sentiment"),
+            "details": sample.get("details"),
+        }
+        for sample in data.get("posts") or []
+    ]
+    return account_rows, post_rows
+
+
+async def fetch_platform_metrics(
+    platform: Platform, since: datetime, until: datetime
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Fetch a platform's metric samples in [since, until], following pagination."""
+    path = PLATFORM_METRICS_PATHS.get(platform.type)
+    if path is None:
+        raise SyncError(f"Syncing {platform.type} metrics is not supported")
+
+    credentials = platform.credentials or {}
+    headers = {"Authorization": f"Bearer {credentials.get('access_token') or credentials.get('api_key')}"}
+    params = {"since": since.isoformat() + "Z", "until": until.isoformat() + "Z"}
+    account_rows: List[Dict[str, Any]] = []
+    post_rows: List[Dict[str, Any]] = []
+    client = get_client(platform.type)
+    while True:
+        try:
+            response = await client.get(path, params=params, headers=headers)
+        except httpx.HTTPError as exc:
+            raise SyncError(f"{platform.type} metrics request failed: {exc}")
+        if response.status_code >= 400:
+            raise SyncError(f"{platform.type} returned {response.status_code}: {response.text[:200]}")
+
+        try:
+            data = response.json()
+            accounts, posts = parse_metrics_page(platform.id, data)
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            raise SyncError(f"{platform.type} returned malformed metrics: {exc}")
+        account_rows.extend(accounts)
+        post_rows.extend(posts)
+
+        if not data.get("next_cursor"):
+            return account_rows, post_rows
+        params["cursor"] = data["next_cursor"]
+
+
+def sync_window(last_sync: Optional[datetime], now: datetime) -> datetime:
+    """Start of the samples a sync needs to fetch."""
+    if last_sync is None:
+        return bucket_floor(now - timedelta(days=settings.SYNC_BACKFILL_DAYS), "hour")
+    return bucket_floor(last_sync, "hour")
+
+
+async def get_due_platforms(
+    db: AsyncSession,
+    shard_index: int,
+    shard_count: int,
+    after_id: int = 0,
+    limit: int = 100,
+) -> List[Platform]:
+    """
+    Get the next active platforms of a shard, in ID order, whose metrics
+    are older than the sync interval.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.SYNC_INTERVAL_SECONDS)
+    result = await db.execute(
+        select(Platform)
+        .where(
+            Platform.id > after_id,
+            Platform.id % shard_count == shard_index,
+            Platform.is_active.is_(True),
+            Platform.type.in_(PLATFORM_METRICS_PATHS),
+            or_(Platform.last_sync.is_(None), Platform.last_sync <= stale_before),
+        )
+        .order_by(Platform.id)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def store_platform_sync(
+    db: AsyncSession,
+    platform: Platform,
+    account_rows: List[Dict[str, Any]],
+    post_rows: List[Dict[str, Any]],
+    synced_at: datetime,
+) -> bool:
+    """
+    Upsert fetched samples and advance the platform's ``last_sync`` in one
+    transaction. Returns False, storing nothing, if another sync of the
+    platform committed first.
+    """
+    # Advance last_sync only from the value this sync started from; this
+    # also locks the platform row until commit
+    unchanged = (
+        Platform.last_sync.is_(None) if platform.last_sync is None
+        else Platform.last_sync == platform.last_sync
+    )
+    claimed = await db.execute(
+        update(Platform)
+        .where(Platform.id == platform.id, unchanged)
+        # A sync isn't an edit, so keep updated_at as it was
+        .values(last_sync=synced_at, updated_at=Platform.updated_at)
+    )
+    if claimed.rowcount == 0:
+        await db.rollback()
+        return False
+
+    external_ids = {row["external_id"] for row in post_rows}
+    post_ids = {}
+    if external_ids:
+        post_ids = dict(
+            (
+                await db.execute(
+                    select(Post.external_id, Post.id).where(
+                        Post.platform_id == platform.id, Post.external_id.in_(external_ids)
+                    )
+                )
+            ).all()
+        )
+    # Samples for posts not published through us are skipped
+    post_rows = [
+        {"post_id": post_ids[row["external_id"]], **{k: v for k, v in row.items() if k != "external_id"}}
+        for row in post_rows
+        if row["external_id"] in post_ids
+    ]
+
+    await upsert_platform_metrics(db, account_rows)
+    await upsert_post_metrics(db, post_rows)
+    await db.commit()
+    if account_rows or post_rows:
+        await invalidate_metric_caches(db, [platform.id])
+    return True
@@ -0,0 +1,336 @@
+"""
+Social media post services.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import BigInteger, and_, func, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.platform import Platform
+from app.models.post import Post, PostMetric
+from app.models.rollup import PostPerformance
+from app.schemas.post import PostCreate, PostUpdate
+from app.services.metrics import (
+    invalidate_metric_caches,
+    move_posting_times,
+    refresh_post_rollups,
+    unfold_posting_times,
+)
+
+
+METRIC_FIELDS = ("likes", "comments", "shares", "saves", "impressions", "reach", "clicks")
+
+
+def build_post_details(
+    post: Post,
+    platform_name: str,
+    platform_type: str,
+    metrics: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """Build a PostWithPlatformDetails payload."""
+    details = {column.key: getattr(post, column.key) for column in Post.__table__.columns}
+    details["platform_name"] = platform_name
+    details["platform_type"] = platform_type
+    if metrics:
+        engagements = metrics["likes"] + metrics["comments"] + metrics["shares"] + metrics["saves"]
+        metrics = {
+            **metrics,
+            "engagement_rate": (
+                round(engagements / metrics["impressions"] * 100, 2) if metrics["impressions"] else 0.0
+            ),
+        }
+    details["metrics"] = metrics
+    return details
+
+
+async def get_post_metric_totals(
+    db: AsyncSession, post_ids: Iterable[int]
+) -> Dict[int, Dict[str, int]]:
+    """Sum the metrics of many posts with a single grouped query."""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return {}
+
+    result = await db.execute(
+        select(
+            PostMetric.post_id,
+            *(
+                func.coalesce(func.sum(getattr(PostMetric, field)), 0).cast(BigInteger).label(field)
+                for field in METRIC_FIELDS
+            ),
+        )
+        .where(PostMetric.post_id.in_(post_ids))
+        .group_by(PostMetric.post_id)
+    )
+    return {
+        row.post_id: {field: getattr(row, field) for field in METRIC_FIELDS}
+        for row in result.all()
+    }
+
+
+async def get_post_details(db: AsyncSession, post: Post) -> Dict[str, Any]:
+    """Build a PostWithPlatformDetails payload for a post with its platform loaded."""
+    metrics = await get_post_metric_totals(db, [post.id])
+    return build_post_details(post, post.platform.name, post.platform.type, metrics.get(post.id))
+
+
+async def get_post(db: AsyncSession, id: int) -> Optional[Post]:
+    """Get a post by ID with its platform loaded."""
+    result = await db.execute(
+        select(Post).options(joinedload(Post.platform)).where(Post.id == id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_posts_by_user(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    platform_id: Optional[int] = None,
+    status: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Get a page of a user's posts, newest first, with optional filters."""
+    # Platform fields are projected in the same SELECT and metrics are summed
+    # for the whole page at once, so a page costs two statements regardless
+    # of its size.
+    query = (
+        select(Post, Platform.name, Platform.type)
+        .join(Platform, Platform.id == Post.platform_id)
+        .where(Post.user_id == user_id)
+    )
+    if platform_id is not None:
+        query = query.where(Post.platform_id == platform_id)
+    if status:
+        query = query.where(Post.status == status)
+
+    if cursor:
+        query = query.where(tuple_(Post.created_at, Post.id) < decode_cursor(cursor))
+
+    # Fetch one extra row to learn whether another page exists
+    query = query.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_post = rows[-1][0]
+        next_cursor = encode_cursor(last_post.created_at, last_post.id)
+
+    metrics = await get_post_metric_totals(db, [post.id for post, _, _ in rows])
+    return {
+        "items": [
+            build_post_details(post, platform_name, platform_type, metrics.get(post.id))
+            for post, platform_name, platform_type in rows
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+async def create_post(db: AsyncSession, obj_in: PostCreate, user_id: int) -> Post:
+    """Create a post on one of the user's platforms."""
+    platform = await db.get(Platform, obj_in.platform_id)
+    if not platform or platform.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Platform not found"
+        )
+
+    db_obj = Post(**obj_in.dict(), user_id=user_id)
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def create_posts_bulk(
+    db: AsyncSession, items: List[Dict[str, Any]], user_id: int
+) -> Tuple[List[Post], List[Dict[str, Any]]]:
+    """
+    Create many posts with a single multi-row INSERT ... RETURNING.
+
+    Returns the created posts and an error for each item that was invalid or
+    referenced a platform the user doesn't own.
+    """
+    errors: List[Dict[str, Any]] = []
+    valid: List[Tuple[int, PostCreate]] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, PostCreate.parse_obj(item)))
+        except ValidationError as exc:
+            errors.append({"index": index, "detail": exc.errors(include_url=False, include_context=False)})
+
+    owned_platform_ids = set(
+        (
+            await db.execute(
+                select(Platform.id).where(
+                    Platform.id.in_({post_in.platform_id for _, post_in in valid}),
+                    Platform.user_id == user_id,
+                )
+            )
+        ).scalars().all()
+    ) if valid else set()
+
+    rows = []
+    for index, post_in in valid:
+        if post_in.platform_id not in owned_platform_ids:
+            errors.append({"index": index, "detail": "Platform not found"})
+            continue
+        rows.append({**post_in.dict(), "user_id": user_id})
+
+    created: List[Post] = []
+    if rows:
+        created = list((await db.scalars(insert(Post).returning(Post), rows)).all())
+        await db.commit()
+
+    errors.sort(key=lambda error: error["index"])
+    return created, errors
+
+
+async def update_post(
+    db: AsyncSession, db_obj: Post, obj_in: Union[PostUpdate, Dict[str, Any]]
+) -> Post:
+    """Update a post."""
+    update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_obj, field, value)
+
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def start_publishing(db: AsyncSession, post: Post, lease_seconds: int) -> bool:
+    """
+    Claim a post for the publishing pipeline.
+
+    The status is checked and set in a single UPDATE, so only one of several
+    concurrent requests gets the post. A claim not renewed for
+    ``lease_seconds`` was abandoned by a crashed node and can be taken over.
+    Returns False if the post is published or claimed by someone else.
+    """
+    now = datetime.utcnow()
+    expired = now - timedelta(seconds=lease_seconds)
+    claimed = await db.scalar(
+        update(Post)
+        .where(
+            Post.id == post.id,
+            or_(
+                Post.status.is_(None),
+                Post.status.notin_(("publishing", "published")),
+                and_(Post.status == "publishing", Post.publish_claimed_at < expired),
+            ),
+        )
+        .values(status="publishing", publish_claimed_at=now)
+        .returning(Post.id)
+    )
+    await db.commit()
+    return claimed is not None
+
+
+async def renew_publish_claims(db: AsyncSession, post_ids: Iterable[int]) -> int:
+    """Extend the publish claims of posts whose jobs are still in flight."""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return 0
+    result = await db.execute(
+        update(Post)
+        .where(Post.id.in_(post_ids), Post.status == "publishing")
+        .values(publish_claimed_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def release_stale_publish_claims(db: AsyncSession, lease_seconds: int) -> int:
+    """Fail posts left "publishing" by nodes that died mid-job, so they can be published again."""
+    expired = datetime.utcnow() - timedelta(seconds=lease_seconds)
+    result = await db.execute(
+        update(Post)
+        .where(Post.status == "publishing", Post.publish_claimed_at < expired)
+        .values(status="failed")
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def delete_post(db: AsyncSession, id: int) -> Optional[Post]:
+    """Delete a post."""
+    db_obj = await db.get(Post, id)
+    if db_obj:
+        await unfold_posting_times(db, db_obj)
+        # Rollups are kept per platform, so the post's samples are taken out
+        # by recomputing the buckets they fell in once they are deleted
+        first_date, last_date = (
+            await db.execute(
+                select(func.min(PostMetric.date), func.max(PostMetric.date)).where(PostMetric.post_id == id)
+            )
+        ).one()
+        await db.delete(db_obj)
+        if first_date is not None:
+            await db.flush()
+            await refresh_post_rollups(db, [db_obj.platform_id], first_date, last_date)
+        await db.commit()
+        await invalidate_metric_caches(db, [db_obj.platform_id])
+    return db_obj
+
+
+async def publish_post(db: AsyncSession, post: Post, external_id: Optional[str] = None) -> Post:
+    """Mark a post as published."""
+    published_at = datetime.utcnow()
+    # Republished recurring posts count towards the posting time they were
+    # last published at, like their leaderboard entry below
+    await move_posting_times(db, post, published_at)
+    post.status = "published"
+    post.published_at = published_at
+    if external_id:
+        post.external_id = external_id
+    db.add(post)
+    # Republished recurring posts rank within their latest publish date
+    await db.execute(
+        update(PostPerformance)
+        .where(PostPerformance.post_id == post.id)
+        .values(published_at=post.published_at)
+    )
+    await db.commit()
+    await invalidate_metric_caches(db, [post.platform_id])
+    await db.refresh(post)
+    return post
+
+
+async def get_post_analytics(db: AsyncSession, post: Post) -> Dict[str, Any]:
+    """Get aggregated metrics for a published post."""
+    row = (
+        await db.execute(
+            select(
+                func.coalesce(func.sum(PostMetric.likes), 0).label("likes"),
+                func.coalesce(func.sum(PostMetric.comments), 0).label("comments"),
+                func.coalesce(func.sum(PostMetric.shares), 0).label("shares"),
+                func.coalesce(func.sum(PostMetric.saves), 0).label("saves"),
+                func.coalesce(func.sum(PostMetric.impressions), 0).label("impressions"),
+                func.coalesce(func.sum(PostMetric.reach), 0).label("reach"),
+                func.coalesce(func.sum(PostMetric.clicks), 0).label("clicks"),
+                func.max(PostMetric.date).label("last_updated"),
+            ).where(PostMetric.post_id == post.id)
+        )
+    ).one()
+
+    totals = dict(row._mapping)
+    engagements = totals["likes"] + totals["comments"] + totals["shares"] + totals["saves"]
+    totals["engagement_rate"] = (
+        round(engagements / totals["impressions"] * 100, 2) if totals["impressions"] else 0.0
+    )
+    return {
+        "post_id": post.id,
+        "platform_id": post.platform_id,
+        "published_at": post.published_at,
+        **totals,
+    }
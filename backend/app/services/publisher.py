@@ -0,0 +1,399 @@
+"""
+Publishing pipeline for delivering posts to social platforms.
+
+Posts are published by a pool of asyncio workers that share one pooled
+``httpx.AsyncClient`` per platform type. Every request first takes a token
+from a bucket keyed by platform type and account credentials, so bursts are
+smoothed out to each provider's quota instead of being rejected by it.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from itertools import islice
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.platform import Platform
+from app.models.post import Post
+from app.services.post import publish_post, release_stale_publish_claims, renew_publish_claims
+
+logger = logging.getLogger(__name__)
+
+# Base URL and publish path of each supported platform API
+PLATFORM_APIS = {
+    "twitter": ("https://api.twitter.com", "/2/tweets"),
+    "facebook": ("https://graph.facebook.com", "/v18.0/me/feed"),
+    "instagram": ("https://graph.facebook.com", "/v18.0/me/media"),
+    "linkedin": ("https://api.linkedin.com", "/v2/ugcPosts"),
+    "tiktok": ("https://open.tiktokapis.com", "/v2/post/publish/content/init/"),
+    "youtube": ("https://www.googleapis.com", "/youtube/v3/activities"),
+}
+
+# Publish quotas per account as (requests, per seconds)
+PLATFORM_RATE_LIMITS = {
+    "twitter": (200, 15 * 60),
+    "facebook": (200, 60 * 60),
+    "instagram": (25, 24 * 60 * 60),
+    "linkedin": (150, 24 * 60 * 60),
+    "tiktok": (6, 60),
+    "youtube": (6, 24 * 60 * 60),
+}
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class PublishError(Exception):
+    """A platform rejected or failed to accept a post."""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket allowing ``capacity`` requests per ``period`` seconds."""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def release(self) -> None:
+        """Return a reserved token that won't be used."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def credential_fingerprint(credentials: Optional[Dict[str, Any]]) -> str:
+    """Stable, non-reversible key identifying an account's credentials."""
+    payload = json.dumps(credentials or {}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def get_bucket(platform_type: str, credentials: Optional[Dict[str, Any]]) -> TokenBucket:
+    """Get the rate limiter for a platform account."""
+    key = (platform_type, credential_fingerprint(credentials))
+    bucket = _buckets.get(key)
+    if bucket is None:
+        bucket = _buckets[key] = TokenBucket(*PLATFORM_RATE_LIMITS[platform_type])
+    return bucket
+
+
+def get_client(platform_type: str) -> httpx.AsyncClient:
+    """Get the pooled HTTP client for a platform type."""
+    client = _clients.get(platform_type)
+    if client is None:
+        base_url = settings.PUBLISH_API_BASE_URL or PLATFORM_APIS[platform_type][0]
+        client = _clients[platform_type] = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=settings.PUBLISH_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.PUBLISH_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PUBLISH_MAX_CONNECTIONS,
+            ),
+        )
+    return client
+
+
+async def close_clients() -> None:
+    """Close all pooled HTTP clients."""
+    clients = list(_clients.values())
+    _clients.clear()
+    await asyncio.gather(*(client.aclose() for client in clients))
+
+
+def build_payload(platform_type: str, post: Post) -> Dict[str, Any]:
+    """Build the request body publishing a post on a platform."""
+    text = post.content
+    if post.hashtags:
+        text = f"{text}\n\n" + " ".join(f"#{tag.lstrip('#')}" for tag in post.hashtags)
+
+    if platform_type == "twitter":
+        return {"text": text}
+    if platform_type == "facebook":
+        return {"message": text, "link": post.og_url}
+    if platform_type == "instagram":
+        return {"caption": text, "image_url": (post.media_urls or [None])[0]}
+    if platform_type == "linkedin":
+        return {
+            "lifecycleState": "PUBLISHED",
+            "specificContent": {"com.linkedin.ugc.ShareContent": {"shareCommentary": {"text": text}}},
+        }
+    if platform_type == "tiktok":
+        return {"post_info": {"title": text}, "source_info": {"video_url": (post.media_urls or [None])[0]}}
+    return {"snippet": {"description": text}}
+
+
+async def send_post(
+    platform_type: str, credentials: Optional[Dict[str, Any]], payload: Dict[str, Any]
+) -> Optional[str]:
+    """Send a publish request, returning the post's ID on the platform."""
+    if platform_type not in PLATFORM_APIS:
+        raise PublishError(f"Publishing to {platform_type} is not supported")
+
+    credentials = credentials or {}
+    params, headers = {}, {}
+    if platform_type == "youtube":
+        params["key"] = credentials.get("api_key")
+    else:
+        headers["Authorization"] = f"Bearer {credentials.get('access_token')}"
+
+    try:
+        response = await get_client(platform_type).post(
+            PLATFORM_APIS[platform_type][1], json=payload, params=params, headers=headers
+        )
+    except httpx.HTTPError as exc:
+        raise PublishError(f"{platform_type} request failed: {exc}", retryable=True)
+
+    if response.status_code >= 400:
+        retry_after = response.headers.get("Retry-After")
+        raise PublishError(
+            f"{platform_type} returned {response.status_code}: {response.text[:200]}",
+            retryable=response.status_code in RETRYABLE_STATUS_CODES,
+            retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+        )
+
+    try:
+        data = response.json() if response.content else {}
+    except ValueError:
+        raise PublishError(f"{platform_type} returned a malformed response: {response.text[:200]}")
+    if not isinstance(data, dict):
+        data = {}
+    external_id = data.get("id") or (data.get("data") or {}).get("id")
+    return str(external_id) if external_id is not None else None
+
+
+async def deliver_post(
+    post: Post, platform: Platform, max_wait: Optional[float] = None
+) -> Optional[str]:
+    """
+    Publish a post on its platform, waiting for the account's rate limit.
+
+    If the wait would exceed ``max_wait`` seconds, a retryable PublishError
+    carrying the wait as ``retry_after`` is raised instead.
+    """
+    if platform.type not in PLATFORM_APIS:
+        raise PublishError(f"Publishing to {platform.type} is not supported")
+    bucket = get_bucket(platform.type, platform.credentials)
+    delay = bucket.reserve()
+    if max_wait is not None and delay > max_wait:
+        bucket.release()
+        raise PublishError(f"{platform.type} rate limit reached", retryable=True, retry_after=delay)
+    await asyncio.sleep(delay)
+    return await send_post(platform.type, platform.credentials, build_payload(platform.type, post))
+
+
+@dataclass
+class PublishJob:
+    """An in-flight request to publish a post."""
+    post_id: int
+    user_id: int
+    platform_type: str
+    credentials: Optional[Dict[str, Any]]
+    payload: Dict[str, Any]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued, running, published, failed
+    attempts: int = 0
+    reserved: bool = False  # Holds a rate limit token for its next attempt
+    external_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+
+class PublishPipeline:
+    """
+    Asyncio worker pool publishing posts in the background.
+
+    Jobs waiting on a rate limit are parked on a timer rather than holding a
+    worker, so a throttled account never blocks posts to other accounts.
+    Job state lives in memory on the node that accepted the job; the outcome
+    is persisted on the post itself. While a job is unfinished its node keeps
+    renewing the post's publish claim, and every node fails posts whose claim
+    went stale, so a node dying mid-job doesn't leave them "publishing".
+    """
+
+    def __init__(self, workers: int, queue_size: int, history: int):
+        self.workers = workers
+        self.history = history
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.jobs: "OrderedDict[str, PublishJob]" = OrderedDict()
+        self._tasks = []
+        self._retries = set()
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._maintain_claims()))
+
+    async def stop(self) -> None:
+        tasks = [*self._retries, *self._tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._retries.clear()
+        self._tasks = []
+
+        # Unfinished jobs are lost with the process; don't leave their posts
+        # stuck in "publishing".
+        unfinished = [job for job in self.jobs.values() if job.status in ("queued", "running")]
+        if unfinished:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(Post)
+                    .where(Post.id.in_([job.post_id for job in unfinished]), Post.status == "publishing")
+                    .values(status="failed")
+                )
+                await db.commit()
+        await close_clients()
+
+    def submit(self, post: Post) -> PublishJob:
+        """Queue a post with its platform loaded. Raises asyncio.QueueFull when saturated."""
+        platform = post.platform
+        job = PublishJob(
+            post_id=post.id,
+            user_id=post.user_id,
+            platform_type=platform.type,
+            credentials=platform.credentials,
+            payload=build_payload(platform.type, post),
+        )
+        self.queue.put_nowait(job)
+        self.jobs[job.id] = job
+        self._trim_history()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[PublishJob]:
+        return self.jobs.get(job_id)
+
+    def _trim_history(self) -> None:
+        excess = len(self.jobs) - self.history
+        if excess <= 0:
+            return
+        # Oldest finished jobs first; unfinished ones stay however old they are
+        finished = (job_id for job_id, job in self.jobs.items() if job.finished_at is not None)
+        for job_id in list(islice(finished, excess)):
+            del self.jobs[job_id]
+
+    async def _maintain_claims(self) -> None:
+        """Renew this node's publish claims, and release stale ones, every third of a lease."""
+        interval = settings.PUBLISH_LEASE_SECONDS / 3
+        while True:
+            try:
+                await self._renew_claims()
+            except Exception:
+                logger.exception("Maintaining publish claims failed")
+            await asyncio.sleep(interval)
+
+    async def _renew_claims(self) -> None:
+        post_ids = [job.post_id for job in self.jobs.values() if job.finished_at is None]
+        async with AsyncSessionLocal() as db:
+            await renew_publish_claims(db, post_ids)
+            released = await release_stale_publish_claims(db, settings.PUBLISH_LEASE_SECONDS)
+        if released:
+            logger.warning("Failed %s posts abandoned mid-publish", released)
+
+    def _retry_later(self, job: PublishJob, delay: float) -> None:
+        async def requeue():
+            await asyncio.sleep(delay)
+            # Waits for room in a full queue rather than dropping the job
+            await self.queue.put(job)
+
+        job.status = "queued"
+        task = asyncio.create_task(requeue())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            except Exception:
+                logger.exception("Publish job %s crashed", job.id)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: PublishJob) -> None:
+        if job.platform_type in PLATFORM_RATE_LIMITS and not job.reserved:
+            delay = get_bucket(job.platform_type, job.credentials).reserve()
+            if delay > 0:
+                job.reserved = True
+                self._retry_later(job, delay)
+                return
+
+        job.status = "running"
+        job.reserved = False
+        job.attempts += 1
+        try:
+            job.external_id = await send_post(job.platform_type, job.credentials, job.payload)
+        except PublishError as exc:
+            if exc.retryable and job.attempts < settings.PUBLISH_MAX_ATTEMPTS:
+                self._retry_later(job, exc.retry_after or 2 ** job.attempts)
+                return
+            job.error = str(exc)
+        except Exception as exc:
+            logger.exception("Publish job %s failed", job.id)
+            job.error = str(exc) or exc.__class__.__name__
+
+        try:
+            await self._record(job)
+        except Exception as exc:
+            # The post must not stay "publishing" with nothing left to retry it
+            logger.exception("Recording publish job %s failed", job.id)
+            job.error = job.error or f"Recording the outcome failed: {exc.__class__.__name__}"
+            await self._mark_failed(job)
+
+        job.status = "failed" if job.error else "published"
+        job.finished_at = datetime.utcnow()
+
+    async def _record(self, job: PublishJob) -> None:
+        """Persist a finished job's outcome on its post."""
+        async with AsyncSessionLocal() as db:
+            post = await db.get(Post, job.post_id)
+            if post is not None:
+                if job.error is None:
+                    await publish_post(db, post, external_id=job.external_id)
+                else:
+                    post.status = "failed"
+                    await db.commit()
+
+    async def _mark_failed(self, job: PublishJob) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(Post)
+                    .where(Post.id == job.post_id, Post.status == "publishing")
+                    .values(status="failed")
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Marking the post of publish job %s failed", job.id)
+
+
+publish_pipeline = PublishPipeline(
+    workers=settings.PUBLISH_WORKERS,
+    queue_size=settings.PUBLISH_QUEUE_SIZE,
+    history=settings.PUBLISH_JOB_HISTORY,
+)
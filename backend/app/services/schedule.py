@@ -0,0 +1,445 @@
+"""
+Post scheduling services.
+"""
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.recurrence import get_zone, iter_occurrences, parse_rule, to_local
+from app.models.platform import Platform
+from app.models.post import Post
+from app.models.schedule import Schedule
+from app.schemas.schedule import ScheduleCreate, ScheduleUpdate
+from app.services.post import get_post_metric_totals
+
+_with_post_and_platform = joinedload(Schedule.post).joinedload(Post.platform)
+
+RECURRENCE_FIELDS = ("scheduled_at", "timezone", "recurrence", "recurrence_rule")
+
+
+def iter_schedule_occurrences(
+    schedule: Union[Schedule, Dict[str, Any]], after: datetime
+) -> Iterator[datetime]:
+    """
+    Lazily yield a recurring schedule's occurrences after a UTC time.
+
+    A COUNT-limited series ends at its COUNT-th occurrence from the anchor,
+    including occurrences that were skipped.
+    """
+    if not isinstance(schedule, dict):
+        schedule = {field: getattr(schedule, field) for field in (
+            "recurrence", "recurrence_rule", "recurrence_anchor", "timezone"
+        )}
+    if not schedule["recurrence"]:
+        return iter(())
+
+    rule = parse_rule(schedule["recurrence"], schedule["recurrence_rule"])
+    return iter_occurrences(schedule["recurrence_anchor"], schedule["timezone"], rule, after)
+
+
+def recurrence_anchor(
+    scheduled_at: datetime,
+    timezone: Optional[str],
+    recurrence: Optional[str],
+    recurrence_rule: Optional[str],
+) -> Optional[datetime]:
+    """Local wall-clock time pinning a series, validating its rule."""
+    if not recurrence:
+        return None
+    parse_rule(recurrence, recurrence_rule)
+    return to_local(scheduled_at, get_zone(timezone or "UTC"))
+
+
+def _set_recurrence_anchor(schedule: Schedule) -> None:
+    """Pin a series to the local wall-clock time of its scheduled_at."""
+    if not schedule.recurrence:
+        schedule.recurrence_rule = None
+    try:
+        schedule.recurrence_anchor = recurrence_anchor(
+            schedule.scheduled_at, schedule.timezone, schedule.recurrence, schedule.recurrence_rule
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+
+def _advance_recurrence(schedule: Schedule) -> bool:
+    """Move a recurring schedule on to its next occurrence, if it has one."""
+    if not schedule.recurrence:
+        return False
+
+    schedule.occurrence_count += 1
+    # Occurrences missed while no worker was running are skipped rather than
+    # published in a burst; they still count against the rule's COUNT.
+    after = max(schedule.scheduled_at, datetime.utcnow())
+    try:
+        next_at = next(iter_schedule_occurrences(schedule, after), None)
+    except ValueError:
+        # A rule stored before it was validated ends the series
+        next_at = None
+    if next_at is None:
+        return False
+
+    schedule.scheduled_at = next_at
+    schedule.status = "pending"
+    return True
+
+
+def build_schedule_details(
+    schedule: Schedule,
+    post_content: str,
+    post_type: str,
+    platform_id: int,
+    platform_name: str,
+    platform_type: str,
+    metrics: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """Build a ScheduleWithPostDetails payload."""
+    details = {column.key: getattr(schedule, column.key) for column in Schedule.__table__.columns}
+    details.update(
+        post_content=post_content,
+        post_type=post_type,
+        platform_id=platform_id,
+        platform_name=platform_name,
+        platform_type=platform_type,
+        metrics=metrics,
+    )
+    return details
+
+
+async def get_schedule_details(db: AsyncSession, schedule: Schedule) -> Dict[str, Any]:
+    """Build a ScheduleWithPostDetails payload for a schedule with its post loaded."""
+    post = schedule.post
+    metrics = await get_post_metric_totals(db, [post.id])
+    return build_schedule_details(
+        schedule,
+        post.content,
+        post.content_type,
+        post.platform_id,
+        post.platform.name,
+        post.platform.type,
+        metrics.get(post.id),
+    )
+
+
+async def get_schedule(db: AsyncSession, id: int) -> Optional[Schedule]:
+    """Get a schedule by ID with its post and platform loaded."""
+    result = await db.execute(
+        select(Schedule).options(_with_post_and_platform).where(Schedule.id == id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_schedules_by_user(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    platform_id: Optional[int] = None,
+    status: Optional[str] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Get a page of a user's schedules, soonest first, with optional filters."""
+    # Post and platform fields are projected in the same SELECT and metrics are
+    # summed for the whole page at once, so a page costs two statements
+    # regardless of its size.
+    query = (
+        select(
+            Schedule,
+            Post.content,
+            Post.content_type,
+            Post.platform_id,
+            Platform.name,
+            Platform.type,
+        )
+        .join(Post, Post.id == Schedule.post_id)
+        .join(Platform, Platform.id == Post.platform_id)
+        .where(Schedule.user_id == user_id)
+    )
+    if platform_id is not None:
+        query = query.where(Post.platform_id == platform_id)
+    if status:
+        query = query.where(Schedule.status == status)
+    if from_date:
+        query = query.where(Schedule.scheduled_at >= from_date)
+    if to_date:
+        query = query.where(Schedule.scheduled_at <= to_date)
+
+    if cursor:
+        query = query.where(tuple_(Schedule.scheduled_at, Schedule.id) > decode_cursor(cursor))
+
+    # Fetch one extra row to learn whether another page exists
+    query = query.order_by(Schedule.scheduled_at, Schedule.id).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_schedule = rows[-1][0]
+        next_cursor = encode_cursor(last_schedule.scheduled_at, last_schedule.id)
+
+    metrics = await get_post_metric_totals(db, {row[0].post_id for row in rows})
+    return {
+        "items": [
+            build_schedule_details(*row, metrics=metrics.get(row[0].post_id))
+            for row in rows
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+async def get_upcoming_schedules(
+    db: AsyncSession, user_id: int, days: int = 7
+) -> List[Dict[str, Any]]:
+    """
+    Get pending schedules due within the next number of days.
+
+    Recurring schedules only store their next occurrence, so later occurrences
+    inside the window are expanded here as extra entries.
+    """
+    now = datetime.utcnow()
+    end = now + timedelta(days=days)
+    page = await get_schedules_by_user(
+        db,
+        user_id=user_id,
+        status="pending",
+        from_date=now,
+        to_date=end,
+        limit=1000,
+    )
+
+    upcoming = []
+    for item in page["items"]:
+        upcoming.append(item)
+        for occurrence in iter_schedule_occurrences(item, item["scheduled_at"]):
+            if occurrence > end:
+                break
+            upcoming.append({**item, "scheduled_at": occurrence})
+    upcoming.sort(key=lambda item: (item["scheduled_at"], item["id"]))
+    return upcoming
+
+
+def get_next_occurrences(schedule: Schedule, count: int) -> List[datetime]:
+    """Get the next occurrences of a pending schedule, its current one first."""
+    if schedule.status != "pending":
+        return []
+    later = iter_schedule_occurrences(schedule, schedule.scheduled_at)
+    return [schedule.scheduled_at, *islice(later, count - 1)]
+
+
+async def create_schedule(db: AsyncSession, obj_in: ScheduleCreate, user_id: int) -> Schedule:
+    """Schedule one of the user's posts."""
+    post = await db.get(Post, obj_in.post_id)
+    if not post or post.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found"
+        )
+
+    db_obj = Schedule(**obj_in.dict(), user_id=user_id)
+    _set_recurrence_anchor(db_obj)
+    post.status = "scheduled"
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def create_schedules_bulk(
+    db: AsyncSession, items: List[Dict[str, Any]], user_id: int
+) -> Tuple[List[Schedule], List[Dict[str, Any]]]:
+    """
+    Create many schedules with a single multi-row INSERT ... RETURNING.
+
+    Returns the created schedules and an error for each item that was invalid
+    or referenced a post the user doesn't own.
+    """
+    errors: List[Dict[str, Any]] = []
+    valid: List[Tuple[int, ScheduleCreate]] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, ScheduleCreate.parse_obj(item)))
+        except ValidationError as exc:
+            errors.append({"index": index, "detail": exc.errors(include_url=False, include_context=False)})
+
+    owned_post_ids = set(
+        (
+            await db.execute(
+                select(Post.id).where(
+                    Post.id.in_({schedule_in.post_id for _, schedule_in in valid}),
+                    Post.user_id == user_id,
+                )
+            )
+        ).scalars().all()
+    ) if valid else set()
+
+    rows = []
+    for index, schedule_in in valid:
+        if schedule_in.post_id not in owned_post_ids:
+            errors.append({"index": index, "detail": "Post not found"})
+            continue
+        values = schedule_in.dict()
+        try:
+            values["recurrence_anchor"] = recurrence_anchor(
+                values["scheduled_at"], values["timezone"], values["recurrence"], values["recurrence_rule"]
+            )
+        except ValueError as exc:
+            errors.append({"index": index, "detail": str(exc)})
+            continue
+        rows.append({**values, "user_id": user_id})
+
+    created: List[Schedule] = []
+    if rows:
+        created = list((await db.scalars(insert(Schedule).returning(Schedule), rows)).all())
+        await db.execute(
+            update(Post)
+            .where(Post.id.in_({row["post_id"] for row in rows}))
+            .values(status="scheduled")
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+    errors.sort(key=lambda error: error["index"])
+    return created, errors
+
+
+async def update_schedule(
+    db: AsyncSession, db_obj: Schedule, obj_in: Union[ScheduleUpdate, Dict[str, Any]]
+) -> Schedule:
+    """Update a schedule."""
+    update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_obj, field, value)
+    if any(field in update_data for field in RECURRENCE_FIELDS):
+        _set_recurrence_anchor(db_obj)
+
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def delete_schedule(db: AsyncSession, id: int) -> Optional[Schedule]:
+    """Delete a schedule."""
+    db_obj = await db.get(Schedule, id)
+    if db_obj:
+        await db.delete(db_obj)
+        await db.commit()
+    return db_obj
+
+
+async def claim_due_schedules(db: AsyncSession, limit: int) -> List[Schedule]:
+    """
+    Atomically claim a batch of due schedules for publishing.
+
+    Claimed rows move to "processing", so concurrent workers skip them both
+    while the claim is in flight (SKIP LOCKED) and after it commits.
+    """
+    now = datetime.utcnow()
+    due = (
+        select(Schedule.id)
+        .where(Schedule.status == "pending", Schedule.scheduled_at <= now)
+        .order_by(Schedule.scheduled_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed_ids = (
+        await db.execute(
+            update(Schedule)
+            .where(Schedule.id.in_(due.scalar_subquery()))
+            .values(status="processing", claimed_at=now)
+            .returning(Schedule.id)
+            .execution_options(synchronize_session=False)
+        )
+    ).scalars().all()
+    await db.commit()
+
+    if not claimed_ids:
+        return []
+    result = await db.execute(
+        select(Schedule)
+        .options(_with_post_and_platform)
+        .where(Schedule.id.in_(claimed_ids))
+        .order_by(Schedule.scheduled_at)
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
+
+
+async def renew_claims(db: AsyncSession, schedule_ids: Iterable[int]) -> int:
+    """Extend the lease of schedules a worker is still publishing."""
+    schedule_ids = list(schedule_ids)
+    if not schedule_ids:
+        return 0
+    result = await db.execute(
+        update(Schedule)
+        .where(Schedule.id.in_(schedule_ids), Schedule.status == "processing")
+        .values(claimed_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def release_stale_claims(db: AsyncSession, lease_seconds: int) -> int:
+    """
+    Return claims abandoned by crashed workers to the pending queue.
+
+    Only claims whose lease went unrenewed for ``lease_seconds`` are
+    released; other edits to a schedule don't extend its lease.
+    """
+    expired = datetime.utcnow() - timedelta(seconds=lease_seconds)
+    result = await db.execute(
+        update(Schedule)
+        .where(Schedule.status == "processing", Schedule.claimed_at < expired)
+        .values(status="pending")
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def complete_schedule(db: AsyncSession, schedule: Schedule) -> Schedule:
+    """Mark a claimed schedule as completed, or queue its next occurrence."""
+    schedule.completed_at = datetime.utcnow()
+    schedule.error_message = None
+    if not _advance_recurrence(schedule):
+        schedule.status = "completed"
+    db.add(schedule)
+    await db.commit()
+    return schedule
+
+
+async def postpone_schedule(db: AsyncSession, schedule: Schedule, delay: float) -> Schedule:
+    """Return a claimed schedule to the queue to be retried after a delay."""
+    schedule.status = "pending"
+    schedule.scheduled_at = datetime.utcnow() + timedelta(seconds=delay)
+    db.add(schedule)
+    await db.commit()
+    return schedule
+
+
+async def fail_schedule(db: AsyncSession, schedule: Schedule, error: str) -> Schedule:
+    """
+    Mark a claimed schedule and its post as failed.
+
+    A recurring schedule keeps the error but moves on to its next occurrence.
+    """
+    schedule.post.status = "failed"
+    schedule.completed_at = datetime.utcnow()
+    schedule.error_message = error
+    if not _advance_recurrence(schedule):
+        schedule.status = "failed"
+    db.add(schedule)
+    await db.commit()
+    return schedule
@@ -0,0 +1,150 @@
+"""
+User management services.
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import TTLCache, delete_keys, get_json, set_json
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.security import hash_password
+from app.models.user import User
+from app.schemas.user import UserCreate, UserUpdate
+
+
+# Columns kept in the user cache; the password hash never leaves the database
+CACHED_USER_COLUMNS = tuple(
+    column for column in User.__table__.columns if column.key != "hashed_password"
+)
+
+_user_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def _user_cache_key(id: int) -> str:
+    return f"cache:user:{id}"
+
+
+async def get_user(db: AsyncSession, id: int) -> Optional[User]:
+    """Get a user by ID."""
+    return await db.get(User, id)
+
+
+async def get_cached_user(db: AsyncSession, id: int) -> Optional[User]:
+    """
+    Get a user by ID through the in-process cache and, if enabled, Redis.
+
+    Returns a fresh detached instance on every call, so callers may attach
+    and modify it like any loaded user. ``hashed_password`` is not loaded.
+    """
+    data = _user_cache.get(id)
+    if data is None and settings.AUTH_CACHE_REDIS:
+        data = await get_json(_user_cache_key(id))
+        if data is not None:
+            for column in CACHED_USER_COLUMNS:
+                if isinstance(column.type, DateTime) and data[column.key]:
+                    data[column.key] = datetime.fromisoformat(data[column.key])
+            _user_cache.set(id, data)
+
+    if data is None:
+        user = await db.get(User, id)
+        if user is None:
+            return None
+        data = {column.key: getattr(user, column.key) for column in CACHED_USER_COLUMNS}
+        _user_cache.set(id, data)
+        if settings.AUTH_CACHE_REDIS:
+            await set_json(_user_cache_key(id), data, settings.AUTH_CACHE_TTL_SECONDS)
+        return user
+
+    user = User(**data)
+    make_transient_to_detached(user)
+    return user
+
+
+async def invalidate_cached_user(id: int) -> None:
+    """Drop a user from the cache after it changes."""
+    _user_cache.pop(id)
+    if settings.AUTH_CACHE_REDIS:
+        await delete_keys(_user_cache_key(id))
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    """Get a user by email address."""
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalar_one_or_none()
+
+
+async def get_users(
+    db: AsyncSession, limit: int = 100, cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """Get a page of users in signup order."""
+    query = select(User)
+    if cursor:
+        query = query.where(tuple_(User.created_at, User.id) > decode_cursor(cursor))
+
+    # Fetch one extra row to learn whether another page exists
+    query = query.order_by(User.created_at, User.id).limit(limit + 1)
+    users = list((await db.execute(query)).scalars().all())
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
+
+    return {"items": users, "next_cursor": next_cursor}
+
+
+async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
+    """Create a new user."""
+    if await get_user_by_email(db, email=user_in.email):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A user with this email already exists"
+        )
+
+    db_obj = User(
+        email=user_in.email,
+        full_name=user_in.full_name,
+        hashed_password=await hash_password(user_in.password),
+        is_active=user_in.is_active,
+        is_admin=user_in.is_admin,
+    )
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def update_user(
+    db: AsyncSession, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
+) -> User:
+    """Update a user."""
+    update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+
+    if update_data.get("password"):
+        update_data["hashed_password"] = await hash_password(update_data.pop("password"))
+    else:
+        update_data.pop("password", None)
+
+    for field, value in update_data.items():
+        setattr(db_obj, field, value)
+
+    db.add(db_obj)
+    await db.commit()
+    await invalidate_cached_user(db_obj.id)
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def delete_user(db: AsyncSession, id: int) -> Optional[User]:
+    """Delete a user."""
+    db_obj = await db.get(User, id)
+    if db_obj:
+        await db.delete(db_obj)
+        await db.commit()
+        await invalidate_cached_user(id)
+    return db_obj
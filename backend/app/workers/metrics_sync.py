@@ -0,0 +1,142 @@
+"""
+Platform metrics sync worker.
+
+Run with ``python -m app.workers.metrics_sync``. Platforms are sharded across
+replicas by ``id % SYNC_SHARD_COUNT``; give each replica its own
+``SYNC_SHARD_INDEX``. Every poll, a replica walks its shard in ID order and
+refreshes the platforms whose metrics are older than ``SYNC_INTERVAL_SECONDS``,
+``SYNC_CONCURRENCY`` at a time.
+
+The shard 0 replica also maintains the monthly metric partitions, creating
+upcoming months and dropping those past ``METRICS_RETENTION_MONTHS``.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.platform import Platform
+from app.services.partitions import maintain_partitions
+from app.services.platform_sync import (
+    SyncError,
+    fetch_platform_metrics,
+    get_due_platforms,
+    store_platform_sync,
+    sync_window,
+)
+from app.services.publisher import close_clients
+
+logger = logging.getLogger(__name__)
+
+
+async def sync_platform(platform: Platform, semaphore: asyncio.Semaphore) -> bool:
+    """Fetch and store a platform's new metrics. Returns whether it synced."""
+    async with semaphore:
+        now = datetime.utcnow()
+        try:
+            account_rows, post_rows = await fetch_platform_metrics(
+                platform, sync_window(platform.last_sync, now), now
+            )
+            async with AsyncSessionLocal() as db:
+                stored = await store_platform_sync(db, platform, account_rows, post_rows, now)
+        except SyncError as exc:
+            logger.warning("Syncing platform %s failed: %s", platform.id, exc)
+            return False
+        except Exception:
+            logger.exception("Syncing platform %s failed", platform.id)
+            return False
+
+    if not stored:
+        logger.info("Platform %s was synced concurrently, skipping", platform.id)
+    return stored
+
+
+async def sync_due_platforms() -> int:
+    """Sync every due platform in this replica's shard. Returns the number synced."""
+    started_at = time.monotonic()
+    semaphore = asyncio.Semaphore(settings.SYNC_CONCURRENCY)
+    synced = 0
+    after_id = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            platforms = await get_due_platforms(
+                db,
+                settings.SYNC_SHARD_INDEX,
+                settings.SYNC_SHARD_COUNT,
+                after_id=after_id,
+                limit=settings.SYNC_BATCH_SIZE,
+            )
+        if not platforms:
+            break
+        after_id = platforms[-1].id
+        results = await asyncio.gather(*(sync_platform(platform, semaphore) for platform in platforms))
+        synced += sum(results)
+
+    elapsed = time.monotonic() - started_at
+    if synced:
+        logger.info("Synced %s platforms in %.1fs", synced, elapsed)
+    if elapsed > settings.SYNC_INTERVAL_SECONDS:
+        logger.warning(
+            "Sync pass took %.0fs, longer than SYNC_INTERVAL_SECONDS; add shards or raise SYNC_CONCURRENCY",
+            elapsed,
+        )
+    return synced
+
+
+async def maintain_metric_partitions() -> None:
+    """Create upcoming metric partitions and drop expired ones."""
+    try:
+        async with AsyncSessionLocal() as db:
+            created, dropped = await maintain_partitions(
+                db, settings.METRICS_PARTITION_MONTHS_AHEAD, settings.METRICS_RETENTION_MONTHS
+            )
+    except Exception:
+        logger.exception("Maintaining metric partitions failed")
+        return
+    if created:
+        logger.info("Created metric partitions %s", ", ".join(created))
+    if dropped:
+        logger.info("Dropped expired metric partitions %s", ", ".join(dropped))
+
+
+async def main() -> None:
+    if not 0 <= settings.SYNC_SHARD_INDEX < settings.SYNC_SHARD_COUNT:
+        raise SystemExit("SYNC_SHARD_INDEX must be between 0 and SYNC_SHARD_COUNT - 1")
+
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        sync_due_platforms,
+        "interval",
+        seconds=settings.SYNC_POLL_SECONDS,
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.now(),
+    )
+    if settings.SYNC_SHARD_INDEX == 0:
+        scheduler.add_job(
+            maintain_metric_partitions,
+            "interval",
+            hours=settings.METRICS_MAINTENANCE_HOURS,
+            max_instances=1,
+            coalesce=True,
+            next_run_time=datetime.now(),
+        )
+    scheduler.start()
+    logger.info(
+        "Metrics sync started for shard %s of %s, polling every %ss",
+        settings.SYNC_SHARD_INDEX, settings.SYNC_SHARD_COUNT, settings.SYNC_POLL_SECONDS,
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        scheduler.shutdown()
+        await close_clients()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+Publishing scheduler worker.
+
+Run with ``python -m app.workers.scheduler``. Any number of replicas can run
+side by side: due schedules are claimed with ``FOR UPDATE SKIP LOCKED`` so each
+one is published by exactly one worker.
+"""
+import asyncio
+import logging
+from typing import Set
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.schedule import Schedule
+from app.services.post import publish_post
+from app.services.publisher import PublishError, close_clients, deliver_post
+from app.services.schedule import (
+    claim_due_schedules,
+    complete_schedule,
+    fail_schedule,
+    get_schedule,
+    postpone_schedule,
+    release_stale_claims,
+    renew_claims,
+)
+
+logger = logging.getLogger(__name__)
+
+# Longest a worker blocks on a platform rate limit before requeueing the post
+RATE_LIMIT_MAX_WAIT = 5.0
+
+
+async def publish_schedule(db, schedule: Schedule) -> None:
+    """Publish the post behind a claimed schedule and record the outcome."""
+    schedule_id = schedule.id
+    try:
+        # A retried claim may belong to a worker that published and then died
+        # before recording it; don't publish the same occurrence twice.
+        post = schedule.post
+        already_published = post.status == "published" and (
+            not schedule.recurrence or post.published_at >= schedule.scheduled_at
+        )
+        if not already_published:
+            external_id = await deliver_post(post, post.platform, max_wait=RATE_LIMIT_MAX_WAIT)
+            await publish_post(db, post, external_id=external_id)
+        await complete_schedule(db, schedule)
+    except PublishError as exc:
+        if exc.retry_after is None:
+            await _record_failure(db, schedule_id, exc)
+            return
+        # Throttled: hand the schedule back rather than holding its claim
+        logger.info("Schedule %s rate limited, retrying in %.0fs", schedule_id, exc.retry_after)
+        await db.rollback()
+        schedule = await get_schedule(db, schedule_id)
+        await postpone_schedule(db, schedule, exc.retry_after)
+    except Exception as exc:
+        logger.exception("Publishing schedule %s failed", schedule_id)
+        await _record_failure(db, schedule_id, exc)
+
+
+async def _record_failure(db, schedule_id: int, exc: Exception) -> None:
+    await db.rollback()
+    # The rollback expired the instance, so reload it before recording
+    schedule = await get_schedule(db, schedule_id)
+    await fail_schedule(db, schedule, str(exc) or exc.__class__.__name__)
+
+
+async def _renew_claims(schedule_ids: Set[int]) -> None:
+    """
+    Renew the claims of a batch's unfinished schedules right away and then
+    every third of a lease, so a batch outlasting the lease isn't released
+    to other workers mid-publish. Runs in a session of its own, as the
+    batch's session is busy publishing.
+    """
+    interval = settings.SCHEDULER_LEASE_SECONDS / 3
+    async with AsyncSessionLocal() as db:
+        while True:
+            try:
+                await renew_claims(db, schedule_ids)
+            except Exception:
+                logger.exception("Renewing schedule claims failed")
+                await db.rollback()
+            await asyncio.sleep(interval)
+
+
+async def process_due_schedules() -> int:
+    """Drain due schedules batch by batch. Returns the number processed."""
+    processed = 0
+    async with AsyncSessionLocal() as db:
+        released = await release_stale_claims(db, settings.SCHEDULER_LEASE_SECONDS)
+        if released:
+            logger.warning("Released %s stale schedule claims", released)
+
+        while True:
+            schedules = await claim_due_schedules(db, settings.SCHEDULER_BATCH_SIZE)
+            if not schedules:
+                break
+            pending = {schedule.id for schedule in schedules}
+            renewal = asyncio.create_task(_renew_claims(pending))
+            try:
+                for schedule in schedules:
+                    await publish_schedule(db, schedule)
+                    pending.discard(schedule.id)
+            finally:
+                renewal.cancel()
+            processed += len(schedules)
+            db.expunge_all()
+
+    if processed:
+        logger.info("Processed %s due schedules", processed)
+    return processed
+
+
+async def main() -> None:
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        process_due_schedules,
+        "interval",
+        seconds=settings.SCHEDULER_POLL_SECONDS,
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.start()
+    logger.info("Scheduler started, polling every %ss", settings.SCHEDULER_POLL_SECONDS)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        scheduler.shutdown()
+        await close_clients()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
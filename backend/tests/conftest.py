@@ -0,0 +1,176 @@
+"""
+Shared test fixtures.
+
+Tests that need a database run against the Postgres at DATABASE_TEST_URL (or
+DATABASE_URL), migrated to head, and are skipped when none is reachable.
+Each test runs inside a transaction that is rolled back afterwards.
+"""
+import os
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pytest
+import pytest_asyncio
+
+TEST_DATABASE_URL = os.environ.get("DATABASE_TEST_URL") or os.environ.get("DATABASE_URL")
+
+# The app settings require these at import time
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg://localhost/unavailable")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret-key")
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import create_engine, event, exc, insert  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app.models.platform import Platform, PlatformMetric  # noqa: E402
+from app.models.post import Post, PostMetric  # noqa: E402
+from app.models.schedule import Schedule  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.partitions import ensure_partitions  # noqa: E402
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="session")
+def database_url() -> str:
+    """URL of a reachable test database migrated to head."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("DATABASE_TEST_URL or DATABASE_URL is not set")
+    engine = create_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    try:
+        with engine.connect():
+            pass
+    except exc.OperationalError as error:
+        pytest.skip(f"Database is not reachable: {error}")
+    finally:
+        engine.dispose()
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    command.upgrade(config, "head")
+    return TEST_DATABASE_URL
+
+
+@pytest_asyncio.fixture
+async def db_engine(database_url: str):
+    """An async engine of its own, so each test's event loop owns its connections."""
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def statements(db_engine) -> List[Tuple[str, Any]]:
+    """Every (statement, parameters) executed on the test engine, in order."""
+    executed: List[Tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest_asyncio.fixture
+async def db(db_engine):
+    """A session whose commits are rolled back once the test ends."""
+    async with db_engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection,
+            autoflush=False,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+
+async def _seed_posts(
+    db: AsyncSession, count: int, platforms: int = 2, metric_days: int = 2
+) -> Dict[str, Any]:
+    """
+    Insert a user with ``platforms`` platforms, ``count`` posts spread over
+    them, one schedule and ``metric_days`` daily samples per post, and one
+    platform sample per platform per day. Returns the created IDs.
+    """
+    now = datetime.utcnow().replace(microsecond=0)
+    user_id = await db.scalar(
+        insert(User)
+        .values(email=f"seed-{now.timestamp()}-{count}@example.com", hashed_password="x")
+        .returning(User.id)
+    )
+    platform_ids = list(
+        await db.scalars(
+            insert(Platform).returning(Platform.id),
+            [{"user_id": user_id, "name": f"Account {index}", "type": "twitter"} for index in range(platforms)],
+        )
+    )
+    post_ids = list(
+        await db.scalars(
+            insert(Post).returning(Post.id),
+            [
+                {
+                    "user_id": user_id,
+                    "platform_id": platform_ids[index % platforms],
+                    "content": f"Post {index}",
+                    "content_type": "text",
+                    "status": "published" if index % 2 else "draft",
+                    "created_at": now - timedelta(minutes=index),
+                    "published_at": now - timedelta(minutes=index) if index % 2 else None,
+                }
+                for index in range(count)
+            ],
+        )
+    )
+    await db.execute(
+        insert(Schedule),
+        [
+            {
+                "user_id": user_id,
+                "post_id": post_id,
+                "scheduled_at": now + timedelta(hours=index + 1),
+                "status": "pending",
+            }
+            for index, post_id in enumerate(post_ids)
+        ],
+    )
+
+    days = [now - timedelta(days=day) for day in range(metric_days)]
+    for table in ("platform_metrics", "post_metrics"):
+        await ensure_partitions(db, table, days)
+    await db.execute(
+        insert(PostMetric),
+        [
+            {"post_id": post_id, "date": day, "likes": 1, "comments": 1, "impressions": 10}
+            for post_id in post_ids
+            for day in days
+        ],
+    )
+    await db.execute(
+        insert(PlatformMetric),
+        [
+            {"platform_id": platform_id, "date": day, "followers_count": 100, "impressions": 10}
+            for platform_id in platform_ids
+            for day in days
+        ],
+    )
+    await db.flush()
+    return {"user_id": user_id, "platform_ids": platform_ids, "post_ids": post_ids}
+
+
+@pytest.fixture
+def seed_posts(db):
+    """Seed a user's platforms, posts, schedules and metrics; see ``_seed_posts``."""
+    return partial(_seed_posts, db)
@@ -0,0 +1,191 @@
+"""
+Tests for the AI gateway against a fake OpenAI-compatible server.
+"""
+import asyncio
+import json
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core import ai_gateway as gateway_module
+from app.core.ai_gateway import AIGateway, backoff_delay
+
+
+class FakeOpenAI:
+    """
+    Chat completions endpoint answering each request with its first message.
+
+    Calls block until ``release`` is set, so tests can hold them in flight;
+    ``failures`` lists responses served before the normal ones.
+    """
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.release.set()
+        self.failures: List[httpx.Response] = []
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/v1/chat/completions"
+        self.calls += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.release.wait()
+            if self.failures:
+                return self.failures.pop(0)
+            prompt = json.loads(request.content)["messages"][0]["content"]
+            return httpx.Response(200, json={"choices": [{"message": {"content": f"re: {prompt}"}}]})
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+def server() -> FakeOpenAI:
+    return FakeOpenAI()
+
+
+def make_gateway(server: FakeOpenAI, **limits: Any) -> AIGateway:
+    options: Dict[str, Any] = dict(max_concurrency=10, max_concurrency_per_user=10, max_attempts=3, queue_timeout=5)
+    gateway = AIGateway(**{**options, **limits})
+    gateway._client = httpx.AsyncClient(
+        base_url="http://fake-openai.test/v1", transport=httpx.MockTransport(server.handle)
+    )
+    return gateway
+
+
+def ask(prompt: str) -> List[Dict[str, str]]:
+    return [{"role": "user", "content": prompt}]
+
+
+@pytest.fixture
+def backoffs(monkeypatch) -> List[float]:
+    """Record the gateway's backoff delays instead of sleeping through them."""
+    delays: List[float] = []
+
+    def record(attempt, retry_after=None):
+        delays.append(backoff_delay(attempt, retry_after))
+        return 0
+
+    monkeypatch.setattr(gateway_module, "backoff_delay", record)
+    return delays
+
+
+async def test_identical_concurrent_requests_share_one_call(server):
+    gateway = make_gateway(server)
+    server.release.clear()
+
+    replies = [asyncio.create_task(gateway.chat(user_id, ask("hashtags for cats"))) for user_id in range(5)]
+    await asyncio.sleep(0.01)
+    server.release.set()
+
+    assert await asyncio.gather(*replies) == ["re: hashtags for cats"] * 5
+    assert server.calls == 1
+    assert gateway.coalesced == 4
+
+
+async def test_global_semaphore_caps_upstream_concurrency(server):
+    gateway = make_gateway(server, max_concurrency=2)
+    server.release.clear()
+
+    replies = [asyncio.create_task(gateway.chat(user_id, ask(f"idea {user_id}"))) for user_id in range(6)]
+    await asyncio.sleep(0.01)
+    assert server.running == 2
+    server.release.set()
+
+    await asyncio.gather(*replies)
+    assert server.calls == 6
+    assert server.peak == 2
+
+
+async def test_user_semaphore_caps_one_users_concurrency(server):
+    gateway = make_gateway(server, max_concurrency_per_user=1)
+    server.release.clear()
+
+    mine = [asyncio.create_task(gateway.chat(1, ask(f"idea {index}"))) for index in range(3)]
+    other = asyncio.create_task(gateway.chat(2, ask("another idea")))
+    await asyncio.sleep(0.01)
+    # One call of user 1's and user 2's call; user 1's others wait their turn
+    assert server.running == 2
+    server.release.set()
+
+    await asyncio.gather(*mine, other)
+    assert server.calls == 4
+
+
+async def test_user_over_their_limit_is_turned_away(server):
+    gateway = make_gateway(server, max_concurrency_per_user=1, queue_timeout=0.01)
+    server.release.clear()
+
+    first = asyncio.create_task(gateway.chat(1, ask("first")))
+    await asyncio.sleep(0.01)
+    with pytest.raises(HTTPException) as info:
+        await gateway.chat(1, ask("second"))
+    assert info.value.status_code == 429
+
+    server.release.set()
+    assert await first == "re: first"
+
+
+async def test_failed_calls_are_retried_with_growing_backoff(server, backoffs):
+    gateway = make_gateway(server)
+    server.failures = [httpx.Response(503), httpx.Response(502)]
+
+    assert await gateway.chat(1, ask("retry me")) == "re: retry me"
+    assert server.calls == 3
+    assert gateway.retries == 2
+    # Full jitter: each delay is drawn from a window twice as wide as the last
+    assert 0 <= backoffs[0] <= 1.0 and 0 <= backoffs[1] <= 2.0
+
+
+async def test_retries_honour_retry_after(server, backoffs):
+    gateway = make_gateway(server)
+    server.failures = [httpx.Response(429, headers={"Retry-After": "3"})]
+
+    assert await gateway.chat(1, ask("slow down")) == "re: slow down"
+    assert backoffs == [3.0]
+
+
+async def test_retries_give_up_after_max_attempts(server, backoffs):
+    gateway = make_gateway(server, max_attempts=3)
+    server.failures = [httpx.Response(500) for _ in range(5)]
+
+    with pytest.raises(HTTPException) as info:
+        await gateway.chat(1, ask("doomed"))
+    assert info.value.status_code == 502
+    assert server.calls == 3
+    assert len(backoffs) == 2
+    assert gateway.failures == 1
+
+
+async def test_client_errors_are_not_retried(server, backoffs):
+    gateway = make_gateway(server)
+    server.failures = [httpx.Response(400, json={"error": "bad request"})]
+
+    with pytest.raises(HTTPException) as info:
+        await gateway.chat(1, ask("invalid"))
+    assert info.value.status_code == 502
+    assert server.calls == 1
+    assert backoffs == []
+
+
+async def test_malformed_success_response_is_a_bad_gateway(server, backoffs):
+    gateway = make_gateway(server)
+    server.failures = [httpx.Response(200, text="<html>Gateway timeout</html>")]
+
+    with pytest.raises(HTTPException) as info:
+        await gateway.chat(1, ask("anything"))
+    assert info.value.status_code == 502
+    assert "malformed" in info.value.detail
+    assert server.calls == 1
+
+
+def test_backoff_delays_are_jittered_and_capped():
+    for attempt in range(1, 10):
+        delay = backoff_delay(attempt)
+        assert 0 <= delay <= min(gateway_module.BACKOFF_MAX_SECONDS, gateway_module.BACKOFF_BASE_SECONDS * 2 ** attempt)
+    assert backoff_delay(1, retry_after=60) == gateway_module.BACKOFF_MAX_SECONDS
@@ -0,0 +1,51 @@
+"""
+Tests for the analytics computed from the rollup tables.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.models.rollup import PostingTimeSlot
+from app.services.analytics import get_best_posting_times, get_engagement_metrics
+from app.services.metrics import refresh_post_rollups
+from app.services.post import delete_post
+
+
+async def engagement_totals(db, user_id: int, interval: str):
+    now = datetime.utcnow()
+    metrics = await get_engagement_metrics(
+        db, user_id, None, now - timedelta(days=7), now + timedelta(hours=1), interval
+    )
+    return {field: sum(row[field] for row in metrics["data"]) for field in ("likes", "impressions")}
+
+
+async def test_deleted_posts_leave_the_engagement_totals(db, seed_posts):
+    seeded = await seed_posts(3, platforms=1, metric_days=2)
+    now = datetime.utcnow()
+    await refresh_post_rollups(db, seeded["platform_ids"], now - timedelta(days=2), now)
+    for interval in ("hour", "day", "week"):
+        assert await engagement_totals(db, seeded["user_id"], interval) == {"likes": 6, "impressions": 60}
+
+    await delete_post(db, seeded["post_ids"][0])
+
+    for interval in ("hour", "day", "week"):
+        assert await engagement_totals(db, seeded["user_id"], interval) == {"likes": 4, "impressions": 40}
+
+
+async def test_best_times_skip_hours_below_the_median(db, seed_posts):
+    seeded = await seed_posts(1, platforms=1)
+    platform_id = seeded["platform_ids"][0]
+    await db.execute(
+        insert(PostingTimeSlot),
+        [
+            # Monday 09:00 and 18:00, Tuesday 10:00 and 11:00
+            {"platform_id": platform_id, "slot": slot, "samples": 1, "engagement": engagement}
+            for slot, engagement in ((9, 40), (18, 10), (24 + 10, 30), (24 + 11, 5))
+        ],
+    )
+
+    best = await get_best_posting_times(db, [platform_id])
+
+    assert best["Monday"] == ["09:00"]
+    assert best["Tuesday"] == ["10:00"]
+    assert best["Sunday"] == []
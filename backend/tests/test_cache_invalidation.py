@@ -0,0 +1,51 @@
+"""
+Tests that writes changing cached analytics inputs invalidate the caches.
+"""
+import pytest
+
+from app.core.cache import platform_scope, user_scope
+from app.models.post import Post
+from app.services import metrics
+from app.services.platform import delete_platform
+from app.services.post import delete_post, publish_post
+
+
+@pytest.fixture
+def bumped(monkeypatch):
+    """Scopes whose cache generations were bumped."""
+    scopes = []
+
+    async def bump_generations(bumped_scopes):
+        scopes.extend(bumped_scopes)
+
+    monkeypatch.setattr(metrics, "bump_generations", bump_generations)
+    return scopes
+
+
+async def test_deleting_a_platform_invalidates_its_owner(db, seed_posts, bumped):
+    seeded = await seed_posts(2)
+    platform_id = seeded["platform_ids"][0]
+
+    await delete_platform(db, platform_id)
+
+    assert platform_scope(platform_id) in bumped
+    assert user_scope(seeded["user_id"]) in bumped
+
+
+async def test_deleting_a_post_invalidates_its_platform(db, seed_posts, bumped):
+    seeded = await seed_posts(2)
+
+    await delete_post(db, seeded["post_ids"][0])
+
+    assert platform_scope(seeded["platform_ids"][0]) in bumped
+    assert user_scope(seeded["user_id"]) in bumped
+
+
+async def test_publishing_a_post_invalidates_its_platform(db, seed_posts, bumped):
+    seeded = await seed_posts(2)
+    post = await db.get(Post, seeded["post_ids"][1])
+
+    await publish_post(db, post, external_id="123")
+
+    assert platform_scope(post.platform_id) in bumped
+    assert user_scope(seeded["user_id"]) in bumped
@@ -0,0 +1,60 @@
+"""
+Tests for background export job status and export file expiry.
+"""
+import os
+import time
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.services import analytics
+from app.services.analytics import ExportJob, get_export_job, get_export_path, remove_expired_exports
+
+
+@pytest.fixture
+def shared_store(monkeypatch):
+    """Stand-in for Redis shared by every process."""
+    store = {}
+
+    async def set_json(key, value, ttl):
+        store[key] = jsonable_encoder(value)
+
+    async def get_json(key):
+        value = store.get(key)
+        return dict(value) if value is not None else None
+
+    monkeypatch.setattr(analytics, "set_json", set_json)
+    monkeypatch.setattr(analytics, "get_json", get_json)
+    return store
+
+
+async def test_job_status_is_visible_to_other_processes(shared_store):
+    job = ExportJob(user_id=7, filename="analytics-7-abc.csv.gz", total_rows=10)
+    job.rows_written = 4
+    await job.save()
+
+    # Another process has no local copy of the job
+    status = await get_export_job(7, job.id)
+    assert status["id"] == job.id
+    assert status["rows_written"] == 4
+    assert "user_id" not in status
+    assert await get_export_job(8, job.id) is None
+    assert await get_export_job(7, "missing") is None
+
+
+def test_expired_exports_are_removed_and_hidden(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path))
+    fresh = tmp_path / "analytics-7-fresh.csv"
+    stale = tmp_path / "analytics-7-stale.csv"
+    other = tmp_path / "notes.txt"
+    for path in (fresh, stale, other):
+        path.write_text("x")
+    old = time.time() - settings.EXPORT_TTL_SECONDS - 60
+    for path in (stale, other):
+        os.utime(path, (old, old))
+
+    assert get_export_path(7, stale.name) is None
+    assert remove_expired_exports() == 1
+    assert sorted(os.listdir(tmp_path)) == [fresh.name, other.name]
+    assert get_export_path(7, fresh.name) == str(fresh)
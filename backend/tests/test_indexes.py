@@ -0,0 +1,131 @@
+"""
+EXPLAIN regression tests for the hot listing and analytics queries.
+
+Each test runs a service, captures the SQL it issued and checks that the
+plan reaches every table through the expected index. Sequential scans are
+disabled first, so the planner's preference for scanning tiny test tables
+doesn't mask the indexes: a sequential scan can then only show up when no
+index fits the query.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Set
+
+from sqlalchemy import text
+
+from app.services.analytics import get_platform_analytics
+from app.services.post import get_posts_by_user
+from app.services.schedule import claim_due_schedules, get_schedules_by_user
+
+
+async def explain(db, statement: str, parameters: Any) -> Dict[str, Any]:
+    """The JSON plan of a captured statement."""
+    connection = await db.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    return result.scalar()[0]["Plan"]
+
+
+def iter_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from iter_nodes(child)
+
+
+def indexes_used(plan: Dict[str, Any], prefix: str) -> Set[str]:
+    """Names of the indexes starting with a prefix that the plan scans."""
+    return {
+        node["Index Name"] for node in iter_nodes(plan)
+        if node.get("Index Name", "").startswith(prefix)
+    }
+
+
+def assert_no_seq_scans(plan: Dict[str, Any]) -> None:
+    seq_scans = [node["Relation Name"] for node in iter_nodes(plan) if node["Node Type"] == "Seq Scan"]
+    assert not seq_scans, f"Sequential scans on {seq_scans}"
+
+
+async def statement_matching(db, statements, fragment: str) -> Dict[str, Any]:
+    """The plan of the first captured statement containing a SQL fragment."""
+    for statement, parameters in statements:
+        if fragment in statement:
+            return await explain(db, statement, parameters)
+    raise AssertionError(f"No statement containing {fragment!r} was issued")
+
+
+async def test_post_listing_uses_user_indexes(db, seed_posts, statements):
+    seeded = await seed_posts(40)
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    statements.clear()
+
+    await get_posts_by_user(
+        db, seeded["user_id"], limit=10, platform_id=seeded["platform_ids"][0], status="published"
+    )
+
+    plan = await statement_matching(db, statements, "FROM posts JOIN platforms")
+    assert_no_seq_scans(plan)
+    used = indexes_used(plan, "ix_posts_")
+    assert used and used <= {
+        "ix_posts_user_platform_status",
+        "ix_posts_user_status",
+        "ix_posts_user_created_at_id",
+    }
+
+
+async def test_post_metric_totals_use_post_date_index(db, seed_posts, statements):
+    seeded = await seed_posts(40)
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    statements.clear()
+
+    await get_posts_by_user(db, seeded["user_id"], limit=10)
+
+    plan = await statement_matching(db, statements, "FROM post_metrics")
+    assert_no_seq_scans(plan)
+    # Partitions inherit uq_post_metrics_post_date as <partition>_post_id_date_idx
+    used = indexes_used(plan, "post_metrics_y")
+    assert used and all(name.endswith("_post_id_date_idx") for name in used)
+
+
+async def test_schedule_listing_uses_user_indexes(db, seed_posts, statements):
+    seeded = await seed_posts(40)
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    statements.clear()
+
+    now = datetime.utcnow()
+    await get_schedules_by_user(
+        db, seeded["user_id"], limit=10, status="pending", from_date=now, to_date=now + timedelta(days=1)
+    )
+
+    plan = await statement_matching(db, statements, "FROM schedules JOIN posts")
+    assert_no_seq_scans(plan)
+    used = indexes_used(plan, "ix_schedules_")
+    assert used and used <= {
+        "ix_schedules_user_status_scheduled_at",
+        "ix_schedules_user_scheduled_at_id",
+    }
+
+
+async def test_due_schedule_claims_use_pending_index(db, seed_posts, statements):
+    await seed_posts(40)
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    statements.clear()
+
+    await claim_due_schedules(db, limit=10)
+
+    plan = await statement_matching(db, statements, "UPDATE schedules")
+    assert_no_seq_scans(plan)
+    assert "ix_schedules_pending_scheduled_at" in indexes_used(plan, "ix_schedules_")
+
+
+async def test_platform_analytics_use_platform_date_index(db, seed_posts, statements):
+    seeded = await seed_posts(10, metric_days=5)
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    statements.clear()
+
+    now = datetime.utcnow()
+    await get_platform_analytics(
+        db, seeded["platform_ids"][0], seeded["user_id"], now - timedelta(days=3), now
+    )
+
+    plan = await statement_matching(db, statements, "FROM platform_metrics")
+    assert_no_seq_scans(plan)
+    used = indexes_used(plan, "platform_metrics_y")
+    assert used and all(name.endswith("_platform_id_date_idx") for name in used)
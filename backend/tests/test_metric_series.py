@@ -0,0 +1,112 @@
+"""
+Tests for columnar metric series.
+"""
+from datetime import datetime
+
+import numpy as np
+
+from app.services.metric_series import DATE_DTYPE, MetricSeries, floor_dates, hours_of_week, percentile
+
+
+def epoch_us(value: datetime) -> int:
+    return int((value - datetime(1970, 1, 1)).total_seconds() * 1_000_000)
+
+
+def test_series_from_rows():
+    days = [datetime(2026, 1, day) for day in (1, 2, 3)]
+    series = MetricSeries.from_rows(
+        [(epoch_us(day), followers, rate) for day, followers, rate in zip(days, (100, 90, 130), (250, 0, 125))],
+        ("followers", "engagement_rate"),
+    )
+
+    assert len(series) == 3
+    assert series.points("engagement_rate", scale=100) == [
+        {"date": days[0], "value": 2.5},
+        {"date": days[1], "value": 0.0},
+        {"date": days[2], "value": 1.25},
+    ]
+    assert series.change("followers").tolist() == [0, -10, 40]
+    assert series["followers"].tolist() == [100, 90, 130]
+
+
+def test_empty_series():
+    series = MetricSeries.from_rows([], ("followers",))
+    assert len(series) == 0
+    assert series.points("followers") == []
+    assert series.change("followers").tolist() == []
+
+
+def test_floor_dates_match_date_trunc():
+    # A Wednesday afternoon
+    dates = np.array([datetime(2026, 1, 14, 15, 30)], dtype=DATE_DTYPE)
+    floored = {interval: floor_dates(dates, interval).astype(object)[0] for interval in ("hour", "day", "week", "month")}
+    assert floored == {
+        "hour": datetime(2026, 1, 14, 15),
+        "day": datetime(2026, 1, 14),
+        "week": datetime(2026, 1, 12),
+        "month": datetime(2026, 1, 1),
+    }
+    assert hours_of_week(dates).tolist() == [2 * 24 + 15]
+
+
+def test_resample_sums_counters_per_bucket():
+    hours = [datetime(2026, 1, 1, 10), datetime(2026, 1, 1, 22), datetime(2026, 1, 2, 9)]
+    series = MetricSeries.from_rows(
+        [(epoch_us(hour), likes, shares) for hour, likes, shares in zip(hours, (1, 2, 4), (10, 0, 5))],
+        ("likes", "shares"),
+    )
+
+    daily = series.resample("day")
+
+    assert daily.dates.astype(object).tolist() == [datetime(2026, 1, 1), datetime(2026, 1, 2)]
+    assert daily["likes"].tolist() == [3, 4]
+    assert daily.total("likes", "shares").tolist() == [13, 9]
+    assert daily.records() == [
+        {"date": datetime(2026, 1, 1), "likes": 3, "shares": 10},
+        {"date": datetime(2026, 1, 2), "likes": 4, "shares": 5},
+    ]
+
+
+def test_keyed_resample_sums_each_keys_latest_snapshot():
+    rows = [
+        # key, date, followers; deliberately out of time order
+        (1, epoch_us(datetime(2026, 1, 2)), 120),
+        (1, epoch_us(datetime(2026, 1, 1)), 100),
+        (2, epoch_us(datetime(2026, 1, 1)), 50),
+        (2, epoch_us(datetime(2026, 1, 8)), 70),
+    ]
+    series = MetricSeries.from_rows(rows, ("followers",), keyed=True)
+
+    weekly = series.resample("week", last=("followers",))
+
+    assert weekly.dates.astype(object).tolist() == [datetime(2025, 12, 29), datetime(2026, 1, 5)]
+    assert weekly["followers"].tolist() == [120 + 50, 70]
+    keys, totals = series.sum_by_key()
+    assert keys.tolist() == [1, 2]
+    assert totals["followers"].tolist() == [220, 120]
+
+
+def test_rolling_mean_averages_the_trailing_window():
+    days = [datetime(2026, 1, day) for day in range(1, 6)]
+    series = MetricSeries.from_rows(
+        [(epoch_us(day), value) for day, value in zip(days, (2, 4, 6, 8, 10))], ("likes",)
+    )
+    assert series.rolling_mean("likes", 3).tolist() == [2, 3, 4, 6, 8]
+    assert series.rolling_mean("likes", 10).tolist() == [2, 3, 4, 5, 6]
+
+
+def test_percentiles():
+    days = [datetime(2026, 1, day) for day in range(1, 6)]
+    series = MetricSeries.from_rows(
+        [(epoch_us(day), value) for day, value in zip(days, (5, 1, 4, 2, 3))], ("likes",)
+    )
+    assert series.percentile("likes", (0, 50, 100)).tolist() == [1, 3, 5]
+    assert percentile(np.array([]), (50, 90)).tolist() == [0, 0]
+
+
+def test_empty_series_resamples_to_nothing():
+    series = MetricSeries.from_rows([], ("followers",), keyed=True)
+    resampled = series.resample("day", last=("followers",))
+    assert len(resampled) == 0
+    assert resampled.records() == []
+    assert series.rolling_mean("followers", 7).tolist() == []
@@ -0,0 +1,29 @@
+"""
+Tests for keyset pagination over the listings.
+"""
+from sqlalchemy import insert
+
+from app.models.post import Post
+from app.services.post import get_posts_by_user
+
+
+async def test_post_pages_cover_every_post_once(db, seed_posts):
+    seeded = await seed_posts(25)
+    # Rows inserted without a creation time get one from the database
+    undated_id = await db.scalar(
+        insert(Post)
+        .values(
+            user_id=seeded["user_id"], platform_id=seeded["platform_ids"][0], content="Undated", content_type="text"
+        )
+        .returning(Post.id)
+    )
+
+    seen, cursor = [], None
+    while True:
+        page = await get_posts_by_user(db, seeded["user_id"], limit=10, cursor=cursor)
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted([*seeded["post_ids"], undated_id])
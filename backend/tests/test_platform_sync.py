@@ -0,0 +1,27 @@
+"""
+Tests for fetching platform metrics.
+"""
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.models.platform import Platform
+from app.services import platform_sync
+from app.services.platform_sync import SyncError, fetch_platform_metrics
+
+
+@pytest.mark.parametrize("response", [
+    httpx.Response(200, text="<html>Service Unavailable</html>"),
+    httpx.Response(200, json=["not", "an", "object"]),
+])
+async def test_malformed_responses_raise_sync_error(monkeypatch, response):
+    client = httpx.AsyncClient(
+        base_url="https://api.twitter.test", transport=httpx.MockTransport(lambda request: response)
+    )
+    monkeypatch.setattr(platform_sync, "get_client", lambda platform_type: client)
+    platform = Platform(id=1, type="twitter", credentials={"access_token": "token"})
+    now = datetime.utcnow()
+
+    with pytest.raises(SyncError):
+        await fetch_platform_metrics(platform, now - timedelta(hours=1), now)
@@ -0,0 +1,58 @@
+"""
+Tests keeping posting time slots in step with posts' publish times.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+
+from sqlalchemy import func, select
+
+from app.models.post import Post, PostMetric
+from app.models.rollup import PostingTimeSlot
+from app.services.metrics import move_posting_times, posting_engagement, posting_time_slot
+from app.services.post import delete_post, publish_post
+
+
+async def stored_slots(db, platform_id: int) -> Dict[int, Tuple[int, int]]:
+    result = await db.execute(
+        select(PostingTimeSlot.slot, PostingTimeSlot.samples, PostingTimeSlot.engagement)
+        .where(PostingTimeSlot.platform_id == platform_id)
+    )
+    return {slot: (samples, engagement) for slot, samples, engagement in result.all() if samples or engagement}
+
+
+async def recomputed_slots(db, platform_id: int) -> Dict[int, Tuple[int, int]]:
+    """Slots built from scratch, as the backfill in migration 0009 does."""
+    result = await db.execute(
+        select(Post.published_at, func.count(), func.sum(posting_engagement()))
+        .join(PostMetric, PostMetric.post_id == Post.id)
+        .where(Post.platform_id == platform_id, Post.published_at.isnot(None))
+        .group_by(Post.published_at)
+    )
+    slots: Dict[int, Tuple[int, int]] = {}
+    for published_at, samples, engagement in result.all():
+        slot = posting_time_slot(published_at)
+        previous = slots.get(slot, (0, 0))
+        slots[slot] = (previous[0] + samples, previous[1] + engagement)
+    return slots
+
+
+async def test_republishing_moves_slot_totals(db, seed_posts):
+    seeded = await seed_posts(1, platforms=1, metric_days=3)
+    platform_id = seeded["platform_ids"][0]
+    post = await db.get(Post, seeded["post_ids"][0])
+
+    # First published in an earlier hour of the week
+    first_published_at = datetime.utcnow() - timedelta(hours=5)
+    await move_posting_times(db, post, first_published_at)
+    post.published_at = first_published_at
+    await db.flush()
+    assert await stored_slots(db, platform_id) == {posting_time_slot(first_published_at): (3, 6)}
+
+    await publish_post(db, post)
+
+    assert await stored_slots(db, platform_id) == await recomputed_slots(db, platform_id)
+    assert await stored_slots(db, platform_id) == {posting_time_slot(post.published_at): (3, 6)}
+
+    await delete_post(db, post.id)
+
+    assert await stored_slots(db, platform_id) == {}
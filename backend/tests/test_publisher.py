@@ -0,0 +1,130 @@
+"""
+Tests for the publishing pipeline's failure handling.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import select, update
+
+from app.models.post import Post
+from app.services import publisher
+from app.services.post import release_stale_publish_claims, renew_publish_claims, start_publishing
+from app.services.publisher import PublishError, PublishJob, PublishPipeline, send_post
+
+
+@pytest.fixture
+def platform_api(monkeypatch):
+    """Route twitter publish requests to a handler set by the test."""
+    handlers = []
+    client = httpx.AsyncClient(
+        base_url="https://api.twitter.test",
+        transport=httpx.MockTransport(lambda request: handlers[0](request)),
+    )
+    monkeypatch.setitem(publisher._clients, "twitter", client)
+    yield handlers
+    publisher._clients.pop("twitter", None)
+
+
+def make_job(**fields) -> PublishJob:
+    return PublishJob(
+        post_id=1, user_id=1, platform_type="twitter", credentials={}, payload={"text": "hi"}, **fields
+    )
+
+
+async def test_malformed_success_response_is_a_publish_error(platform_api):
+    platform_api.append(lambda request: httpx.Response(200, text="<html>OK</html>"))
+    with pytest.raises(PublishError) as info:
+        await send_post("twitter", {}, {"text": "hi"})
+    assert not info.value.retryable
+
+
+async def test_unexpected_failures_finish_the_job(monkeypatch):
+    async def crash(*args):
+        raise RuntimeError("connection reset")
+
+    async def fail_to_record(job):
+        raise RuntimeError("database unavailable")
+
+    marked = []
+
+    async def mark_failed(job):
+        marked.append(job.post_id)
+
+    pipeline = PublishPipeline(workers=1, queue_size=1, history=10)
+    monkeypatch.setattr(publisher, "send_post", crash)
+    monkeypatch.setattr(pipeline, "_record", fail_to_record)
+    monkeypatch.setattr(pipeline, "_mark_failed", mark_failed)
+
+    job = make_job(reserved=True)
+    await pipeline._run(job)
+
+    assert job.status == "failed"
+    assert job.error == "connection reset"
+    assert job.finished_at is not None
+    assert marked == [job.post_id]
+
+
+async def test_retries_wait_for_room_in_a_full_queue():
+    pipeline = PublishPipeline(workers=1, queue_size=1, history=10)
+    pipeline.queue.put_nowait(make_job())
+
+    job = make_job()
+    pipeline._retry_later(job, 0)
+    await asyncio.sleep(0.01)
+    assert pipeline._retries
+
+    pipeline.queue.get_nowait()
+    await asyncio.sleep(0.01)
+    assert pipeline.queue.get_nowait() is job
+    assert not pipeline._retries
+
+
+def test_history_trim_skips_unfinished_jobs():
+    pipeline = PublishPipeline(workers=1, queue_size=10, history=2)
+    running = make_job()
+    finished = [make_job(finished_at=datetime.utcnow()) for _ in range(3)]
+    for job in (running, *finished):
+        pipeline.jobs[job.id] = job
+
+    pipeline._trim_history()
+
+    assert list(pipeline.jobs) == [running.id, finished[2].id]
+
+
+async def post_states(db, post_ids):
+    result = await db.execute(select(Post.id, Post.status).where(Post.id.in_(post_ids)))
+    return dict(result.all())
+
+
+async def test_a_post_is_claimed_for_publishing_once(db, seed_posts):
+    seeded = await seed_posts(1)
+    post = await db.get(Post, seeded["post_ids"][0])
+
+    assert await start_publishing(db, post, lease_seconds=600)
+    assert not await start_publishing(db, post, lease_seconds=600)
+    assert await post_states(db, [post.id]) == {post.id: "publishing"}
+
+
+async def test_stale_publish_claims_are_released(db, seed_posts):
+    seeded = await seed_posts(4)
+    # Drafts; the odd-numbered seeded posts are published already
+    running, abandoned = [await db.get(Post, post_id) for post_id in seeded["post_ids"][::2]]
+    for post in (running, abandoned):
+        assert await start_publishing(db, post, lease_seconds=600)
+    await db.execute(
+        update(Post)
+        .where(Post.id.in_([running.id, abandoned.id]))
+        .values(publish_claimed_at=datetime.utcnow() - timedelta(seconds=900))
+    )
+
+    # A stale claim can be taken over at once
+    assert await start_publishing(db, abandoned, lease_seconds=600)
+    assert await renew_publish_claims(db, [running.id]) == 1
+    await db.execute(
+        update(Post).where(Post.id == abandoned.id).values(publish_claimed_at=datetime.utcnow() - timedelta(seconds=900))
+    )
+
+    assert await release_stale_publish_claims(db, lease_seconds=600) == 1
+    assert await post_states(db, [running.id, abandoned.id]) == {running.id: "publishing", abandoned.id: "failed"}
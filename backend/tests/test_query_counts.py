@@ -0,0 +1,31 @@
+"""
+Statement-count tests for the detail listings, guarding against N+1 loads.
+"""
+from app.services.post import get_posts_by_user
+from app.services.schedule import get_schedules_by_user
+
+# A page costs its SELECT plus one grouped metrics query, whatever its size;
+# the endpoint's current-user lookup makes three
+MAX_STATEMENTS = 3
+
+
+async def test_post_listing_page_uses_constant_statements(db, seed_posts, statements):
+    seeded = await seed_posts(150)
+    statements.clear()
+
+    page = await get_posts_by_user(db, seeded["user_id"], limit=100)
+
+    assert len(page["items"]) == 100
+    assert all(item["platform_name"] and item["metrics"] for item in page["items"])
+    assert len(statements) <= MAX_STATEMENTS, [statement for statement, _ in statements]
+
+
+async def test_schedule_listing_page_uses_constant_statements(db, seed_posts, statements):
+    seeded = await seed_posts(150)
+    statements.clear()
+
+    page = await get_schedules_by_user(db, seeded["user_id"], limit=100)
+
+    assert len(page["items"]) == 100
+    assert all(item["post_content"] and item["platform_name"] and item["metrics"] for item in page["items"])
+    assert len(statements) <= MAX_STATEMENTS, [statement for statement, _ in statements]
@@ -0,0 +1,41 @@
+"""
+Tests for recurrence rule parsing and occurrence expansion.
+"""
+from datetime import datetime
+
+import pytest
+
+from app.core.recurrence import iter_occurrences, parse_rule
+
+
+@pytest.mark.parametrize("until", [
+    "20260105T120000Z",
+    "2026-01-05T12:00:00Z",
+    "2026-01-05T14:00:00+02:00",
+    "2026-01-05T12:00:00",
+])
+def test_until_is_naive_utc(until):
+    rule = parse_rule("daily", f"FREQ=DAILY;UNTIL={until}")
+    assert rule.until == datetime(2026, 1, 5, 12, 0)
+
+
+def test_occurrences_stop_at_utc_until():
+    rule = parse_rule("daily", "FREQ=DAILY;UNTIL=20260105T090000Z")
+    occurrences = list(iter_occurrences(
+        datetime(2026, 1, 1, 10, 0), "Europe/Berlin", rule, after=datetime(2025, 12, 31)
+    ))
+    # 10:00 in Berlin is 09:00 UTC in winter, so the 5th is the last occurrence
+    assert occurrences == [datetime(2026, 1, day, 9, 0) for day in range(1, 6)]
+
+
+def test_invalid_until_is_rejected():
+    with pytest.raises(ValueError):
+        parse_rule("daily", "FREQ=DAILY;UNTIL=next-tuesday")
+
+
+def test_count_includes_occurrences_before_after():
+    rule = parse_rule("daily", "FREQ=DAILY;COUNT=10")
+    anchor = datetime(2026, 1, 1, 9, 0)
+    resumed = list(iter_occurrences(anchor, "UTC", rule, after=datetime(2026, 1, 4, 9, 0)))
+    # Resuming after the 4th occurrence leaves the 5th to 10th
+    assert resumed == [datetime(2026, 1, day, 9, 0) for day in range(5, 11)]
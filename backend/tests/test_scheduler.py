@@ -0,0 +1,124 @@
+"""
+Tests for claiming due schedules, the claims' lease and recurring series.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.models.schedule import Schedule
+from app.services.schedule import (
+    claim_due_schedules,
+    complete_schedule,
+    get_next_occurrences,
+    release_stale_claims,
+    renew_claims,
+)
+from app.workers import scheduler
+
+
+async def claim_seeded(db, seed_posts, count: int):
+    seeded = await seed_posts(count)
+    await db.execute(
+        update(Schedule)
+        .where(Schedule.user_id == seeded["user_id"])
+        .values(scheduled_at=datetime.utcnow() - timedelta(minutes=1))
+    )
+    claimed = [schedule.id for schedule in await claim_due_schedules(db, limit=10)]
+    assert len(claimed) == count
+    return claimed
+
+
+async def statuses(db, schedule_ids):
+    result = await db.execute(select(Schedule.id, Schedule.status).where(Schedule.id.in_(schedule_ids)))
+    by_id = dict(result.all())
+    return [by_id[schedule_id] for schedule_id in schedule_ids]
+
+
+async def test_renewed_claims_are_not_released(db, seed_posts):
+    claimed = await claim_seeded(db, seed_posts, 4)
+
+    # Every claim outlives its lease, but half are still being published
+    await db.execute(
+        update(Schedule)
+        .where(Schedule.id.in_(claimed))
+        .values(claimed_at=datetime.utcnow() - timedelta(hours=1))
+    )
+    assert await renew_claims(db, claimed[:2]) == 2
+
+    # Another worker sweeping for abandoned claims
+    assert await release_stale_claims(db, lease_seconds=600) == 2
+    assert await statuses(db, claimed) == ["processing", "processing", "pending", "pending"]
+
+
+async def test_other_edits_do_not_extend_a_lease(db, seed_posts):
+    claimed = await claim_seeded(db, seed_posts, 1)
+    await db.execute(
+        update(Schedule)
+        .where(Schedule.id.in_(claimed))
+        .values(claimed_at=datetime.utcnow() - timedelta(hours=1), updated_at=datetime.utcnow())
+    )
+
+    assert await release_stale_claims(db, lease_seconds=600) == 1
+    assert await statuses(db, claimed) == ["pending"]
+
+
+async def test_batch_claims_are_renewed_before_the_first_interval(monkeypatch):
+    renewed = []
+
+    async def record(db, schedule_ids):
+        renewed.append(set(schedule_ids))
+        return len(schedule_ids)
+
+    monkeypatch.setattr(scheduler, "renew_claims", record)
+    monkeypatch.setattr(scheduler.settings, "SCHEDULER_LEASE_SECONDS", 600)
+
+    renewal = asyncio.create_task(scheduler._renew_claims({1, 2}))
+    await asyncio.sleep(0.01)
+    renewal.cancel()
+    await asyncio.gather(renewal, return_exceptions=True)
+
+    assert renewed == [{1, 2}]
+
+
+async def recurring_schedule(db, seed_posts, rule: str, scheduled_at: datetime) -> Schedule:
+    seeded = await seed_posts(1)
+    schedule = await db.scalar(select(Schedule).where(Schedule.user_id == seeded["user_id"]))
+    schedule.recurrence, schedule.recurrence_rule = "daily", rule
+    schedule.scheduled_at = schedule.recurrence_anchor = scheduled_at
+    schedule.timezone = "UTC"
+    await db.flush()
+    return schedule
+
+
+async def test_resumed_series_keeps_to_its_count(db, seed_posts):
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(hours=1)
+    schedule = await recurring_schedule(db, seed_posts, "FREQ=DAILY;COUNT=5", start)
+
+    occurrences = []
+    for _ in range(2):
+        occurrences.append(schedule.scheduled_at)
+        await complete_schedule(db, schedule)
+    assert schedule.occurrence_count == 2
+    assert get_next_occurrences(schedule, 10) == [start + timedelta(days=day) for day in range(2, 5)]
+
+    while schedule.status == "pending":
+        occurrences.append(schedule.scheduled_at)
+        await complete_schedule(db, schedule)
+    assert occurrences == [start + timedelta(days=day) for day in range(5)]
+    assert schedule.occurrence_count == 5
+    assert schedule.status == "completed"
+
+
+async def test_skipped_occurrences_count_against_count(db, seed_posts):
+    # The worker was down for the series' first three days
+    start = datetime.utcnow().replace(microsecond=0) - timedelta(days=3, hours=1)
+    schedule = await recurring_schedule(db, seed_posts, "FREQ=DAILY;COUNT=5", start)
+
+    completions = 0
+    while schedule.status == "pending":
+        completions += 1
+        await complete_schedule(db, schedule)
+    # Only the 5th occurrence is left once the missed 2nd to 4th are skipped
+    assert completions == 2
+    assert schedule.status == "completed"
@@ -0,0 +1,39 @@
+"""
+Tests for the password hashing pool.
+"""
+import asyncio
+import threading
+
+from app.core.security import HashingPool
+
+
+async def test_cancelled_callers_keep_their_permit_until_the_hash_finishes():
+    pool = HashingPool(workers=1, max_waiting=10)
+    release = threading.Event()
+    concurrent, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow_hash():
+        with lock:
+            concurrent[0] += 1
+            peak[0] = max(peak[0], concurrent[0])
+        release.wait(5)
+        with lock:
+            concurrent[0] -= 1
+
+    first = asyncio.create_task(pool.run(slow_hash))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    await asyncio.sleep(0.05)
+
+    # The cancelled caller's hash is still running, so the next one waits
+    second = asyncio.create_task(pool.run(slow_hash))
+    await asyncio.sleep(0.05)
+    assert pool.running == 1
+    assert pool.waiting == 1
+
+    release.set()
+    await asyncio.wait_for(second, 5)
+    assert peak[0] == 1
+    assert pool.running == 0
+    assert pool.completed == 2
@@ -4,9 +4,10 @@ import api from '../../services/api';
 // Async actions
 export const fetchPosts = createAsyncThunk(
   'posts/fetchPosts',
-  async (_, { rejectWithValue }) => {
+  async ({ cursor } = {}, { rejectWithValue }) => {
     try {
-      const response = await api.get('/posts');
+      // Pass the previous page's nextCursor to load the following page
+      const response = await api.get('/posts', { params: cursor ? { cursor } : {} });
       return response.data;
     } catch (error) {
       return rejectWithValue(error.response?.data?.detail || 'Failed to fetch posts');
@@ -65,6 +66,7 @@ export const deletePost = createAsyncThunk(
 // Initial state
 const initialState = {
   posts: [],
+  nextCursor: null,
   currentPost: null,
   loading: false,
   saving: false,
@@ -95,7 +97,16 @@ const postSlice = createSlice({
       })
       .addCase(fetchPosts.fulfilled, (state, action) => {
         state.loading = false;
-        state.posts = action.payload;
+        // Pages are { items, next_cursor }; the simple backend returns a plain array
+        const page = Array.isArray(action.payload)
+          ? { items: action.payload, next_cursor: null }
+          : action.payload;
+        if (action.meta.arg?.cursor) {
+          state.posts.push(...page.items);
+        } else {
+          state.posts = page.items;
+        }
+        state.nextCursor = page.next_cursor;
       })
       .addCase(fetchPosts.rejected, (state, action) => {
         state.loading = false;
@@ -4,9 +4,10 @@ import api from '../../services/api';
 // Async actions
 export const fetchSchedules = createAsyncThunk(
   'schedules/fetchSchedules',
-  async (_, { rejectWithValue }) => {
+  async ({ cursor } = {}, { rejectWithValue }) => {
     try {
-      const response = await api.get('/schedules');
+      // Pass the previous page's nextCursor to load the following page
+      const response = await api.get('/schedules', { params: cursor ? { cursor } : {} });
       return response.data;
     } catch (error) {
       return rejectWithValue(error.response?.data?.detail || 'Failed to fetch schedules');
@@ -53,6 +54,7 @@ export const deleteSchedule = createAsyncThunk(
 // Initial state
 const initialState = {
   schedules: [],
+  nextCursor: null,
   currentSchedule: null,
   loading: false,
   saving: false,
@@ -83,7 +85,16 @@ const scheduleSlice = createSlice({
       })
       .addCase(fetchSchedules.fulfilled, (state, action) => {
         state.loading = false;
-        state.schedules = action.payload;
+        // Pages are { items, next_cursor }; the simple backend returns a plain array
+        const page = Array.isArray(action.payload)
+          ? { items: action.payload, next_cursor: null }
+          : action.payload;
+        if (action.meta.arg?.cursor) {
+          state.schedules.push(...page.items);
+        } else {
+          state.schedules = page.items;
+        }
+        state.nextCursor = page.next_cursor;
       })
       .addCase(fetchSchedules.rejected, (state, action) => {
         state.loading = false;